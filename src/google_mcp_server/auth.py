@@ -2,6 +2,7 @@
 
 import json
 import os
+import threading
 import webbrowser
 from pathlib import Path
 from typing import Optional, List
@@ -60,6 +61,12 @@ class GoogleAuthManager:
         self.credentials_dir.mkdir(parents=True, exist_ok=True)
         self.token_file = self.credentials_dir / 'token.json'
         
+        # Credentials are kept in memory once loaded. The lock makes sure
+        # concurrent callers wait for one refresh or OAuth flow instead of
+        # each starting their own.
+        self._credentials: Optional[Credentials] = None
+        self._lock = threading.Lock()
+        
     def get_credentials(self) -> Optional[Credentials]:
         """
         Get valid credentials, refreshing or re-authenticating as needed.
@@ -67,31 +74,40 @@ class GoogleAuthManager:
         Returns:
             Valid Google OAuth2 credentials or None if authentication fails
         """
-        creds = None
+        creds = self._credentials
+        if creds and creds.valid:
+            return creds
         
-        # Load existing token if available
-        if self.token_file.exists():
-            try:
-                creds = Credentials.from_authorized_user_file(str(self.token_file), self.scopes)
-                logger.info("Loaded existing credentials from token file")
-            except Exception as e:
-                logger.warning(f"Failed to load existing credentials: {e}")
-                
-        # Refresh credentials if they're expired
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                creds.refresh(Request())
-                logger.info("Refreshed expired credentials")
-                self._save_credentials(creds)
-            except Exception as e:
-                logger.warning(f"Failed to refresh credentials: {e}")
-                creds = None
-                
-        # Run OAuth flow if we don't have valid credentials
-        if not creds or not creds.valid:
-            creds = self._run_oauth_flow()
+        with self._lock:
+            # Another caller may have refreshed or authenticated while we waited
+            creds = self._credentials
+            if creds and creds.valid:
+                return creds
             
-        return creds
+            # Load existing token if available
+            if creds is None and self.token_file.exists():
+                try:
+                    creds = Credentials.from_authorized_user_file(str(self.token_file), self.scopes)
+                    logger.info("Loaded existing credentials from token file")
+                except Exception as e:
+                    logger.warning(f"Failed to load existing credentials: {e}")
+                    
+            # Refresh credentials if they're expired
+            if creds and creds.expired and creds.refresh_token:
+                try:
+                    creds.refresh(Request())
+                    logger.info("Refreshed expired credentials")
+                    self._save_credentials(creds)
+                except Exception as e:
+                    logger.warning(f"Failed to refresh credentials: {e}")
+                    creds = None
+                    
+            # Run OAuth flow if we don't have valid credentials
+            if not creds or not creds.valid:
+                creds = self._run_oauth_flow()
+            
+            self._credentials = creds if creds and creds.valid else None
+            return creds
     
     def _run_oauth_flow(self) -> Optional[Credentials]:
         """
@@ -182,6 +198,9 @@ class GoogleAuthManager:
         Returns:
             True if successfully revoked, False otherwise
         """
+        with self._lock:
+            self._credentials = None
+        
         try:
             if self.token_file.exists():
                 # Load credentials to revoke them
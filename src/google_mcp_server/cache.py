@@ -0,0 +1,196 @@
+"""Small caches used by the Google API clients."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Union
+
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries expire after a fixed time.
+    
+    Cached values are returned as-is, so callers must not mutate them.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries kept before evicting the least recently used
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for key, or default if missing or expired.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store value under key, evicting the least recently used entry if full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove key and return its value, or default if it was not cached.
+        
+        Args:
+            key: Cache key
+            default: Value returned if key is not cached
+        
+        Returns:
+            Removed value or default
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+    
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key matches predicate.
+        
+        Args:
+            predicate: Called with each key; entries for which it returns True are removed
+        
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class PersistentCache:
+    """
+    Thread-safe key/value cache stored in a SQLite file, so it survives restarts.
+    
+    Values must be JSON serializable and are returned as fresh copies. Entries
+    expire after a fixed time based on wall-clock time. The database file is
+    created readable by the owner only, since cached values may hold private data.
+    """
+    
+    def __init__(self, path: Union[str, Path], ttl: float):
+        """
+        Open or create the cache file and drop expired entries.
+        
+        Args:
+            path: SQLite database file
+            ttl: Seconds an entry stays valid after it is stored
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires REAL, value TEXT)'
+        )
+        self._db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Return the cached value for key, or default if missing or expired.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value FROM cache WHERE key = ? AND expires > ?', (key, time.time())
+            ).fetchone()
+        return default if row is None else json.loads(row[0])
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store value under key.
+        
+        Args:
+            key: Cache key
+            value: JSON serializable value to cache
+        """
+        data = json.dumps(value)
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)',
+                (key, time.time() + self.ttl, data)
+            )
+    
+    def pop(self, key: str) -> None:
+        """
+        Remove key if it is cached.
+        
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._db.execute('DELETE FROM cache WHERE key = ?', (key,))
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._db.execute('DELETE FROM cache')
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM cache WHERE expires > ?', (time.time(),)
+            ).fetchone()[0]
@@ -6,9 +6,10 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from .transport import authorized_http, build_service
+
 logger = logging.getLogger(__name__)
 
 class GoogleCalendarClient:
@@ -22,7 +23,7 @@ class GoogleCalendarClient:
             credentials: Valid Google OAuth2 credentials
         """
         self.credentials = credentials
-        self.service = build('calendar', 'v3', credentials=credentials)
+        self.service = build_service('calendar', 'v3', authorized_http(credentials))
         
     def list_calendars(self) -> Dict[str, Any]:
         """
@@ -6,11 +6,24 @@ from typing import Dict, List, Optional, Any, Tuple
 import re
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from .cache import TTLCache
+from .transport import BATCH_SIZE, authorized_http, build_service
+
 logger = logging.getLogger(__name__)
 
+_SEARCH_READ_MASK = 'names,emailAddresses,phoneNumbers,organizations'
+
+# Resolved names are reused for a while, since users mostly write to the same
+# few people. Names without a single match are kept briefly so a typo is not
+# searched again on every retry.
+_RESOLVE_CACHE_SIZE = 512
+_RESOLVE_CACHE_TTL = 10 * 60
+_UNRESOLVED_CACHE_TTL = 30
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 class GoogleContactsClient:
     """Client for Google People API operations."""
     
@@ -22,7 +35,9 @@ class GoogleContactsClient:
             credentials: Valid Google OAuth2 credentials
         """
         self.credentials = credentials
-        self.service = build('people', 'v1', credentials=credentials)
+        self.service = build_service('people', 'v1', authorized_http(credentials))
+        self._resolved_cache = TTLCache(maxsize=_RESOLVE_CACHE_SIZE, ttl=_RESOLVE_CACHE_TTL)
+        self._unresolved_cache = TTLCache(maxsize=_RESOLVE_CACHE_SIZE, ttl=_UNRESOLVED_CACHE_TTL)
         
     def search_contacts(self, query: str, max_results: int = 10) -> Dict[str, Any]:
         """
@@ -39,38 +54,14 @@ class GoogleContactsClient:
             # First try the searchContacts API (better for searching)
             search_results = []
             try:
-                search_result = self.service.people().searchContacts(
-                    query=query,
-                    readMask='names,emailAddresses,phoneNumbers,organizations',
-                    sources=['READ_SOURCE_TYPE_CONTACT'],
-                    pageSize=max_results
-                ).execute()
-                
-                search_results = search_result.get('results', [])
-                logger.info(f"searchContacts API returned {len(search_results)} results for '{query}'")
+                search_result = self._search_request(query, max_results).execute()
                 
             except HttpError as search_error:
                 logger.warning(f"searchContacts API failed: {search_error}, falling back to connections list")
                 # Fall back to the connections method if searchContacts fails
                 return self._search_via_connections(query, max_results)
             
-            # Format search results
-            matching_contacts = []
-            for result in search_results:
-                person = result.get('person', {})
-                if person:
-                    formatted_contact = self._format_contact(person)
-                    # Add relevance score from API if available
-                    formatted_contact['match_score'] = 100  # SearchContacts already filtered
-                    matching_contacts.append(formatted_contact)
-            
-            return {
-                'success': True,
-                'contacts': matching_contacts,
-                'totalMatches': len(matching_contacts),
-                'query': query,
-                'source': 'searchContacts_API'
-            }
+            return self._format_search_response(query, search_result)
             
         except HttpError as e:
             logger.error(f"HTTP error searching contacts: {e}")
@@ -85,6 +76,37 @@ class GoogleContactsClient:
                 'error': str(e)
             }
     
+    def _search_request(self, query: str, max_results: int):
+        """Build a searchContacts request over the user's contacts."""
+        return self.service.people().searchContacts(
+            query=query,
+            readMask=_SEARCH_READ_MASK,
+            sources=['READ_SOURCE_TYPE_CONTACT'],
+            pageSize=max_results
+        )
+    
+    def _format_search_response(self, query: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a searchContacts response into a search_contacts result."""
+        search_results = response.get('results', [])
+        logger.info(f"searchContacts API returned {len(search_results)} results for '{query}'")
+        
+        matching_contacts = []
+        for result in search_results:
+            person = result.get('person', {})
+            if person:
+                formatted_contact = self._format_contact(person)
+                # Add relevance score from API if available
+                formatted_contact['match_score'] = 100  # SearchContacts already filtered
+                matching_contacts.append(formatted_contact)
+        
+        return {
+            'success': True,
+            'contacts': matching_contacts,
+            'totalMatches': len(matching_contacts),
+            'query': query,
+            'source': 'searchContacts_API'
+        }
+    
     def _search_via_connections(self, query: str, max_results: int = 10) -> Dict[str, Any]:
         """
         Fallback search method using connections.list (the old approach).
@@ -371,7 +393,8 @@ class GoogleContactsClient:
             name_or_email: Contact name or email to resolve
             
         Returns:
-            Dictionary with resolved email and contact info
+            Dictionary with resolved email and contact info. Name lookups may be
+            served from a short-lived cache and must not be mutated.
         """
         try:
             # If it's already a valid email, return as-is
@@ -384,9 +407,72 @@ class GoogleContactsClient:
                     'message': 'Email address provided directly'
                 }
             
+            cached = self._cached_resolution(name_or_email)
+            if cached is not None:
+                return cached
+            
             # Search for contacts
             search_result = self.search_contacts(name_or_email, max_results=5)
+            result = self._pick_contact(name_or_email, search_result)
+            if search_result['success']:
+                self._remember_resolution(name_or_email, search_result, result)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error resolving contact email: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _cached_resolution(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return a recent resolution of name, or None if it must be searched."""
+        key = name.strip().lower()
+        result = self._resolved_cache.get(key)
+        if result is not None:
+            return result
+        # Ambiguous and unmatched results are picked again so that messages
+        # echo this caller's input rather than the first caller's
+        search_result = self._unresolved_cache.get(key)
+        return None if search_result is None else self._pick_contact(name, search_result)
+    
+    def _remember_resolution(self, name: str, search_result: Dict[str, Any],
+                             result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Cache the resolution of name, picked from a successful contact search.
+        
+        Only unambiguous matches go in the long-lived cache. For other results
+        the search itself is kept briefly, so a contact added in the meantime
+        is found on a later call. Failed searches are never passed here, so
+        API errors are retried.
+        
+        Args:
+            name: Name that was resolved
+            search_result: Successful search_contacts result for name
+            result: Result of _pick_contact for name
+            
+        Returns:
+            The same result
+        """
+        key = name.strip().lower()
+        if result['success'] and not result.get('requires_confirmation'):
+            self._resolved_cache.set(key, result)
+        else:
+            self._unresolved_cache.set(key, search_result)
+        return result
+    
+    def _pick_contact(self, name_or_email: str, search_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Choose the email for a name from its contact search results.
+        
+        Args:
+            name_or_email: Name that was searched for
+            search_result: Result of search_contacts for that name
             
+        Returns:
+            resolve_contact_email result
+        """
+        try:
             if not search_result['success']:
                 return search_result
             
@@ -450,8 +536,7 @@ class GoogleContactsClient:
         Returns:
             True if valid email format
         """
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(email_pattern, email.strip()))
+        return bool(_EMAIL_RE.match(email.strip()))
     
     def list_contacts(self, max_results: int = 50) -> Dict[str, Any]:
         """
@@ -560,6 +645,60 @@ class GoogleContactsClient:
                 'error': str(e)
             }
     
+    def batch_resolve(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve several names or emails with batched contact searches.
+        
+        Plain email addresses and recently resolved names need no lookup. The
+        remaining names are searched with one batch request per 50 names. A
+        name whose search fails in the batch is retried on its own with
+        resolve_contact_email.
+        
+        Args:
+            names: Names or emails to resolve
+            
+        Returns:
+            Dictionary mapping each name to its resolve_contact_email result
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for name in dict.fromkeys(names):
+            if self._is_valid_email(name):
+                results[name] = self.resolve_contact_email(name)
+                continue
+            cached = self._cached_resolution(name)
+            if cached is not None:
+                results[name] = cached
+            else:
+                pending.append(name)
+        
+        if len(pending) == 1:
+            results[pending[0]] = self.resolve_contact_email(pending[0])
+            return results
+        
+        def callback(request_id, response, exception):
+            name = pending[int(request_id)]
+            if exception is not None:
+                logger.warning(f"Batched contact search failed for '{name}': {exception}")
+            else:
+                search_result = self._format_search_response(name, response)
+                results[name] = self._remember_resolution(
+                    name, search_result, self._pick_contact(name, search_result))
+        
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for offset, name in enumerate(pending[start:start + BATCH_SIZE], start):
+                batch.add(self._search_request(name, 5), request_id=str(offset))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.warning(f"Batched contact search failed: {e}")
+        
+        for name in pending:
+            if name not in results:
+                results[name] = self.resolve_contact_email(name)
+        return results
+    
     def resolve_attendee_emails(self, attendee_list: str) -> Dict[str, Any]:
         """
         Resolve a comma-separated list of attendee names/emails.
@@ -576,9 +715,10 @@ class GoogleContactsClient:
             unresolved = []
             requires_confirmation = []
             
+            results = self.batch_resolve(attendees)
+            
             for attendee in attendees:
-                result = self.resolve_contact_email(attendee)
-                
+                result = results[attendee]
                 if result['success']:
                     if result.get('requires_confirmation'):
                         requires_confirmation.append(result)
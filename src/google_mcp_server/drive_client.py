@@ -7,12 +7,25 @@ from io import BytesIO
 import base64
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
+from .cache import TTLCache
+from .transport import BATCH_SIZE, authorized_http, build_service
+
 logger = logging.getLogger(__name__)
 
+# get_file metadata is cached briefly; the same file is often looked up several
+# times in a row (e.g. previewing and then sharing it)
+_FILE_CACHE_SIZE = 512
+_FILE_CACHE_TTL = 60
+
+# File IDs that returned 404 are remembered briefly, so retries with a
+# mistyped ID fail fast instead of asking Drive again
+_MISSING_FILE_TTL = 30
+
+_FILE_FIELDS = "id, name, mimeType, size, createdTime, modifiedTime, parents, webViewLink, description"
+
 class GoogleDriveClient:
     """Client for Google Drive API operations."""
     
@@ -24,7 +37,9 @@ class GoogleDriveClient:
             credentials: Valid Google OAuth2 credentials
         """
         self.credentials = credentials
-        self.service = build('drive', 'v3', credentials=credentials)
+        self.service = build_service('drive', 'v3', authorized_http(credentials))
+        self._file_cache = TTLCache(maxsize=_FILE_CACHE_SIZE, ttl=_FILE_CACHE_TTL)
+        self._missing_cache = TTLCache(maxsize=_FILE_CACHE_SIZE, ttl=_MISSING_FILE_TTL)
         
     def _is_google_native_format(self, mime_type: str) -> bool:
         """Check if the MIME type is a Google native format."""
@@ -142,43 +157,35 @@ class GoogleDriveClient:
             include_content: Whether to include file content
             
         Returns:
-            Dictionary containing file metadata and optional content
+            Dictionary containing file metadata and optional content. Metadata-only
+            results may be served from a short-lived cache and must not be mutated.
         """
+        missing = self._missing_cache.get(file_id)
+        if missing is not None:
+            return missing
+        if not include_content:
+            cached = self._file_cache.get(file_id)
+            if cached is not None:
+                return cached
+        
         try:
             # Get file metadata
-            file = self.service.files().get(
-                fileId=file_id,
-                fields="id, name, mimeType, size, createdTime, modifiedTime, parents, webViewLink, description"
-            ).execute()
+            file = self.service.files().get(fileId=file_id, fields=_FILE_FIELDS).execute()
             
-            result = {
-                'success': True,
-                'file': {
-                    'id': file['id'],
-                    'name': file['name'],
-                    'mimeType': file['mimeType'],
-                    'size': file.get('size', 'N/A'),
-                    'createdTime': file['createdTime'],
-                    'modifiedTime': file['modifiedTime'],
-                    'webViewLink': file.get('webViewLink', ''),
-                    'description': file.get('description', ''),
-                    'isFolder': file['mimeType'] == 'application/vnd.google-apps.folder'
-                }
-            }
+            result = self._file_result(file)
             
             # Get file content if requested and it's a text file
             if include_content and not result['file']['isFolder']:
                 content = self._get_file_content(file_id, file['mimeType'])
                 result['file']['content'] = content
+            elif not include_content:
+                self._file_cache.set(file_id, result)
             
             return result
             
         except HttpError as e:
             logger.error(f"HTTP error getting file: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
+            return self._file_error(file_id, e)
         except Exception as e:
             logger.error(f"Error getting file: {e}")
             return {
@@ -186,6 +193,82 @@ class GoogleDriveClient:
                 'error': str(e)
             }
     
+    def get_files(self, file_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metadata for several files with batched requests.
+        
+        Files still in the metadata cache need no lookup. The rest are fetched
+        with one batch request per 50 files.
+        
+        Args:
+            file_ids: Google Drive file IDs
+            
+        Returns:
+            Dictionary mapping each file ID to its get_file result. Results may be
+            served from a short-lived cache and must not be mutated.
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for file_id in dict.fromkeys(file_ids):
+            cached = self._missing_cache.get(file_id) or self._file_cache.get(file_id)
+            if cached is not None:
+                results[file_id] = cached
+            else:
+                pending.append(file_id)
+        
+        def callback(request_id, response, exception):
+            file_id = pending[int(request_id)]
+            if exception is None:
+                results[file_id] = self._file_result(response)
+                self._file_cache.set(file_id, results[file_id])
+            elif isinstance(exception, HttpError):
+                logger.error(f"HTTP error getting file: {exception}")
+                results[file_id] = self._file_error(file_id, exception)
+            else:
+                logger.error(f"Error getting file: {exception}")
+                results[file_id] = {'success': False, 'error': str(exception)}
+        
+        for start in range(0, len(pending), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for i in range(start, min(start + BATCH_SIZE, len(pending))):
+                batch.add(self.service.files().get(fileId=pending[i], fields=_FILE_FIELDS),
+                          request_id=str(i))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.error(f"Error getting files: {e}")
+                for file_id in pending[start:start + BATCH_SIZE]:
+                    results.setdefault(file_id, {'success': False, 'error': str(e)})
+        
+        return results
+    
+    def _file_result(self, file: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a files.get response as a get_file result."""
+        return {
+            'success': True,
+            'file': {
+                'id': file['id'],
+                'name': file['name'],
+                'mimeType': file['mimeType'],
+                'size': file.get('size', 'N/A'),
+                'createdTime': file['createdTime'],
+                'modifiedTime': file['modifiedTime'],
+                'webViewLink': file.get('webViewLink', ''),
+                'description': file.get('description', ''),
+                'isFolder': file['mimeType'] == 'application/vnd.google-apps.folder'
+            }
+        }
+    
+    def _file_error(self, file_id: str, error: HttpError) -> Dict[str, Any]:
+        """Describe a failed files.get, remembering IDs that do not exist."""
+        result = {
+            'success': False,
+            'error': f"HTTP error: {error.resp.status} - {error.content.decode()}"
+        }
+        if error.resp.status == 404:
+            self._missing_cache.set(file_id, result)
+        return result
+    
     def _get_file_content(self, file_id: str, mime_type: str) -> str:
         """
         Get file content based on MIME type.
@@ -478,6 +561,7 @@ class GoogleDriveClient:
             
             # Delete file
             self.service.files().delete(fileId=file_id).execute()
+            self._file_cache.pop(file_id)
             
             return {
                 'success': True,
@@ -588,6 +672,7 @@ class GoogleDriveClient:
                 fields='id, name, parents',
                 supportsAllDrives=True
             ).execute()
+            self._file_cache.pop(file_id)
             
             return {
                 'success': True,
@@ -631,6 +716,7 @@ class GoogleDriveClient:
                 fields='id, name, webViewLink',
                 supportsAllDrives=True
             ).execute()
+            self._file_cache.pop(file_id)
             
             return {
                 'success': True,
@@ -693,6 +779,7 @@ class GoogleDriveClient:
                 fields='id, name, modifiedTime',
                 supportsAllDrives=True
             ).execute()
+            self._file_cache.pop(file_id)
             
             return {
                 'success': True,
@@ -782,31 +869,14 @@ class GoogleDriveClient:
             Dictionary containing share result
         """
         try:
-            # Create permission
-            permission = {
-                'type': 'user',
-                'role': role,
-                'emailAddress': email_address
-            }
-            
             # Share file
-            created_permission = self.service.permissions().create(
-                fileId=file_id,
-                body=permission,
-                sendNotificationEmail=send_notification,
-                emailMessage=message if message else None,
-                fields='id, type, role, emailAddress',
-                supportsAllDrives=True
+            created_permission = self._permission_request(
+                file_id, email_address, role, send_notification, message
             ).execute()
             
             return {
                 'success': True,
-                'permission': {
-                    'id': created_permission['id'],
-                    'type': created_permission['type'],
-                    'role': created_permission['role'],
-                    'emailAddress': created_permission['emailAddress']
-                },
+                'permission': self._permission_result(created_permission),
                 'message': f"File shared with {email_address} as {role}"
             }
             
@@ -823,6 +893,85 @@ class GoogleDriveClient:
                 'error': str(e)
             }
     
+    def share_files(self, file_ids: List[str], email_address: str, role: str = "reader",
+                    send_notification: bool = True, message: str = "") -> Dict[str, Any]:
+        """
+        Share several files with one user, using one batch request per 50 files.
+        
+        Args:
+            file_ids: Google Drive file IDs to share
+            email_address: Email address to share with
+            role: Permission role (reader, writer, commenter)
+            send_notification: Send email notification
+            message: Optional message to include
+            
+        Returns:
+            Dictionary with a result per file and the number shared
+        """
+        file_ids = list(dict.fromkeys(file_ids))
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        def callback(request_id, response, exception):
+            file_id = file_ids[int(request_id)]
+            if exception is None:
+                results[file_id] = {'success': True, 'permission': self._permission_result(response)}
+            elif isinstance(exception, HttpError):
+                logger.error(f"HTTP error sharing file: {exception}")
+                results[file_id] = {
+                    'success': False,
+                    'error': f"HTTP error: {exception.resp.status} - {exception.content.decode()}"
+                }
+            else:
+                logger.error(f"Error sharing file: {exception}")
+                results[file_id] = {'success': False, 'error': str(exception)}
+        
+        for start in range(0, len(file_ids), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for i in range(start, min(start + BATCH_SIZE, len(file_ids))):
+                batch.add(self._permission_request(file_ids[i], email_address, role,
+                                                   send_notification, message),
+                          request_id=str(i))
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.error(f"Error sharing files: {e}")
+                for file_id in file_ids[start:start + BATCH_SIZE]:
+                    results.setdefault(file_id, {'success': False, 'error': str(e)})
+        
+        shared = sum(1 for result in results.values() if result['success'])
+        return {
+            'success': shared > 0,
+            'results': [{'file_id': file_id, **results[file_id]} for file_id in file_ids],
+            'shared': shared,
+            'total': len(file_ids),
+            'message': f"Shared {shared} of {len(file_ids)} files with {email_address} as {role}"
+        }
+    
+    def _permission_request(self, file_id: str, email_address: str, role: str,
+                            send_notification: bool, message: str):
+        """Build a permissions.create request granting a user access to a file."""
+        return self.service.permissions().create(
+            fileId=file_id,
+            body={
+                'type': 'user',
+                'role': role,
+                'emailAddress': email_address
+            },
+            sendNotificationEmail=send_notification,
+            emailMessage=message if message else None,
+            fields='id, type, role, emailAddress',
+            supportsAllDrives=True
+        )
+    
+    def _permission_result(self, permission: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a created permission for share results."""
+        return {
+            'id': permission['id'],
+            'type': permission['type'],
+            'role': permission['role'],
+            'emailAddress': permission['emailAddress']
+        }
+    
     def list_shared_drives(self, max_results: int = 10) -> Dict[str, Any]:
         """
         List available shared drives.
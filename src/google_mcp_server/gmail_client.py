@@ -1,22 +1,309 @@
 """Gmail API client for MCP server."""
 
-import base64
-import json
+import asyncio
+import binascii
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Optional, Any
-import email
+import random
 import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from itertools import islice
+from email.header import Header
+from email.utils import formataddr, getaddresses
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Union
 
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+from .cache import TTLCache
+from .transport import BATCH_SIZE, authorized_http, build_service
+
+try:
+    import pybase64 as _b64
+    _HAVE_PYBASE64 = True
+except ImportError:  # optional speedup, see the "speedups" extra
+    import base64 as _b64
+    _HAVE_PYBASE64 = False
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Gmail allows 250 quota units per second per user and messages.get costs 5,
+# so more than ~10 concurrent metadata fetches only trades latency for 429s.
+_METADATA_WORKERS = 10
+
+# Maximum message IDs returned by one messages.list page
+_LIST_PAGE_LIMIT = 500
+
+# Maximum message IDs accepted by a single messages.batchModify call
+_BATCH_MODIFY_LIMIT = 1000
+
+# Message cache: repeated tool calls in a session (read headers, read body,
+# reply) tend to hit the same message within a minute. Labels rarely change.
+_MESSAGE_CACHE_SIZE = 512
+_MESSAGE_CACHE_TTL = 60
+_LABELS_CACHE_TTL = 300
+
+# Rate-limit and transient server errors worth retrying with backoff
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Sends are not idempotent: after a 5xx the message may already be delivered,
+# so only rate-limit rejections are retried
+_SEND_RETRY_STATUSES = frozenset({429})
+
+# Headers shown in message listings, plus their lowercased lookup set.
+# Header names are case-insensitive and senders do not always use canonical case.
+_SUMMARY_HEADERS = ['From', 'To', 'Subject', 'Date']
+_WANTED_HEADERS = frozenset(name.lower() for name in _SUMMARY_HEADERS)
+
+# Headers needed to thread a reply onto the original message
+_REPLY_HEADERS = ['Message-ID', 'Subject', 'From', 'To', 'References', 'In-Reply-To']
+
+# Leading reply/forward markers, possibly repeated ("Re: RE: Fwd: ...")
+_RE_PREFIX = re.compile(r'^(?:Re:\s*)+', re.IGNORECASE)
+_FWD_PREFIX = re.compile(r'^(?:Fwd?:\s*)+', re.IGNORECASE)
+
+# Keys of a message summary as returned by list_messages
+_MSG_FIELDS = ('id', 'threadId', 'labelIds', 'snippet', 'from', 'to',
+               'subject', 'date', 'internalDate', 'unread')
+
+# Built services keyed by (client_id, refresh_token), so clients created for
+# the same account reuse one Resource and its AuthorizedHttp
+_SERVICE_CACHE: Dict[tuple, tuple] = {}
+
+
+class _OrjsonModel(JsonModel):
+    """JsonModel that parses responses and encodes request bodies with orjson."""
+    
+    def serialize(self, body_value):
+        if isinstance(body_value, dict) and 'data' not in body_value and self._data_wrapper:
+            body_value = {'data': body_value}
+        encoded = orjson.dumps(body_value)
+        # orjson emits raw UTF-8, while the transport and batch serializer expect
+        # an ASCII str like stdlib json.dumps produces; escape the rare
+        # non-ASCII body the stock way.
+        if encoded.isascii():
+            return encoded.decode('ascii')
+        return super().serialize(body_value)
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Let the stock model handle non-JSON bodies the usual way
+            return super().deserialize(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+
+# None lets googleapiclient pick its default JsonModel
+_JSON_MODEL = _OrjsonModel() if orjson is not None else None
+
+def _headers_to_dict(headers: List[Dict[str, str]]) -> Dict[str, str]:
+    """
+    Convert a Gmail payload header list into a name -> value dict.
+    
+    Header names repeat across every message, so they are interned to share
+    one string object per name.
+    """
+    return {sys.intern(h['name']): h['value'] for h in headers}
+
+
+def _pad(data: Union[str, bytes]) -> Union[str, bytes]:
+    """Restore base64 padding that may have been stripped from data."""
+    return data + ('=' if isinstance(data, str) else b'=') * (-len(data) & 3)
+
+
+_URLSAFE_TRANS = bytes.maketrans(b'-_', b'+/')
+
+
+def _decode_into(data: Union[str, bytes], out: bytearray) -> None:
+    """Decode a base64url body part, padded or not, and append it to out."""
+    if _HAVE_PYBASE64:
+        out += _b64.urlsafe_b64decode(_pad(data))
+        return
+    
+    # The stdlib urlsafe decoder always copies the input through translate();
+    # only do that when the URL-safe alphabet actually appears. Padding is
+    # appended only when missing, and after translation so it is copied once.
+    raw = data.encode('ascii') if isinstance(data, str) else data
+    if raw.find(b'-') != -1 or raw.find(b'_') != -1:
+        raw = raw.translate(_URLSAFE_TRANS)
+    pad = -len(raw) & 3
+    if pad:
+        raw += b'=' * pad
+    out += binascii.a2b_base64(raw)
+
+
+# RFC 5322 limit on line length, excluding the CRLF
+_MAX_LINE_BYTES = 998
+
+
+def _header_value(value: str) -> str:
+    """Fold a header value onto one line, RFC 2047 encoding it if non-ASCII."""
+    value = ' '.join(value.splitlines())
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode(linesep='\r\n')
+
+
+def _address_header_value(value: str) -> str:
+    """Like _header_value, but only encodes display names so addresses stay intact."""
+    value = ' '.join(value.splitlines())
+    if value.isascii():
+        return value
+    try:
+        return ', '.join(formataddr(pair, charset='utf-8') for pair in getaddresses([value]))
+    except UnicodeEncodeError:
+        # formataddr rejects non-ASCII addresses; encode the whole value instead
+        return _header_value(value)
+
+
+# Separates the parts of multipart/alternative messages. Parts are always
+# base64 encoded and "=_" cannot occur in base64 output, so it never collides.
+_ALT_BOUNDARY = '=_google-mcp-server-alternative'
+
+
+def _text_part(text: str, subtype: str, allow_8bit: bool = True) -> bytes:
+    """
+    Serialize a text body with its Content-Type and Content-Transfer-Encoding headers.
+    
+    Args:
+        text: Body text
+        subtype: MIME text subtype, e.g. "plain" or "html"
+        allow_8bit: Send as 7bit/8bit when line lengths allow; otherwise base64
+        
+    Returns:
+        Part headers, blank line and encoded body
+    """
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    payload = text.replace('\n', '\r\n').encode('utf-8')
+    # A payload no longer than the limit cannot contain an overlong line
+    if allow_8bit and (len(payload) <= _MAX_LINE_BYTES
+                       or all(len(line) <= _MAX_LINE_BYTES for line in payload.split(b'\r\n'))):
+        encoding = '7bit' if payload.isascii() else '8bit'
+    else:
+        # base64 in 76 character lines
+        encoded = _b64.b64encode(payload)
+        payload = b'\r\n'.join(encoded[i:i + 76] for i in range(0, len(encoded), 76))
+        encoding = 'base64'
+    
+    headers = (f'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+               f"Content-Transfer-Encoding: {encoding}\r\n\r\n")
+    return headers.encode('ascii') + payload
+
+
+def _build_raw(to: str, subject: str, body: str,
+               cc: Optional[str] = None, bcc: Optional[str] = None,
+               html: Optional[str] = None,
+               extra_headers: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Build an RFC 5322 message without going through email.generator.
+    
+    Gmail fills in Date and Message-ID on send, so they are not emitted here.
+    
+    Args:
+        to: Recipient email addresses
+        subject: Email subject
+        body: Plain text body. With html, an empty body omits the text part.
+        cc: CC email addresses (comma-separated)
+        bcc: BCC email addresses (comma-separated)
+        html: HTML body; makes the message multipart/alternative
+        extra_headers: Additional headers, e.g. In-Reply-To and References
+        
+    Returns:
+        Raw message bytes ready to be base64url encoded
+    """
+    headers = [f"To: {_address_header_value(to)}"]
+    if cc:
+        headers.append(f"Cc: {_address_header_value(cc)}")
+    if bcc:
+        headers.append(f"Bcc: {_address_header_value(bcc)}")
+    headers.append(f"Subject: {_header_value(subject)}")
+    for name, value in (extra_headers or {}).items():
+        if value:
+            headers.append(f"{name}: {_header_value(value)}")
+    headers.append('MIME-Version: 1.0')
+    
+    if html is None:
+        return '\r\n'.join(headers).encode('ascii') + b'\r\n' + _text_part(body, 'plain')
+    
+    headers.append(f'Content-Type: multipart/alternative; boundary="{_ALT_BOUNDARY}"')
+    parts = [_text_part(body, 'plain', allow_8bit=False)] if body else []
+    parts.append(_text_part(html, 'html', allow_8bit=False))
+    delimiter = f"--{_ALT_BOUNDARY}\r\n".encode('ascii')
+    return b''.join([
+        '\r\n'.join(headers).encode('ascii'), b'\r\n\r\n',
+        *(delimiter + part + b'\r\n' for part in parts),
+        f"--{_ALT_BOUNDARY}--\r\n".encode('ascii'),
+    ])
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yield successive lists of up to size items from any iterable."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _encode_raw(message: bytes) -> str:
+    """Encode a raw message for the Gmail API as unpadded base64url."""
+    return _b64.urlsafe_b64encode(message).rstrip(b'=').decode('ascii')
+
+
+def _http_err(e: HttpError) -> Dict[str, Any]:
+    """Convert an HttpError into the standard failure result."""
+    return {
+        'success': False,
+        'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
+    }
+
+
+def _guard(action: str):
+    """
+    Turn exceptions raised by a client method into failure results.
+    
+    Args:
+        action: Description used in log messages, e.g. "listing messages"
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            except HttpError as e:
+                logger.error(f"HTTP error {action}: {e}")
+                return _http_err(e)
+            except Exception as e:
+                logger.error(f"Error {action}: {e}")
+                return {
+                    'success': False,
+                    'error': str(e)
+                }
+        return wrapper
+    return decorator
+
+
 class GmailClient:
-    """Client for Gmail API operations."""
+    """
+    Client for Gmail API operations.
+    
+    Create one client per set of credentials and reuse it; it keeps response
+    caches and shares pooled connections. Call close() (or use it as a context
+    manager) when done to drop cached data and idle connections.
+    """
     
     def __init__(self, credentials: Credentials):
         """
@@ -26,11 +313,77 @@ class GmailClient:
             credentials: Valid Google OAuth2 credentials
         """
         self.credentials = credentials
-        self.service = build('gmail', 'v1', credentials=credentials)
+        self._message_cache = TTLCache(maxsize=_MESSAGE_CACHE_SIZE, ttl=_MESSAGE_CACHE_TTL)
+        self._labels_cache = TTLCache(maxsize=1, ttl=_LABELS_CACHE_TTL)
+        
+        # Only credentials that can refresh identify an account reliably
+        refresh_token = getattr(credentials, 'refresh_token', None)
+        self._service_key = (getattr(credentials, 'client_id', None), refresh_token) if refresh_token else None
+        
+        cached = _SERVICE_CACHE.get(self._service_key) if self._service_key else None
+        if cached:
+            self._http, self.service = cached
+            return
+        
+        self._http = authorized_http(credentials)
+        self.service = build_service('gmail', 'v1', self._http, model=_JSON_MODEL)
+        if self._service_key:
+            _SERVICE_CACHE[self._service_key] = (self._http, self.service)
+    
+    def close(self) -> None:
+        """
+        Drop cached responses and the cached service.
+        
+        Connections are left open: they belong to the transport shared by all
+        Google API clients, not to this client.
+        """
+        self._message_cache.clear()
+        self._labels_cache.clear()
+        if self._service_key:
+            _SERVICE_CACHE.pop(self._service_key, None)
+    
+    def __enter__(self) -> 'GmailClient':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
+    def _execute_with_retry(self, request, max_attempts: int = 5,
+                            statuses: frozenset = _RETRY_STATUSES, **kwargs) -> Any:
+        """
+        Execute an API request, retrying rate-limit and transient errors.
+        
+        Retries use exponential backoff with jitter, capped at 32 seconds.
         
+        Args:
+            request: googleapiclient HttpRequest to execute
+            max_attempts: Maximum number of attempts before giving up
+            statuses: HTTP statuses that are retried; others are raised at once
+            **kwargs: Extra arguments passed through to request.execute()
+            
+        Returns:
+            Deserialized API response
+        """
+        for attempt in range(max_attempts):
+            try:
+                return request.execute(**kwargs)
+            except HttpError as e:
+                if e.resp.status not in statuses or attempt == max_attempts - 1:
+                    raise
+                delay = min(2 ** attempt + random.random(), 32)
+                logger.warning(f"Gmail API returned {e.resp.status}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _invalidate_message(self, *message_ids: str) -> None:
+        """Drop every cached copy of the given messages after their labels change."""
+        ids = set(message_ids)
+        self._message_cache.discard_where(lambda key: key[0] in ids)
+    
+    @_guard("listing messages")
     def list_messages(self, query: Optional[str] = None,
                       max_results: int = 10,
-                      include_spam_trash: bool = False) -> Dict[str, Any]:
+                      include_spam_trash: bool = False,
+                      enrich: bool = True) -> Dict[str, Any]:
         """
         List Gmail messages.
         
@@ -38,164 +391,261 @@ class GmailClient:
             query: Gmail search query
             max_results: Maximum number of results
             include_spam_trash: Include spam and trash folders
+            enrich: Fetch headers, snippet and labels for each message. When False
+                only ids are returned, saving a request per message.
             
         Returns:
             Dictionary containing message list
         """
-        try:
-            # Execute search
-            results = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_results,
-                includeSpamTrash=include_spam_trash
-            ).execute()
-            
-            messages = results.get('messages', [])
-            
-            # Get basic info for each message
-            message_list = []
-            for msg in messages:
-                try:
-                    # Get message metadata
-                    message = self.service.users().messages().get(
-                        userId='me',
-                        id=msg['id'],
-                        format='metadata',
-                        metadataHeaders=['From', 'To', 'Subject', 'Date']
-                    ).execute()
-                    
-                    # Extract headers
-                    headers = {}
-                    for header in message['payload'].get('headers', []):
-                        headers[header['name']] = header['value']
-                    
-                    message_info = {
-                        'id': message['id'],
-                        'threadId': message['threadId'],
-                        'labelIds': message.get('labelIds', []),
-                        'snippet': message.get('snippet', ''),
-                        'from': headers.get('From', ''),
-                        'to': headers.get('To', ''),
-                        'subject': headers.get('Subject', ''),
-                        'date': headers.get('Date', ''),
-                        'internalDate': message.get('internalDate', ''),
-                        'unread': 'UNREAD' in message.get('labelIds', [])
-                    }
-                    message_list.append(message_info)
-                    
-                except Exception as e:
-                    logger.warning(f"Error getting message {msg['id']}: {e}")
-                    continue
+        # Execute search
+        results = self._execute_with_retry(self.service.users().messages().list(
+            userId='me',
+            q=query,
+            maxResults=max_results,
+            includeSpamTrash=include_spam_trash,
+            fields='messages(id,threadId),resultSizeEstimate'
+        ))
+        
+        messages = results.get('messages', [])
+        
+        # Fetch metadata for all messages in batched requests
+        message_list = []
+        if not enrich:
+            message_list = [{'id': m['id'], 'threadId': m.get('threadId', '')} for m in messages]
+        elif messages:
+            responses = self.get_messages_metadata(
+                [m['id'] for m in messages],
+                _SUMMARY_HEADERS,
+                fields='id,threadId,labelIds,snippet,internalDate,payload/headers'
+            )
+            summarize = self._summarize_message
+            message_list = [summarize(m) for m in responses if m is not None]
+        
+        return {
+            'success': True,
+            'messages': message_list,
+            'totalMessages': len(message_list),
+            'query': query or 'all messages',
+            'resultSizeEstimate': results.get('resultSizeEstimate', 0)
+        }
+    
+    def _execute_batch(self, requests: List[Any]) -> List[Any]:
+        """
+        Execute requests through the batch endpoint, BATCH_SIZE at a time.
+        
+        Args:
+            requests: googleapiclient HttpRequests to execute
             
-            return {
-                'success': True,
-                'messages': message_list,
-                'totalMessages': len(message_list),
-                'query': query or 'all messages',
-                'resultSizeEstimate': results.get('resultSizeEstimate', 0)
-            }
+        Returns:
+            One entry per request, in order: the response, or the exception
+            raised for that sub-request
+        """
+        results: List[Any] = [None] * len(requests)
+        
+        def callback(request_id, response, exception):
+            results[int(request_id)] = exception if exception is not None else response
+        
+        new_batch = self.service.new_batch_http_request
+        for start in range(0, len(requests), BATCH_SIZE):
+            batch = new_batch(callback=callback)
+            add = batch.add
+            for i in range(start, min(start + BATCH_SIZE, len(requests))):
+                add(requests[i], request_id=str(i))
+            self._execute_with_retry(batch)
+        
+        return results
+    
+    def _execute_each(self, requests: List[Any]) -> List[Any]:
+        """
+        Execute requests individually on a small thread pool.
+        
+        Used when the batch endpoint fails or rate limits some sub-requests.
+        Each request gets the usual retry with backoff, and the shared
+        transport gives each worker thread its own connection pool.
+        
+        Args:
+            requests: googleapiclient HttpRequests to execute
             
-        except HttpError as e:
-            logger.error(f"HTTP error listing messages: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
+        Returns:
+            One entry per request, in order: the response, or the exception it raised
+        """
+        def run(request):
+            try:
+                return self._execute_with_retry(request)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=min(_METADATA_WORKERS, len(requests))) as executor:
+            return list(executor.map(run, requests))
+    
+    def _execute_many(self, requests: List[Any], what: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Execute many independent requests, batched where possible.
+        
+        Args:
+            requests: googleapiclient HttpRequests to execute
+            what: Description of the requests for log messages, e.g. "message"
+            
+        Returns:
+            Responses in request order, with None for requests that failed
+        """
+        if not requests:
+            return []
+        
+        try:
+            results = self._execute_batch(requests)
         except Exception as e:
-            logger.error(f"Error listing messages: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            logger.warning(f"Batch request failed, fetching each {what} individually: {e}")
+            results = self._execute_each(requests)
+        else:
+            # Sub-requests that were rate limited or hit a transient error are
+            # retried one by one rather than failing the whole listing
+            retry = [i for i, result in enumerate(results)
+                     if isinstance(result, HttpError) and result.resp.status in _RETRY_STATUSES]
+            if retry:
+                logger.warning(f"Retrying {len(retry)} {what} requests outside the batch")
+                for i, result in zip(retry, self._execute_each([requests[i] for i in retry])):
+                    results[i] = result
+        
+        responses = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Error getting {what}: {result}")
+                result = None
+            responses.append(result)
+        return responses
+    
+    def get_messages_metadata(self, message_ids: List[str], headers: List[str],
+                              fields: Optional[str] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch metadata for many messages with as few HTTP round trips as possible.
+        
+        Unlike the tool-facing methods this returns the raw message resources,
+        for callers that build their own summaries.
+        
+        Args:
+            message_ids: Gmail message IDs
+            headers: Header names to include in the metadata
+            fields: Optional partial response mask
+            
+        Returns:
+            Raw message resources in the order of message_ids, with None for
+            messages that could not be fetched
+        """
+        request_args = {'fields': fields} if fields else {}
+        get = self.service.users().messages().get
+        requests = [
+            get(userId='me', id=message_id, format='metadata',
+                metadataHeaders=headers, **request_args)
+            for message_id in message_ids
+        ]
+        return self._execute_many(requests, 'message')
+    
+    @staticmethod
+    def _summarize_message(message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the list_messages summary for a metadata-format message.
+        
+        Args:
+            message: Message resource fetched with format='metadata'
+            
+        Returns:
+            Summary dictionary for the message
+        """
+        # Extract headers, keyed by lowercased name
+        headers = {h['name'].lower(): h['value']
+                   for h in message['payload'].get('headers', ())
+                   if h['name'].lower() in _WANTED_HEADERS}
+        
+        labels = message.get('labelIds') or []
+        return dict(zip(_MSG_FIELDS, (
+            message['id'],
+            message['threadId'],
+            labels,
+            message.get('snippet', ''),
+            headers.get('from', ''),
+            headers.get('to', ''),
+            headers.get('subject', ''),
+            headers.get('date', ''),
+            message.get('internalDate', ''),
+            'UNREAD' in labels
+        )))
     
-    def get_message(self, message_id: str, format: str = 'full') -> Dict[str, Any]:
+    @_guard("getting message")
+    def get_message(self, message_id: str, format: str = 'full',
+                    want_body: bool = True) -> Dict[str, Any]:
         """
         Get a specific Gmail message.
         
         Args:
             message_id: Gmail message ID
             format: Message format (minimal, raw, full, metadata)
+            want_body: Decode and return the message body. When False the body
+                is not downloaded at all.
             
         Returns:
             Dictionary containing message details
         """
-        try:
-            # Get message
-            message = self.service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format=format
-            ).execute()
-            
-            # Extract headers
-            headers = {}
-            if 'payload' in message and 'headers' in message['payload']:
-                for header in message['payload']['headers']:
-                    headers[header['name']] = header['value']
-            
-            result = {
-                'success': True,
-                'message': {
-                    'id': message['id'],
-                    'threadId': message['threadId'],
-                    'labelIds': message.get('labelIds', []),
-                    'snippet': message.get('snippet', ''),
-                    'historyId': message.get('historyId', ''),
-                    'internalDate': message.get('internalDate', ''),
-                    'headers': headers,
-                    'unread': 'UNREAD' in message.get('labelIds', [])
-                }
-            }
-            
-            # Extract body based on format
-            if format in ['full', 'raw']:
-                body = self._extract_message_body(message)
-                result['message']['body'] = body
-            
-            return result
-            
-        except HttpError as e:
-            logger.error(f"HTTP error getting message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error getting message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
+        cache_key = (message_id, format, want_body)
+        cached = self._message_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        request_args = {}
+        if not want_body:
+            request_args['fields'] = 'id,threadId,labelIds,snippet,historyId,internalDate,payload/headers'
+        
+        # Get message
+        message = self._execute_with_retry(self.service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format=format,
+            **request_args
+        ))
+        
+        # Extract headers
+        headers = _headers_to_dict(message.get('payload', {}).get('headers', ()))
+        labels = message.get('labelIds') or []
+        
+        result = {
+            'success': True,
+            'message': {
+                'id': message['id'],
+                'threadId': message['threadId'],
+                'labelIds': labels,
+                'snippet': message.get('snippet', ''),
+                'historyId': message.get('historyId', ''),
+                'internalDate': message.get('internalDate', ''),
+                'headers': headers,
+                'unread': 'UNREAD' in labels
             }
+        }
+        
+        # Extract body based on format
+        if want_body and format in ['full', 'raw']:
+            body = self._extract_message_body(message)
+            result['message']['body'] = body
+        
+        self._message_cache.set(cache_key, result)
+        return result
     
-    def _extract_message_body(self, message: Dict) -> Dict[str, str]:
+    def _extract_message_body(self, message: Dict, prefer_text: bool = False) -> Dict[str, str]:
         """
         Extract message body from Gmail message payload.
         
         Args:
             message: Gmail message object
+            prefer_text: Only decode html parts if the message has no plain text
+                part, for callers that use html solely as a fallback
             
         Returns:
             Dictionary with text and/or html body
         """
-        body = {'text': '', 'html': ''}
-        
-        def extract_parts(parts):
-            for part in parts:
-                mime_type = part.get('mimeType', '')
-                
-                if mime_type == 'text/plain':
-                    data = part.get('body', {}).get('data', '')
-                    if data:
-                        body['text'] += base64.urlsafe_b64decode(data).decode('utf-8')
-                        
-                elif mime_type == 'text/html':
-                    data = part.get('body', {}).get('data', '')
-                    if data:
-                        body['html'] += base64.urlsafe_b64decode(data).decode('utf-8')
-                        
-                elif 'parts' in part:
-                    extract_parts(part['parts'])
+        # Decode into growable byte buffers and convert to str once at the end;
+        # repeated str += is quadratic
+        text_buf = bytearray()
+        html_buf = bytearray()
+        deferred_html = []
         
         payload = message.get('payload', {})
         
@@ -205,19 +655,40 @@ class GmailClient:
             data = payload.get('body', {}).get('data', '')
             
             if data:
-                decoded_data = base64.urlsafe_b64decode(data).decode('utf-8')
+                _decode_into(data, html_buf if mime_type == 'text/html' else text_buf)
+        else:
+            # Multi-part message: walk the part tree depth-first with an explicit
+            # stack, pushing children reversed so parts are visited in order
+            stack = payload['parts'][::-1]
+            while stack:
+                part = stack.pop()
+                mime_type = part.get('mimeType', '')
+                
                 if mime_type == 'text/plain':
-                    body['text'] = decoded_data
+                    data = part.get('body', {}).get('data', '')
+                    if data:
+                        _decode_into(data, text_buf)
                 elif mime_type == 'text/html':
-                    body['html'] = decoded_data
-                else:
-                    body['text'] = decoded_data
-        else:
-            # Multi-part message
-            extract_parts(payload['parts'])
+                    data = part.get('body', {}).get('data', '')
+                    if data:
+                        if prefer_text:
+                            deferred_html.append(data)
+                        else:
+                            _decode_into(data, html_buf)
+                elif 'parts' in part:
+                    stack.extend(reversed(part['parts']))
+            
+            if deferred_html and not text_buf:
+                for data in deferred_html:
+                    _decode_into(data, html_buf)
         
-        return body
+        # Parts in legacy charsets should not make the whole message unreadable
+        return {
+            'text': text_buf.decode('utf-8', 'replace'),
+            'html': html_buf.decode('utf-8', 'replace')
+        }
     
+    @_guard("sending message")
     def send_message(self, to: str, subject: str, body: str,
                      cc: Optional[str] = None, bcc: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -233,48 +704,25 @@ class GmailClient:
         Returns:
             Dictionary containing send result
         """
-        try:
-            # Create message
-            message = MIMEText(body)
-            message['to'] = to
-            message['subject'] = subject
-            
-            if cc:
-                message['cc'] = cc
-            if bcc:
-                message['bcc'] = bcc
-            
-            # Encode message
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            
-            # Send message
-            sent_message = self.service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': {
-                    'id': sent_message['id'],
-                    'threadId': sent_message['threadId'],
-                    'labelIds': sent_message.get('labelIds', [])
-                },
-                'result': f"Message sent successfully to {to}"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error sending message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error sending message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Build and encode message
+        raw_message = _encode_raw(_build_raw(to, subject, body, cc, bcc))
+        
+        # Send message
+        sent_message = self._execute_with_retry(self.service.users().messages().send(
+            userId='me',
+            body={'raw': raw_message},
+            fields='id,threadId,labelIds'
+        ), statuses=_SEND_RETRY_STATUSES)
+        
+        return {
+            'success': True,
+            'message': {
+                'id': sent_message['id'],
+                'threadId': sent_message['threadId'],
+                'labelIds': sent_message.get('labelIds', [])
+            },
+            'result': f"Message sent successfully to {to}"
+        }
     
     def search_messages(self, query: str, max_results: int = 10) -> Dict[str, Any]:
         """
@@ -289,6 +737,7 @@ class GmailClient:
         """
         return self.list_messages(query=query, max_results=max_results)
     
+    @_guard("marking message as read")
     def mark_as_read(self, message_id: str) -> Dict[str, Any]:
         """
         Mark a message as read.
@@ -299,32 +748,21 @@ class GmailClient:
         Returns:
             Dictionary containing result
         """
-        try:
-            # Remove UNREAD label
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'removeLabelIds': ['UNREAD']}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': f"Message {message_id} marked as read"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error marking message as read: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error marking message as read: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Remove UNREAD label
+        self._execute_with_retry(self.service.users().messages().modify(
+            userId='me',
+            id=message_id,
+            body={'removeLabelIds': ['UNREAD']},
+            fields='id'
+        ))
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Message {message_id} marked as read"
+        }
     
+    @_guard("marking message as unread")
     def mark_as_unread(self, message_id: str) -> Dict[str, Any]:
         """
         Mark a message as unread.
@@ -335,32 +773,21 @@ class GmailClient:
         Returns:
             Dictionary containing result
         """
-        try:
-            # Add UNREAD label
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'addLabelIds': ['UNREAD']}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': f"Message {message_id} marked as unread"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error marking message as unread: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error marking message as unread: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Add UNREAD label
+        self._execute_with_retry(self.service.users().messages().modify(
+            userId='me',
+            id=message_id,
+            body={'addLabelIds': ['UNREAD']},
+            fields='id'
+        ))
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Message {message_id} marked as unread"
+        }
     
+    @_guard("getting labels")
     def get_labels(self) -> Dict[str, Any]:
         """
         Get Gmail labels.
@@ -368,42 +795,48 @@ class GmailClient:
         Returns:
             Dictionary containing labels
         """
-        try:
-            results = self.service.users().labels().list(userId='me').execute()
-            labels = results.get('labels', [])
-            
-            formatted_labels = []
-            for label in labels:
-                formatted_label = {
-                    'id': label['id'],
-                    'name': label['name'],
-                    'type': label['type'],
-                    'messagesTotal': label.get('messagesTotal', 0),
-                    'messagesUnread': label.get('messagesUnread', 0),
-                    'threadsTotal': label.get('threadsTotal', 0),
-                    'threadsUnread': label.get('threadsUnread', 0)
-                }
-                formatted_labels.append(formatted_label)
-            
-            return {
-                'success': True,
-                'labels': formatted_labels,
-                'totalLabels': len(formatted_labels)
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error getting labels: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error getting labels: {e}")
-            return {
-                'success': False,
-                'error': str(e)
+        cached = self._labels_cache.get('labels')
+        if cached is not None:
+            return cached
+        
+        results = self._execute_with_retry(self.service.users().labels().list(
+            userId='me',
+            fields='labels(id,name,type,messagesTotal,messagesUnread,threadsTotal,threadsUnread)'
+        ))
+        labels = results.get('labels', [])
+        
+        formatted_labels = [
+            {
+                'id': label['id'],
+                'name': label['name'],
+                'type': label['type'],
+                'messagesTotal': label.get('messagesTotal', 0),
+                'messagesUnread': label.get('messagesUnread', 0),
+                'threadsTotal': label.get('threadsTotal', 0),
+                'threadsUnread': label.get('threadsUnread', 0)
             }
+            for label in labels
+        ]
+        
+        result = {
+            'success': True,
+            'labels': formatted_labels,
+            'totalLabels': len(formatted_labels)
+        }
+        self._labels_cache.set('labels', result)
+        return result
     
+    def invalidate_labels(self) -> None:
+        """
+        Drop the cached get_labels() result.
+        
+        Call this after creating, renaming or deleting labels outside this client
+        so the next get_labels() call fetches a fresh list. Message counts in the
+        cached result are otherwise allowed to lag by up to the cache TTL.
+        """
+        self._labels_cache.clear()
+    
+    @_guard("replying to message")
     def reply_to_message(self, message_id: str, body: str, 
                         include_original: bool = True) -> Dict[str, Any]:
         """
@@ -417,54 +850,45 @@ class GmailClient:
         Returns:
             Dictionary containing reply result
         """
-        try:
-            # Get original message
-            original_message = self.service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format='metadata',
-                metadataHeaders=['Message-ID', 'Subject', 'From', 'To', 'References', 'In-Reply-To']
-            ).execute()
-            
-            headers = {h['name']: h['value'] for h in original_message['payload']['headers']}
-            
-            # Create reply message
-            reply = MIMEText(body)
-            reply['to'] = headers.get('From', '')
-            reply['subject'] = f"Re: {headers.get('Subject', '').replace('Re: ', '')}"
-            reply['in-reply-to'] = headers.get('Message-ID', '')
-            reply['references'] = f"{headers.get('References', '')} {headers.get('Message-ID', '')}".strip()
-            
-            # Encode and send
-            raw_reply = base64.urlsafe_b64encode(reply.as_bytes()).decode()
-            
-            sent_reply = self.service.users().messages().send(
-                userId='me',
-                body={'raw': raw_reply, 'threadId': original_message['threadId']}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': {
-                    'id': sent_reply['id'],
-                    'threadId': sent_reply['threadId']
-                },
-                'result': f"Reply sent successfully"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error replying to message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error replying to message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
+        # Get original message
+        original_message = self.service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='metadata',
+            metadataHeaders=_REPLY_HEADERS
+        ).execute()
+        
+        headers = _headers_to_dict(original_message['payload']['headers'])
+        
+        # Create reply message
+        reply = _build_raw(
+            to=headers.get('From', ''),
+            subject=f"Re: {_RE_PREFIX.sub('', headers.get('Subject', ''))}",
+            body=body,
+            extra_headers={
+                'In-Reply-To': headers.get('Message-ID', ''),
+                'References': f"{headers.get('References', '')} {headers.get('Message-ID', '')}".strip()
             }
+        )
+        
+        # Encode and send
+        raw_reply = _encode_raw(reply)
+        
+        sent_reply = self.service.users().messages().send(
+            userId='me',
+            body={'raw': raw_reply, 'threadId': original_message['threadId']}
+        ).execute()
+        
+        return {
+            'success': True,
+            'message': {
+                'id': sent_reply['id'],
+                'threadId': sent_reply['threadId']
+            },
+            'result': "Reply sent successfully"
+        }
     
+    @_guard("forwarding message")
     def forward_message(self, message_id: str, to: str, body: str = "") -> Dict[str, Any]:
         """
         Forward a Gmail message.
@@ -477,59 +901,44 @@ class GmailClient:
         Returns:
             Dictionary containing forward result
         """
-        try:
-            # Get original message
-            original_message = self.service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format='full'
-            ).execute()
-            
-            headers = {h['name']: h['value'] for h in original_message['payload']['headers']}
-            original_body = self._extract_message_body(original_message)
-            
-            # Create forward message
-            forward_text = f"{body}\n\n---------- Forwarded message ---------\n"
-            forward_text += f"From: {headers.get('From', '')}\n"
-            forward_text += f"Date: {headers.get('Date', '')}\n"
-            forward_text += f"Subject: {headers.get('Subject', '')}\n"
-            forward_text += f"To: {headers.get('To', '')}\n\n"
-            forward_text += original_body.get('text', original_body.get('html', ''))
-            
-            forward = MIMEText(forward_text)
-            forward['to'] = to
-            forward['subject'] = f"Fwd: {headers.get('Subject', '')}"
-            
-            # Encode and send
-            raw_forward = base64.urlsafe_b64encode(forward.as_bytes()).decode()
-            
-            sent_forward = self.service.users().messages().send(
-                userId='me',
-                body={'raw': raw_forward}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': {
-                    'id': sent_forward['id'],
-                    'threadId': sent_forward['threadId']
-                },
-                'result': f"Message forwarded successfully to {to}"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error forwarding message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error forwarding message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Get original message
+        original_message = self.service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='full'
+        ).execute()
+        
+        headers = _headers_to_dict(original_message['payload']['headers'])
+        original_body = self._extract_message_body(original_message, prefer_text=True)
+        
+        # Create forward message
+        forward_text = f"{body}\n\n---------- Forwarded message ---------\n"
+        forward_text += f"From: {headers.get('From', '')}\n"
+        forward_text += f"Date: {headers.get('Date', '')}\n"
+        forward_text += f"Subject: {headers.get('Subject', '')}\n"
+        forward_text += f"To: {headers.get('To', '')}\n\n"
+        forward_text += original_body['text'] or original_body['html']
+        
+        forward = _build_raw(to, f"Fwd: {_FWD_PREFIX.sub('', headers.get('Subject', ''))}", forward_text)
+        
+        # Encode and send
+        raw_forward = _encode_raw(forward)
+        
+        sent_forward = self.service.users().messages().send(
+            userId='me',
+            body={'raw': raw_forward}
+        ).execute()
+        
+        return {
+            'success': True,
+            'message': {
+                'id': sent_forward['id'],
+                'threadId': sent_forward['threadId']
+            },
+            'result': f"Message forwarded successfully to {to}"
+        }
     
+    @_guard("sending HTML message")
     def send_html_message(self, to: str, subject: str, html_body: str,
                          text_body: str = "", cc: Optional[str] = None, 
                          bcc: Optional[str] = None) -> Dict[str, Any]:
@@ -547,55 +956,27 @@ class GmailClient:
         Returns:
             Dictionary containing send result
         """
-        try:
-            # Create multipart message
-            message = MIMEMultipart('alternative')
-            message['to'] = to
-            message['subject'] = subject
-            
-            if cc:
-                message['cc'] = cc
-            if bcc:
-                message['bcc'] = bcc
-            
-            # Add text and HTML parts
-            if text_body:
-                text_part = MIMEText(text_body, 'plain')
-                message.attach(text_part)
-            
-            html_part = MIMEText(html_body, 'html')
-            message.attach(html_part)
-            
-            # Encode and send
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            
-            sent_message = self.service.users().messages().send(
-                userId='me',
-                body={'raw': raw_message}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': {
-                    'id': sent_message['id'],
-                    'threadId': sent_message['threadId']
-                },
-                'result': f"HTML message sent successfully to {to}"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error sending HTML message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error sending HTML message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Create multipart message with text and HTML parts
+        message = _build_raw(to, subject, text_body, cc, bcc, html=html_body)
+        
+        # Encode and send
+        raw_message = _encode_raw(message)
+        
+        sent_message = self.service.users().messages().send(
+            userId='me',
+            body={'raw': raw_message}
+        ).execute()
+        
+        return {
+            'success': True,
+            'message': {
+                'id': sent_message['id'],
+                'threadId': sent_message['threadId']
+            },
+            'result': f"HTML message sent successfully to {to}"
+        }
     
+    @_guard("archiving message")
     def archive_message(self, message_id: str) -> Dict[str, Any]:
         """
         Archive a Gmail message.
@@ -606,32 +987,21 @@ class GmailClient:
         Returns:
             Dictionary containing archive result
         """
-        try:
-            # Remove INBOX label to archive
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'removeLabelIds': ['INBOX']}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': f"Message {message_id} archived successfully"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error archiving message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error archiving message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Remove INBOX label to archive
+        self.service.users().messages().modify(
+            userId='me',
+            id=message_id,
+            body={'removeLabelIds': ['INBOX']},
+            fields='id'
+        ).execute()
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Message {message_id} archived successfully"
+        }
     
+    @_guard("deleting message")
     def delete_message(self, message_id: str) -> Dict[str, Any]:
         """
         Delete a Gmail message (move to trash).
@@ -642,31 +1012,20 @@ class GmailClient:
         Returns:
             Dictionary containing delete result
         """
-        try:
-            # Move to trash
-            self.service.users().messages().trash(
-                userId='me',
-                id=message_id
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': f"Message {message_id} moved to trash successfully"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error deleting message: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error deleting message: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Move to trash
+        self.service.users().messages().trash(
+            userId='me',
+            id=message_id,
+            fields='id'
+        ).execute()
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Message {message_id} moved to trash successfully"
+        }
     
+    @_guard("adding labels")
     def add_label(self, message_id: str, label_ids: List[str]) -> Dict[str, Any]:
         """
         Add labels to a Gmail message.
@@ -678,31 +1037,20 @@ class GmailClient:
         Returns:
             Dictionary containing result
         """
-        try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'addLabelIds': label_ids}
-            ).execute()
-            
-            return {
-                'success': True,
-                'message': f"Labels {label_ids} added to message {message_id}"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error adding labels: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error adding labels: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        self.service.users().messages().modify(
+            userId='me',
+            id=message_id,
+            body={'addLabelIds': label_ids},
+            fields='id'
+        ).execute()
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Labels {label_ids} added to message {message_id}"
+        }
     
+    @_guard("removing labels")
     def remove_label(self, message_id: str, label_ids: List[str]) -> Dict[str, Any]:
         """
         Remove labels from a Gmail message.
@@ -714,31 +1062,102 @@ class GmailClient:
         Returns:
             Dictionary containing result
         """
-        try:
-            self.service.users().messages().modify(
-                userId='me',
-                id=message_id,
-                body={'removeLabelIds': label_ids}
-            ).execute()
+        self.service.users().messages().modify(
+            userId='me',
+            id=message_id,
+            body={'removeLabelIds': label_ids},
+            fields='id'
+        ).execute()
+        self._invalidate_message(message_id)
+        
+        return {
+            'success': True,
+            'message': f"Labels {label_ids} removed from message {message_id}"
+        }
+    
+    def _batch_modify(self, message_ids: Iterable[str], add_labels: Optional[List[str]] = None,
+                      remove_labels: Optional[List[str]] = None,
+                      batch_size: int = _BATCH_MODIFY_LIMIT) -> List[int]:
+        """
+        Apply label changes to many messages with messages.batchModify.
+        
+        A single chunk is sent on its own and raises on failure. Several chunks
+        go out together through the batch endpoint; a chunk that still fails
+        after retries is logged and counted as 0.
+        
+        Args:
+            message_ids: Gmail message IDs, as any iterable
+            add_labels: Label IDs to add
+            remove_labels: Label IDs to remove
+            batch_size: Message IDs per batchModify call (at most 1000)
             
-            return {
-                'success': True,
-                'message': f"Labels {label_ids} removed from message {message_id}"
-            }
+        Returns:
+            Number of messages modified by each batchModify call, in order
+        """
+        batch_modify = self.service.users().messages().batchModify
+        chunks = list(_chunks(message_ids, batch_size))
+        requests = []
+        for chunk in chunks:
+            body = {'ids': chunk}
+            if add_labels:
+                body['addLabelIds'] = add_labels
+            if remove_labels:
+                body['removeLabelIds'] = remove_labels
+            requests.append(batch_modify(userId='me', body=body))
+        
+        try:
+            if len(requests) == 1:
+                self._execute_with_retry(requests[0])
+                return [len(chunks[0])]
+            responses = self._execute_many(requests, 'batchModify')
+            return [len(chunk) if response is not None else 0
+                    for chunk, response in zip(chunks, responses)]
+        finally:
+            # Invalidate even after a failure, since part of it may have applied
+            for chunk in chunks:
+                self._invalidate_message(*chunk)
+    
+    @_guard("modifying messages")
+    def batch_modify_messages(self, message_ids: List[str], add_labels: Optional[List[str]] = None,
+                              remove_labels: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Add and/or remove labels on a list of messages in as few calls as possible.
+        
+        Up to 1000 messages are changed per request. For a single message the
+        per-message methods (mark_as_read, add_label, ...) are cheaper: a
+        batchModify call costs 50 quota units against 5 for modify.
+        
+        Args:
+            message_ids: Gmail message IDs
+            add_labels: Label IDs to add
+            remove_labels: Label IDs to remove
             
-        except HttpError as e:
-            logger.error(f"HTTP error removing labels: {e}")
+        Returns:
+            Dictionary containing result
+        """
+        if not add_labels and not remove_labels:
             return {
                 'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
+                'error': 'At least one of add_labels or remove_labels must be specified'
             }
-        except Exception as e:
-            logger.error(f"Error removing labels: {e}")
-            return {
-                'success': False,
-                'error': str(e)
+        
+        message_ids = list(message_ids)
+        processed = sum(self._batch_modify(message_ids, add_labels, remove_labels))
+        if processed < len(message_ids):
+            message = f"Modified {processed} of {len(message_ids)} messages"
+        else:
+            message = f"Modified {processed} messages"
+        return {
+            'success': processed > 0 or not message_ids,
+            'message': message,
+            'processed': processed,
+            'operations': {
+                'added_labels': add_labels or [],
+                'removed_labels': remove_labels or []
             }
+        }
     
+    @_guard("creating draft")
     def create_draft(self, to: str, subject: str, body: str,
                     cc: Optional[str] = None, bcc: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -754,51 +1173,28 @@ class GmailClient:
         Returns:
             Dictionary containing draft creation result
         """
-        try:
-            # Create message
-            message = MIMEText(body)
-            message['to'] = to
-            message['subject'] = subject
-            
-            if cc:
-                message['cc'] = cc
-            if bcc:
-                message['bcc'] = bcc
-            
-            # Encode message
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-            
-            # Create draft
-            draft = self.service.users().drafts().create(
-                userId='me',
-                body={'message': {'raw': raw_message}}
-            ).execute()
-            
-            return {
-                'success': True,
-                'draft': {
-                    'id': draft['id'],
-                    'message': {
-                        'id': draft['message']['id'],
-                        'threadId': draft['message']['threadId']
-                    }
-                },
-                'result': f"Draft created successfully"
-            }
-            
-        except HttpError as e:
-            logger.error(f"HTTP error creating draft: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error creating draft: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        # Build and encode message
+        raw_message = _encode_raw(_build_raw(to, subject, body, cc, bcc))
+        
+        # Create draft
+        draft = self.service.users().drafts().create(
+            userId='me',
+            body={'message': {'raw': raw_message}}
+        ).execute()
+        
+        return {
+            'success': True,
+            'draft': {
+                'id': draft['id'],
+                'message': {
+                    'id': draft['message']['id'],
+                    'threadId': draft['message']['threadId']
+                }
+            },
+            'result': "Draft created successfully"
+        }
     
+    @_guard("listing drafts")
     def list_drafts(self, max_results: int = 10) -> Dict[str, Any]:
         """
         List Gmail drafts.
@@ -809,55 +1205,76 @@ class GmailClient:
         Returns:
             Dictionary containing drafts list
         """
-        try:
-            results = self.service.users().drafts().list(
-                userId='me',
-                maxResults=max_results
-            ).execute()
-            
-            drafts = results.get('drafts', [])
-            
-            formatted_drafts = []
-            for draft in drafts:
-                # Get draft details
-                draft_details = self.service.users().drafts().get(
-                    userId='me',
-                    id=draft['id'],
-                    format='metadata',
-                    metadataHeaders=['Subject', 'From', 'To', 'Date']
-                ).execute()
-                
-                headers = {h['name']: h['value'] for h in draft_details['message']['payload']['headers']}
-                
-                formatted_draft = {
-                    'id': draft['id'],
-                    'messageId': draft_details['message']['id'],
-                    'threadId': draft_details['message']['threadId'],
-                    'subject': headers.get('Subject', ''),
-                    'to': headers.get('To', ''),
-                    'date': headers.get('Date', '')
-                }
-                formatted_drafts.append(formatted_draft)
-            
-            return {
-                'success': True,
-                'drafts': formatted_drafts,
-                'totalDrafts': len(formatted_drafts)
+        results = self.service.users().drafts().list(
+            userId='me',
+            maxResults=max_results
+        ).execute()
+        
+        drafts = results.get('drafts', [])
+        
+        # Get draft details in batched requests
+        get = self.service.users().drafts().get
+        details = self._execute_many([
+            get(userId='me', id=draft['id'], format='metadata')
+            for draft in drafts
+        ], 'draft')
+        
+        formatted_drafts = []
+        for draft, draft_details in zip(drafts, details):
+            if draft_details is None:
+                continue
+            
+            headers = _headers_to_dict(draft_details['message']['payload']['headers'])
+            
+            formatted_draft = {
+                'id': draft['id'],
+                'messageId': draft_details['message']['id'],
+                'threadId': draft_details['message']['threadId'],
+                'subject': headers.get('Subject', ''),
+                'to': headers.get('To', ''),
+                'date': headers.get('Date', '')
             }
+            formatted_drafts.append(formatted_draft)
+        
+        return {
+            'success': True,
+            'drafts': formatted_drafts,
+            'totalDrafts': len(formatted_drafts)
+        }
+    
+    def _iter_message_ids(self, query: str, limit: int) -> Iterator[str]:
+        """
+        Yield the IDs of messages matching query, following list pages.
+        
+        A single messages.list call returns at most 500 messages, so larger
+        limits need several pages.
+        
+        Args:
+            query: Gmail search query
+            limit: Maximum number of IDs to yield
             
-        except HttpError as e:
-            logger.error(f"HTTP error listing drafts: {e}")
-            return {
-                'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
-            }
-        except Exception as e:
-            logger.error(f"Error listing drafts: {e}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        Yields:
+            Message IDs in the order returned by the API
+        """
+        messages = self.service.users().messages()
+        request = messages.list(
+            userId='me',
+            q=query,
+            maxResults=min(limit, _LIST_PAGE_LIMIT),
+            fields='messages/id,nextPageToken'
+        )
+        remaining = limit
+        while request is not None and remaining > 0:
+            response = self._execute_with_retry(request)
+            page = response.get('messages', [])[:remaining]
+            for message in page:
+                yield message['id']
+            remaining -= len(page)
+            if not page or not remaining:
+                break
+            request = messages.list_next(request, response)
     
+    @_guard("in bulk modify")
     def bulk_modify(self, query: str, add_labels: List[str] = None, remove_labels: List[str] = None, max_messages: int = 1000) -> Dict[str, Any]:
         """
         Universal bulk modify messages using query-based selection and batch operations.
@@ -884,96 +1301,114 @@ class GmailClient:
             # Mark inbox emails as unread
             bulk_modify("in:inbox -is:unread", add_labels=["UNREAD"])
         """
-        try:
-            if not query.strip():
-                return {
-                    'success': False,
-                    'error': 'Query is required for bulk operations'
-                }
-                
-            if not add_labels and not remove_labels:
-                return {
-                    'success': False,
-                    'error': 'At least one of add_labels or remove_labels must be specified'
-                }
-            
-            # Get message IDs matching the query
-            search_result = self.service.users().messages().list(
-                userId='me',
-                q=query,
-                maxResults=max_messages
-            ).execute()
-            
-            message_ids = [msg['id'] for msg in search_result.get('messages', [])]
-            
-            if not message_ids:
-                return {
-                    'success': True,
-                    'message': 'No messages found matching the query',
-                    'query': query,
-                    'processed': 0
-                }
-            
-            # Process in batches of 100 (Gmail API limit)
-            batch_size = 100
-            total_processed = 0
-            batch_results = []
-            
-            for i in range(0, len(message_ids), batch_size):
-                batch_ids = message_ids[i:i + batch_size]
-                
-                # Build batch request
-                batch_request = {'ids': batch_ids}
-                
-                if add_labels:
-                    batch_request['addLabelIds'] = add_labels
-                if remove_labels:
-                    batch_request['removeLabelIds'] = remove_labels
-                
-                # Execute batch modification
-                self.service.users().messages().batchModify(
-                    userId='me',
-                    body=batch_request
-                ).execute()
-                
-                total_processed += len(batch_ids)
-                batch_results.append({
-                    'batch': i // batch_size + 1,
-                    'processed': len(batch_ids)
-                })
-                
-                logger.info(f"Processed batch {len(batch_results)}: {len(batch_ids)} messages")
-            
-            # Create descriptive message
-            operations = []
-            if add_labels:
-                operations.append(f"added labels {add_labels}")
-            if remove_labels:
-                operations.append(f"removed labels {remove_labels}")
-            operation_desc = " and ".join(operations)
-            
+        if not query.strip():
             return {
-                'success': True,
-                'message': f'Successfully {operation_desc} for {total_processed} messages',
-                'query': query,
-                'total_found': len(message_ids),
-                'processed': total_processed,
-                'batches': batch_results,
-                'operations': {
-                    'added_labels': add_labels or [],
-                    'removed_labels': remove_labels or []
-                }
+                'success': False,
+                'error': 'Query is required for bulk operations'
             }
             
-        except HttpError as e:
-            logger.error(f"HTTP error in bulk modify: {e}")
+        if not add_labels and not remove_labels:
             return {
                 'success': False,
-                'error': f"HTTP error: {e.resp.status} - {e.content.decode()}"
+                'error': 'At least one of add_labels or remove_labels must be specified'
             }
-        except Exception as e:
-            logger.error(f"Error in bulk modify: {e}")
+        
+        # Collect every matching ID before modifying anything: changing labels
+        # can change the query's results under an in-progress page token
+        message_ids = list(self._iter_message_ids(query, max_messages))
+        
+        if not message_ids:
             return {
-                'success': False,
-                'error': str(e)
-            }
\ No newline at end of file
+                'success': True,
+                'message': 'No messages found matching the query',
+                'query': query,
+                'processed': 0
+            }
+        
+        # batchModify accepts up to 1000 IDs per call; several calls are sent
+        # together through the batch endpoint
+        counts = self._batch_modify(message_ids, add_labels, remove_labels)
+        total_processed = sum(counts)
+        batch_results = [
+            {'batch': number, 'processed': processed}
+            for number, processed in enumerate(counts, 1)
+        ]
+        logger.info(f"Processed {len(batch_results)} batches: {total_processed} messages")
+        
+        # Create descriptive message
+        operations = []
+        if add_labels:
+            operations.append(f"added labels {add_labels}")
+        if remove_labels:
+            operations.append(f"removed labels {remove_labels}")
+        operation_desc = " and ".join(operations)
+        
+        unprocessed = len(message_ids) - total_processed
+        if not total_processed:
+            message = f'Failed to modify {len(message_ids)} messages ({operation_desc})'
+        elif unprocessed:
+            message = (f'Successfully {operation_desc} for {total_processed} of {len(message_ids)} '
+                       f'messages; {unprocessed} could not be modified')
+        else:
+            message = f'Successfully {operation_desc} for {total_processed} messages'
+        
+        return {
+            'success': total_processed > 0,
+            'message': message,
+            'query': query,
+            'total_found': len(message_ids),
+            'processed': total_processed,
+            'batches': batch_results,
+            'operations': {
+                'added_labels': add_labels or [],
+                'removed_labels': remove_labels or []
+            }
+        }
+    
+    # Async variants. Each runs the blocking call in the default thread pool so
+    # an event loop can interleave several Gmail operations.
+    
+    async def list_messages_async(self, query: Optional[str] = None,
+                                  max_results: int = 10,
+                                  include_spam_trash: bool = False,
+                                  enrich: bool = True) -> Dict[str, Any]:
+        """Async variant of list_messages."""
+        return await asyncio.to_thread(self.list_messages, query, max_results, include_spam_trash, enrich)
+    
+    async def get_message_async(self, message_id: str, format: str = 'full',
+                                want_body: bool = True) -> Dict[str, Any]:
+        """Async variant of get_message."""
+        return await asyncio.to_thread(self.get_message, message_id, format, want_body)
+    
+    async def send_message_async(self, to: str, subject: str, body: str,
+                                 cc: Optional[str] = None,
+                                 bcc: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of send_message."""
+        return await asyncio.to_thread(self.send_message, to, subject, body, cc, bcc)
+    
+    async def search_messages_async(self, query: str, max_results: int = 10) -> Dict[str, Any]:
+        """Async variant of search_messages."""
+        return await asyncio.to_thread(self.search_messages, query, max_results)
+    
+    async def mark_as_read_async(self, message_id: str) -> Dict[str, Any]:
+        """Async variant of mark_as_read."""
+        return await asyncio.to_thread(self.mark_as_read, message_id)
+    
+    async def mark_as_unread_async(self, message_id: str) -> Dict[str, Any]:
+        """Async variant of mark_as_unread."""
+        return await asyncio.to_thread(self.mark_as_unread, message_id)
+    
+    async def get_labels_async(self) -> Dict[str, Any]:
+        """Async variant of get_labels."""
+        return await asyncio.to_thread(self.get_labels)
+    
+    async def reply_to_message_async(self, message_id: str, body: str,
+                                     include_original: bool = True) -> Dict[str, Any]:
+        """Async variant of reply_to_message."""
+        return await asyncio.to_thread(self.reply_to_message, message_id, body, include_original)
+    
+    async def bulk_modify_async(self, query: str, add_labels: List[str] = None,
+                                remove_labels: List[str] = None,
+                                max_messages: int = 1000) -> Dict[str, Any]:
+        """Async variant of bulk_modify."""
+        return await asyncio.to_thread(self.bulk_modify, query, add_labels, remove_labels, max_messages)
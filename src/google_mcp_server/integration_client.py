@@ -3,23 +3,98 @@
 import json
 import logging
 import re
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from email.mime.text import MIMEText
+from html import escape
 import base64
 
+from .cache import PersistentCache
 from .drive_client import GoogleDriveClient
 from .gmail_client import GmailClient
 from .calendar_client import GoogleCalendarClient
 
 logger = logging.getLogger(__name__)
 
+# Address part of a "Name <email>" header value
+_ANGLE_ADDRESS = re.compile(r'<([^>]+)>')
+
+# Used to turn an email subject into a file name
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w\s-]')
+_DASH_OR_SPACE_RUN = re.compile(r'[-\s]+')
+
+# File contents written by save_email_to_drive
+_HTML_EMAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>{subject}</title>
+    <meta charset="UTF-8">
+</head>
+<body>
+    <h2>{subject}</h2>
+    <p><strong>From:</strong> {sender}</p>
+    <p><strong>Date:</strong> {date}</p>
+    <p><strong>To:</strong> {recipients}</p>
+    <hr>
+    <div>
+        {body}
+    </div>
+</body>
+</html>"""
+
+_TEXT_EMAIL_TEMPLATE = """Subject: {subject}
+From: {sender}
+Date: {date}
+To: {recipients}
+
+""" + '-' * 50 + """
+
+{body}
+"""
+
+# Recipients shared with and emailed at once by share_drive_file_via_email_bulk
+_NOTIFY_WORKERS = 5
+
+
+@lru_cache(maxsize=1)
+def _default_meeting_start(today: date) -> datetime:
+    """
+    Return 2 PM on the next business day after today.
+    
+    Cached per day, since the answer only changes when the date does.
+    """
+    start = today + timedelta(days=1)
+    # Saturday (5) and Sunday (6) move to the following Monday
+    if start.weekday() >= 5:
+        start += timedelta(days=7 - start.weekday())
+    return datetime.combine(start, time(hour=14))
+
+
+def _share_email_body(file_info: Dict[str, Any], permission_role: str, message: str) -> str:
+    """Compose the notification email sent when a Drive file is shared."""
+    return f"""Hello,
+
+I've shared a file with you on Google Drive:
+
+File: {file_info.get('name', 'Untitled')}
+Access Level: {permission_role}
+Link: {file_info.get('webViewLink', 'Link not available')}
+
+{message}
+
+Best regards
+"""
+
+
 class GoogleIntegrationClient:
     """Client for cross-service Google API integrations."""
     
     def __init__(self, drive_client: GoogleDriveClient, 
                  gmail_client: GmailClient, 
-                 calendar_client: GoogleCalendarClient):
+                 calendar_client: GoogleCalendarClient,
+                 message_cache: Optional[PersistentCache] = None):
         """
         Initialize the integration client.
         
@@ -27,10 +102,35 @@ class GoogleIntegrationClient:
             drive_client: Google Drive client instance
             gmail_client: Gmail client instance
             calendar_client: Google Calendar client instance
+            message_cache: Optional persistent cache of full messages, keyed by ID
         """
         self.drive_client = drive_client
         self.gmail_client = gmail_client
         self.calendar_client = calendar_client
+        self.message_cache = message_cache
+    
+    def _get_message(self, message_id: str) -> Dict[str, Any]:
+        """
+        Get a full message, using the persistent message cache when configured.
+        
+        Message headers and bodies never change, so a cached copy stays valid;
+        its labels may be stale, which the integration flows do not use.
+        
+        Args:
+            message_id: Gmail message ID
+            
+        Returns:
+            get_message result
+        """
+        if self.message_cache is not None:
+            cached = self.message_cache.get(message_id)
+            if cached is not None:
+                return cached
+        
+        result = self.gmail_client.get_message(message_id, format='full')
+        if self.message_cache is not None and result.get('success'):
+            self.message_cache.set(message_id, result)
+        return result
     
     def create_meeting_from_email(self, message_id: str, 
                                  proposed_time: str = "",
@@ -50,14 +150,18 @@ class GoogleIntegrationClient:
         """
         try:
             # Get email content
-            email_result = self.gmail_client.get_message(message_id)
+            email_result = self._get_message(message_id)
             if not email_result.get('success'):
                 return email_result
             
             email_data = email_result['message']
-            subject = email_data.get('subject', '')
-            sender = email_data.get('from', '')
+            headers = email_data.get('headers', {})
+            subject = headers.get('Subject', '')
+            sender = headers.get('From', '')
+            
+            # Only the start of the body goes into the event description
             body = email_data.get('body', {}).get('text', '')
+            body_preview = body[:500] + '...' if len(body) > 500 else body
             
             # Extract potential meeting details
             meeting_summary = f"Meeting: {subject}"
@@ -66,16 +170,7 @@ class GoogleIntegrationClient:
             
             # Use proposed time or default to next business day
             if not proposed_time:
-                tomorrow = datetime.now() + timedelta(days=1)
-                # Set to 2 PM if tomorrow is a weekday
-                if tomorrow.weekday() < 5:  # Monday = 0, Sunday = 6
-                    meeting_time = tomorrow.replace(hour=14, minute=0, second=0, microsecond=0)
-                else:
-                    # Next Monday if weekend
-                    days_ahead = 7 - tomorrow.weekday()
-                    meeting_time = tomorrow + timedelta(days=days_ahead)
-                    meeting_time = meeting_time.replace(hour=14, minute=0, second=0, microsecond=0)
-                
+                meeting_time = _default_meeting_start(date.today())
                 start_time = meeting_time.isoformat()
                 end_time = (meeting_time + timedelta(minutes=duration_minutes)).isoformat()
             else:
@@ -87,7 +182,7 @@ class GoogleIntegrationClient:
             attendees = []
             if sender:
                 # Extract email from "Name <email>" format
-                email_match = re.search(r'<([^>]+)>', sender)
+                email_match = _ANGLE_ADDRESS.search(sender)
                 if email_match:
                     attendees.append(email_match.group(1))
                 else:
@@ -97,7 +192,7 @@ class GoogleIntegrationClient:
             event_result = self.calendar_client.create_event(
                 calendar_id=calendar_id,
                 summary=meeting_summary,
-                description=f"Meeting created from email:\n\nOriginal Subject: {subject}\nFrom: {sender}\n\n{body[:500]}...",
+                description=f"Meeting created from email:\n\nOriginal Subject: {subject}\nFrom: {sender}\n\n{body_preview}",
                 start_time=start_time,
                 end_time=end_time,
                 attendees=','.join(attendees) if attendees else None
@@ -137,53 +232,45 @@ class GoogleIntegrationClient:
         """
         try:
             # Get email content
-            email_result = self.gmail_client.get_message(message_id, format='full')
+            email_result = self._get_message(message_id)
             if not email_result.get('success'):
                 return email_result
             
             email_data = email_result['message']
+            headers = email_data.get('headers', {})
             
             # Format email content
-            subject = email_data.get('subject', 'No Subject')
-            sender = email_data.get('from', 'Unknown Sender')
-            date = email_data.get('date', '')
+            subject = headers.get('Subject') or 'No Subject'
+            sender = headers.get('From') or 'Unknown Sender'
+            sent_date = headers.get('Date', '')
+            recipients = headers.get('To', '')
             body = email_data.get('body', {})
             
             # Create filename
-            safe_subject = re.sub(r'[^\w\s-]', '', subject).strip()
-            safe_subject = re.sub(r'[-\s]+', '-', safe_subject)
+            safe_subject = _UNSAFE_FILENAME_CHARS.sub('', subject).strip()
+            safe_subject = _DASH_OR_SPACE_RUN.sub('-', safe_subject)
             filename = f"Email_{safe_subject}_{message_id}.{file_format}"
             
             # Format content based on file type
             if file_format.lower() == 'html':
-                content = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>{subject}</title>
-    <meta charset="UTF-8">
-</head>
-<body>
-    <h2>{subject}</h2>
-    <p><strong>From:</strong> {sender}</p>
-    <p><strong>Date:</strong> {date}</p>
-    <p><strong>To:</strong> {email_data.get('to', '')}</p>
-    <hr>
-    <div>
-        {body.get('html', body.get('text', 'No content'))}
-    </div>
-</body>
-</html>"""
+                # Header values and plain text are escaped; an html body is
+                # inserted as-is
+                content = _HTML_EMAIL_TEMPLATE.format(
+                    subject=escape(subject),
+                    sender=escape(sender),
+                    date=escape(sent_date),
+                    recipients=escape(recipients),
+                    body=body.get('html') or escape(body.get('text') or 'No content')
+                )
                 mime_type = "text/html"
             else:
-                content = f"""Subject: {subject}
-From: {sender}
-Date: {date}
-To: {email_data.get('to', '')}
-
-{'-' * 50}
-
-{body.get('text', body.get('html', 'No content'))}
-"""
+                content = _TEXT_EMAIL_TEMPLATE.format(
+                    subject=subject,
+                    sender=sender,
+                    date=sent_date,
+                    recipients=recipients,
+                    body=body.get('text') or body.get('html') or 'No content'
+                )
                 mime_type = "text/plain"
             
             # Save to Drive
@@ -217,6 +304,9 @@ To: {email_data.get('to', '')}
         """
         Share a Drive file and send email notification.
         
+        The email is only sent once the share has succeeded; emailSent in the
+        result says whether it went out.
+        
         Args:
             file_id: Google Drive file ID to share
             recipient_email: Email address to share with
@@ -236,6 +326,12 @@ To: {email_data.get('to', '')}
             file_info = file_result['file']
             file_name = file_info.get('name', 'Untitled')
             
+            # Prepare email
+            if not subject:
+                subject = f"Shared file: {file_name}"
+            
+            email_body = _share_email_body(file_info, permission_role, message)
+            
             # Share the file
             share_result = self.drive_client.share_file(
                 file_id=file_id,
@@ -244,25 +340,9 @@ To: {email_data.get('to', '')}
                 send_notification=False  # We'll send our own email
             )
             
+            # Only notify once the recipient can actually open the link
             if not share_result.get('success'):
-                return share_result
-            
-            # Prepare email
-            if not subject:
-                subject = f"Shared file: {file_name}"
-            
-            email_body = f"""Hello,
-
-I've shared a file with you on Google Drive:
-
-File: {file_name}
-Access Level: {permission_role}
-Link: {file_info.get('webViewLink', 'Link not available')}
-
-{message}
-
-Best regards
-"""
+                return {**share_result, 'emailSent': False}
             
             # Send email notification
             email_result = self.gmail_client.send_message(
@@ -270,6 +350,13 @@ Best regards
                 subject=subject,
                 body=email_body
             )
+            email_sent = bool(email_result.get('success'))
+            
+            if email_sent:
+                outcome = f"File '{file_name}' shared with {recipient_email} and email sent"
+            else:
+                outcome = (f"File '{file_name}' shared with {recipient_email}, but the email failed: "
+                           f"{email_result.get('error', 'unknown error')}")
             
             return {
                 'success': True,
@@ -278,9 +365,90 @@ Best regards
                     'name': file_name,
                     'webViewLink': file_info.get('webViewLink', '')
                 },
+                'emailSent': email_sent,
                 'sharing': share_result.get('permission', {}),
                 'email': email_result.get('message', {}),
-                'message': f"File '{file_name}' shared with {recipient_email} and email sent"
+                'message': outcome
+            }
+            
+        except Exception as e:
+            logger.error(f"Error sharing file via email: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def share_drive_file_via_email_bulk(self, file_id: str, recipient_emails: List[str],
+                                       message: str = "", subject: str = "",
+                                       permission_role: str = "reader") -> Dict[str, Any]:
+        """
+        Share a Drive file with several recipients and email each of them.
+        
+        The file metadata is fetched once and the notification is composed once.
+        Recipients are handled concurrently on a small pool: each is shared
+        with and then emailed, and recipients whose share failed get no email.
+        
+        Args:
+            file_id: Google Drive file ID to share
+            recipient_emails: Email addresses to share with
+            message: Email message body
+            subject: Email subject (optional)
+            permission_role: Drive permission role (reader, writer, commenter)
+            
+        Returns:
+            Dictionary containing a result for each recipient
+        """
+        try:
+            file_result = self.drive_client.get_file(file_id)
+            if not file_result.get('success'):
+                return file_result
+            
+            file_info = file_result['file']
+            file_name = file_info.get('name', 'Untitled')
+            if not subject:
+                subject = f"Shared file: {file_name}"
+            email_body = _share_email_body(file_info, permission_role, message)
+            
+            def share_and_notify(recipient):
+                share_result = self.drive_client.share_file(
+                    file_id=file_id,
+                    email_address=recipient,
+                    role=permission_role,
+                    send_notification=False  # We'll send our own email
+                )
+                result = {
+                    'recipient': recipient,
+                    'shared': bool(share_result.get('success')),
+                    'sharing': share_result.get('permission', {})
+                }
+                if not result['shared']:
+                    result['error'] = share_result.get('error')
+                    return result
+                
+                email_result = self.gmail_client.send_message(to=recipient, subject=subject, body=email_body)
+                result['emailed'] = bool(email_result.get('success'))
+                result['email'] = email_result.get('message', {})
+                if not result['emailed']:
+                    result['error'] = email_result.get('error')
+                return result
+            
+            # Clients are safe to call from several threads: transport.py gives
+            # each thread its own connection pool
+            results = []
+            if recipient_emails:
+                with ThreadPoolExecutor(max_workers=min(_NOTIFY_WORKERS, len(recipient_emails))) as executor:
+                    results = list(executor.map(share_and_notify, recipient_emails))
+            
+            shared = [result for result in results if result['shared']]
+            return {
+                'success': bool(shared),
+                'file': {
+                    'id': file_id,
+                    'name': file_name,
+                    'webViewLink': file_info.get('webViewLink', '')
+                },
+                'results': results,
+                'message': f"File '{file_name}' shared with {len(shared)} of {len(results)} recipients"
             }
             
         except Exception as e:
@@ -304,57 +472,45 @@ Best regards
             max_results: Maximum results per service
             
         Returns:
-            Dictionary containing unified search results
+            Dictionary containing unified search results, with a drive, gmail
+            and/or calendar entry for each service searched
         """
         try:
             results = {
                 'success': True,
-                'query': query,
-                'drive': {'files': [], 'totalFiles': 0},
-                'gmail': {'messages': [], 'totalMessages': 0},
-                'calendar': {'events': [], 'totalEvents': 0}
+                'query': query
             }
             
-            # Search Drive
+            # The searches hit independent services, so run them concurrently.
+            # This is safe without locks because transport.py gives each thread
+            # its own httplib2 connection pool, which every client goes through.
+            # Only enabled services appear in the results.
+            searches = []
             if search_drive:
-                drive_result = self.drive_client.search_files(
-                    query=query,
-                    max_results=max_results
-                )
-                if drive_result.get('success'):
-                    results['drive'] = {
-                        'files': drive_result.get('files', []),
-                        'totalFiles': drive_result.get('totalFiles', 0)
-                    }
-            
-            # Search Gmail
+                searches.append(('drive', self.drive_client.search_files, 'files', 'totalFiles'))
             if search_gmail:
-                gmail_result = self.gmail_client.search_messages(
-                    query=query,
-                    max_results=max_results
-                )
-                if gmail_result.get('success'):
-                    results['gmail'] = {
-                        'messages': gmail_result.get('messages', []),
-                        'totalMessages': gmail_result.get('totalMessages', 0)
-                    }
-            
-            # Search Calendar
+                searches.append(('gmail', self.gmail_client.search_messages, 'messages', 'totalMessages'))
             if search_calendar:
-                calendar_result = self.calendar_client.search_events(
-                    query=query,
-                    max_results=max_results
-                )
-                if calendar_result.get('success'):
-                    results['calendar'] = {
-                        'events': calendar_result.get('events', []),
-                        'totalEvents': calendar_result.get('totalEvents', 0)
-                    }
-            
-            # Calculate total results
-            total_results = (results['drive']['totalFiles'] + 
-                           results['gmail']['totalMessages'] + 
-                           results['calendar']['totalEvents'])
+                searches.append(('calendar', self.calendar_client.search_events, 'events', 'totalEvents'))
+            
+            total_results = 0
+            if searches:
+                with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+                    futures = [
+                        (service, items_key, total_key,
+                         executor.submit(search, query=query, max_results=max_results))
+                        for service, search, items_key, total_key in searches
+                    ]
+                    for service, items_key, total_key, future in futures:
+                        service_result = future.result()
+                        if not service_result.get('success'):
+                            service_result = {}
+                        total = service_result.get(total_key, 0)
+                        results[service] = {
+                            items_key: service_result.get(items_key, []),
+                            total_key: total
+                        }
+                        total_results += total
             
             results['totalResults'] = total_results
             results['message'] = f"Found {total_results} results across Google services"
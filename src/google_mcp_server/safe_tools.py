@@ -1,6 +1,11 @@
 """Safe tools that require explicit confirmation before executing actions."""
 
 import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 
 from .contacts_client import GoogleContactsClient
@@ -10,6 +15,38 @@ from .calendar_client import GoogleCalendarClient
 
 logger = logging.getLogger(__name__)
 
+# Emails confirmed with background=True are sent on a small pool. Only Gmail
+# work goes there: its client gives each thread its own HTTP connection.
+_SEND_WORKERS = 4
+
+# Background sends whose status can still be looked up
+_MAX_TRACKED_SENDS = 100
+
+
+def _split_list(value: Optional[str]) -> List[str]:
+    """Split a comma-separated list, dropping blanks and surrounding spaces."""
+    if not value:
+        return []
+    return [item for part in value.split(',') if (item := part.strip())]
+
+
+def _resolution_message(result: Dict[str, Any]) -> str:
+    """Describe a resolved recipient, only formatting a fallback when no message came back."""
+    if 'message' in result:
+        return result['message']
+    return f"Resolved to {result['email']}"
+
+
+@lru_cache(maxsize=64)
+def _operation_summary(add_labels: tuple, remove_labels: tuple) -> str:
+    """Describe a bulk label change; the same label sets recur across calls."""
+    operations = []
+    if add_labels:
+        operations.append(f"ADD labels: {', '.join(add_labels)}")
+    if remove_labels:
+        operations.append(f"REMOVE labels: {', '.join(remove_labels)}")
+    return " and ".join(operations)
+
 class SafeGoogleTools:
     """Safe tools that require explicit confirmation before performing actions."""
     
@@ -24,6 +61,10 @@ class SafeGoogleTools:
         self.gmail = gmail_client
         self.drive = drive_client
         self.calendar = calendar_client
+        self._send_executor = ThreadPoolExecutor(max_workers=_SEND_WORKERS,
+                                                 thread_name_prefix='gmail-send')
+        self._pending_sends: "OrderedDict[str, Future]" = OrderedDict()
+        self._pending_lock = threading.Lock()
     
     def prepare_email(self, to: str, subject: str, body: str, 
                      cc: str = "", bcc: str = "") -> Dict[str, Any]:
@@ -41,8 +82,11 @@ class SafeGoogleTools:
             Dictionary with email details for user confirmation
         """
         try:
+            # Look up all recipients at once; the checks below stay in order
+            to_result, cc_result, bcc_result = self._resolve_recipients(
+                [to, cc if cc.strip() else None, bcc if bcc.strip() else None], "email")
+            
             # Resolve primary recipient
-            to_result = self.contacts.smart_email_resolve(to, "email")
             if not to_result['success']:
                 return {
                     'success': False,
@@ -50,16 +94,15 @@ class SafeGoogleTools:
                 }
             
             resolved_to = to_result['email']
-            to_info = to_result.get('message', f"Resolved to {resolved_to}")
+            to_info = _resolution_message(to_result)
             
             # Resolve CC if provided
             resolved_cc = ""
             cc_info = ""
-            if cc.strip():
-                cc_result = self.contacts.smart_email_resolve(cc, "email") 
+            if cc_result:
                 if cc_result['success']:
                     resolved_cc = cc_result['email']
-                    cc_info = cc_result.get('message', f"Resolved to {resolved_cc}")
+                    cc_info = _resolution_message(cc_result)
                 else:
                     return {
                         'success': False,
@@ -69,11 +112,10 @@ class SafeGoogleTools:
             # Resolve BCC if provided
             resolved_bcc = ""
             bcc_info = ""
-            if bcc.strip():
-                bcc_result = self.contacts.smart_email_resolve(bcc, "email")
+            if bcc_result:
                 if bcc_result['success']:
                     resolved_bcc = bcc_result['email']
-                    bcc_info = bcc_result.get('message', f"Resolved to {resolved_bcc}")
+                    bcc_info = _resolution_message(bcc_result)
                 else:
                     return {
                         'success': False,
@@ -107,32 +149,41 @@ class SafeGoogleTools:
                     'info': bcc_info
                 }
             
-            # Create the confirmation command for Claude to use
-            confirm_command = f"confirm_send_email('{resolved_to}', '{subject}', '{body}'"
+            # Create the confirmation command for Claude to use. repr() quotes
+            # each value so apostrophes and newlines cannot break the call.
+            args = [repr(resolved_to), repr(subject), repr(body)]
+            if resolved_cc:
+                args.append(f"cc={resolved_cc!r}")
+            if resolved_bcc:
+                args.append(f"bcc={resolved_bcc!r}")
+            confirm_command = f"confirm_send_email({', '.join(args)})"
+            
+            lines = [
+                "",
+                "📧 EMAIL READY TO SEND - CONFIRMATION REQUIRED",
+                "",
+                f"To: {to_info}",
+                f"Subject: {subject}",
+                f"Body: {email_preview['body_preview']}",
+            ]
             if resolved_cc:
-                confirm_command += f", cc='{resolved_cc}'"
+                lines.append(f"CC: {cc_info}")
             if resolved_bcc:
-                confirm_command += f", bcc='{resolved_bcc}'"
-            confirm_command += ")"
+                lines.append(f"BCC: {bcc_info}")
+            lines += [
+                "",
+                "⚠️  This email will be sent immediately upon confirmation.",
+                "",
+                f"To proceed: {confirm_command}",
+                "To cancel: cancel_operation()",
+                "",
+            ]
             
             return {
                 'success': True,
                 'requires_confirmation': True,
                 'preview': email_preview,
-                'message': f"""
-📧 EMAIL READY TO SEND - CONFIRMATION REQUIRED
-
-To: {to_info}
-Subject: {subject}
-Body: {email_preview['body_preview']}
-{f"CC: {cc_info}" if resolved_cc else ""}
-{f"BCC: {bcc_info}" if resolved_bcc else ""}
-
-⚠️  This email will be sent immediately upon confirmation.
-
-To proceed: {confirm_command}
-To cancel: cancel_operation()
-""",
+                'message': "\n".join(lines),
                 'confirmation_params': {
                     'to': resolved_to,
                     'subject': subject,
@@ -174,7 +225,7 @@ To cancel: cancel_operation()
                 }
             
             resolved_email = recipient_result['email']
-            recipient_info = recipient_result.get('message', f"Resolved to {resolved_email}")
+            recipient_info = _resolution_message(recipient_result)
             
             share_preview = {
                 'action': 'SHARE_FILE',
@@ -196,29 +247,36 @@ To cancel: cancel_operation()
             }
             
             # Create the confirmation command
-            confirm_command = f"confirm_share_file('{file_id}', '{resolved_email}', '{role}', {send_notification}"
+            args = [repr(file_id), repr(resolved_email), repr(role), str(send_notification)]
             if message:
-                confirm_command += f", '{message}'"
-            confirm_command += ")"
+                args.append(repr(message))
+            confirm_command = f"confirm_share_file({', '.join(args)})"
+            
+            lines = [
+                "",
+                "📁 FILE SHARE READY - CONFIRMATION REQUIRED",
+                "",
+                f"File: {file_details['name']} ({file_details.get('size', 'Unknown size')})",
+                f"Recipient: {recipient_info}",
+                f"Permission: {role}",
+                f"Email notification: {'Yes' if send_notification else 'No'}",
+            ]
+            if message:
+                lines.append(f"Message: {message}")
+            lines += [
+                "",
+                f"⚠️  This will grant {role} access immediately upon confirmation.",
+                "",
+                f"To proceed: {confirm_command}",
+                "To cancel: cancel_operation()",
+                "",
+            ]
             
             return {
                 'success': True,
                 'requires_confirmation': True,
                 'preview': share_preview,
-                'message': f"""
-📁 FILE SHARE READY - CONFIRMATION REQUIRED
-
-File: {file_details['name']} ({file_details.get('size', 'Unknown size')})
-Recipient: {recipient_info}
-Permission: {role}
-Email notification: {'Yes' if send_notification else 'No'}
-{f"Message: {message}" if message else ""}
-
-⚠️  This will grant {role} access immediately upon confirmation.
-
-To proceed: {confirm_command}
-To cancel: cancel_operation()
-""",
+                'message': "\n".join(lines),
                 'confirmation_params': {
                     'file_id': file_id,
                     'recipient_email': resolved_email,
@@ -235,6 +293,123 @@ To cancel: cancel_operation()
                 'error': str(e)
             }
     
+    def prepare_file_share_bulk(self, file_ids: str, recipient: str, role: str = "reader",
+                                send_notification: bool = True, message: str = "") -> Dict[str, Any]:
+        """
+        Prepare sharing several files with one person - shows preview and requires confirmation.
+        
+        Args:
+            file_ids: Comma-separated Google Drive file IDs
+            recipient: Name or email of the person to share with
+            role: Permission role (reader, writer, commenter)
+            send_notification: Send email notification
+            message: Optional message to include
+            
+        Returns:
+            Dictionary with share details for user confirmation
+        """
+        try:
+            id_list = _split_list(file_ids)
+            if not id_list:
+                return {
+                    'success': False,
+                    'error': 'At least one file ID is required'
+                }
+            
+            # Look up every file in one batch request
+            file_results = self.drive.get_files(id_list)
+            failed = [f"{file_id}: {file_results[file_id]['error']}"
+                      for file_id in id_list if not file_results[file_id]['success']]
+            if failed:
+                return {
+                    'success': False,
+                    'error': "Could not get file info:\n" + "\n".join(failed)
+                }
+            
+            recipient_result = self.contacts.smart_email_resolve(recipient, "sharing")
+            if not recipient_result['success']:
+                return {
+                    'success': False,
+                    'error': recipient_result['message']
+                }
+            
+            resolved_email = recipient_result['email']
+            recipient_info = _resolution_message(recipient_result)
+            
+            files = []
+            for file_id in dict.fromkeys(id_list):
+                file_details = file_results[file_id]['file']
+                files.append({
+                    'name': file_details['name'],
+                    'id': file_id,
+                    'type': file_details['mimeType'],
+                    'size': file_details.get('size', 'Unknown'),
+                    'link': file_details.get('webViewLink', '')
+                })
+            
+            share_preview = {
+                'action': 'SHARE_FILES',
+                'files': files,
+                'recipient': {
+                    'original': recipient,
+                    'resolved': resolved_email,
+                    'info': recipient_info
+                },
+                'permission': role,
+                'notification': send_notification,
+                'message': message
+            }
+            
+            joined_ids = ','.join(file['id'] for file in files)
+            args = [repr(joined_ids), repr(resolved_email), repr(role), str(send_notification)]
+            if message:
+                args.append(repr(message))
+            confirm_command = f"confirm_share_file_bulk({', '.join(args)})"
+            
+            lines = [
+                "",
+                "📁 FILE SHARE READY - CONFIRMATION REQUIRED",
+                "",
+                f"Files ({len(files)}):",
+            ]
+            lines += [f"  • {file['name']} ({file['size']})" for file in files]
+            lines += [
+                f"Recipient: {recipient_info}",
+                f"Permission: {role}",
+                f"Email notification: {'Yes' if send_notification else 'No'}",
+            ]
+            if message:
+                lines.append(f"Message: {message}")
+            lines += [
+                "",
+                f"⚠️  This will grant {role} access to all {len(files)} files immediately upon confirmation.",
+                "",
+                f"To proceed: {confirm_command}",
+                "To cancel: cancel_operation()",
+                "",
+            ]
+            
+            return {
+                'success': True,
+                'requires_confirmation': True,
+                'preview': share_preview,
+                'message': "\n".join(lines),
+                'confirmation_params': {
+                    'file_ids': joined_ids,
+                    'recipient_email': resolved_email,
+                    'role': role,
+                    'send_notification': send_notification,
+                    'message': message
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Error preparing bulk file share: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def prepare_calendar_event(self, summary: str, start_time: str, end_time: str,
                               attendees: str = "", calendar_id: str = "primary",
                               description: str = "", location: str = "") -> Dict[str, Any]:
@@ -290,37 +465,45 @@ To cancel: cancel_operation()
             
             # Create the confirmation command
             attendee_str = ",".join(resolved_attendees) if resolved_attendees else ""
-            confirm_command = f"confirm_create_event('{summary}', '{start_time}', '{end_time}'"
+            args = [repr(summary), repr(start_time), repr(end_time)]
             if attendee_str:
-                confirm_command += f", attendees='{attendee_str}'"
+                args.append(f"attendees={attendee_str!r}")
             if calendar_id != "primary":
-                confirm_command += f", calendar_id='{calendar_id}'"
+                args.append(f"calendar_id={calendar_id!r}")
             if description:
-                confirm_command += f", description='{description}'"
+                args.append(f"description={description!r}")
+            if location:
+                args.append(f"location={location!r}")
+            confirm_command = f"confirm_create_event({', '.join(args)})"
+            
+            lines = [
+                "",
+                "📅 CALENDAR EVENT READY - CONFIRMATION REQUIRED",
+                "",
+                f"Event: {summary}",
+                f"Time: {start_time} to {end_time}",
+            ]
             if location:
-                confirm_command += f", location='{location}'"
-            confirm_command += ")"
+                lines.append(f"Location: {location}")
+            if description:
+                lines.append(f"Description: {description}")
+            lines.append(f"Calendar: {calendar_id}")
+            lines.append(f"Attendees ({len(resolved_attendees)}):")
+            lines += attendee_info or ["  No attendees"]
+            lines += [
+                "",
+                "⚠️  Invitations will be sent to all attendees immediately upon confirmation.",
+                "",
+                f"To proceed: {confirm_command}",
+                "To cancel: cancel_operation()",
+                "",
+            ]
             
             return {
                 'success': True,
                 'requires_confirmation': True,
                 'preview': event_preview,
-                'message': f"""
-📅 CALENDAR EVENT READY - CONFIRMATION REQUIRED
-
-Event: {summary}
-Time: {start_time} to {end_time}
-{f"Location: {location}" if location else ""}
-{f"Description: {description}" if description else ""}
-Calendar: {calendar_id}
-Attendees ({len(resolved_attendees)}):
-{chr(10).join(attendee_info) if attendee_info else "  No attendees"}
-
-⚠️  Invitations will be sent to all attendees immediately upon confirmation.
-
-To proceed: {confirm_command}
-To cancel: cancel_operation()
-""",
+                'message': "\n".join(lines),
                 'confirmation_params': {
                     'summary': summary,
                     'start_time': start_time,
@@ -339,10 +522,103 @@ To cancel: cancel_operation()
                 'error': str(e)
             }
     
-    def confirm_send_email(self, confirmation_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _resolve_recipients(self, recipients: List[Optional[str]],
+                            context: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        Resolve several recipients concurrently.
+        
+        Args:
+            recipients: Names or emails; None entries are skipped
+            context: Context for the resolution (email, calendar, sharing)
+            
+        Returns:
+            smart_email_resolve results in the same order, None for skipped entries
+        """
+        wanted = [recipient for recipient in recipients if recipient is not None]
+        
+        def resolve(recipient: str) -> Dict[str, Any]:
+            return self.contacts.smart_email_resolve(recipient, context)
+        
+        if len(wanted) > 1:
+            with ThreadPoolExecutor(max_workers=len(wanted)) as executor:
+                resolved = iter(list(executor.map(resolve, wanted)))
+        else:
+            resolved = iter([resolve(recipient) for recipient in wanted])
+        return [None if recipient is None else next(resolved) for recipient in recipients]
+    
+    def confirm_send_email(self, confirmation_data: Dict[str, Any],
+                           background: bool = False) -> Dict[str, Any]:
         """
         Actually send the email after confirmation.
+        
+        Args:
+            confirmation_data: Email fields from prepare_email
+            background: Queue the send and return at once with a send_id for
+                check_send_status, instead of waiting for Gmail to accept it
+            
+        Returns:
+            Send result, or the queued send_id when background is True
         """
+        if not background:
+            return self._send_confirmed_email(confirmation_data)
+        
+        send_id = uuid.uuid4().hex[:12]
+        future = self._send_executor.submit(self._send_confirmed_email, confirmation_data)
+        with self._pending_lock:
+            self._pending_sends[send_id] = future
+            while len(self._pending_sends) > _MAX_TRACKED_SENDS:
+                self._pending_sends.popitem(last=False)
+        
+        return {
+            'success': True,
+            'queued': True,
+            'send_id': send_id,
+            'message': f"📤 Email to {confirmation_data['to']} queued. Check delivery with check_send_status('{send_id}')"
+        }
+    
+    def check_send_status(self, send_id: str) -> Dict[str, Any]:
+        """
+        Report the outcome of an email queued with confirm_send_email(background=True).
+        
+        Args:
+            send_id: ID returned when the email was queued
+            
+        Returns:
+            Status 'pending', or the send result with status 'sent' or 'failed'
+        """
+        with self._pending_lock:
+            future = self._pending_sends.get(send_id)
+        if future is None:
+            return {
+                'success': False,
+                'error': f"Unknown send_id: {send_id}"
+            }
+        
+        if not future.done():
+            return {
+                'success': True,
+                'send_id': send_id,
+                'status': 'pending'
+            }
+        
+        result = dict(future.result())
+        result['send_id'] = send_id
+        result['status'] = 'sent' if result.get('success') else 'failed'
+        return result
+    
+    def close(self) -> None:
+        """
+        Stop the background send pool and forget tracked sends.
+        
+        Queued sends that have not started are cancelled; a send already in
+        progress is left to finish without blocking the caller.
+        """
+        self._send_executor.shutdown(wait=False, cancel_futures=True)
+        with self._pending_lock:
+            self._pending_sends.clear()
+    
+    def _send_confirmed_email(self, confirmation_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a confirmed email and describe the outcome."""
         try:
             result = self.gmail.send_message(
                 to=confirmation_data['to'],
@@ -387,6 +663,30 @@ To cancel: cancel_operation()
                 'error': str(e)
             }
     
+    def confirm_share_file_bulk(self, confirmation_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Actually share the files after confirmation.
+        """
+        try:
+            result = self.drive.share_files(
+                file_ids=_split_list(confirmation_data['file_ids']),
+                email_address=confirmation_data['recipient_email'],
+                role=confirmation_data['role'],
+                send_notification=confirmation_data['send_notification'],
+                message=confirmation_data['message']
+            )
+            
+            if result['success']:
+                result['message'] = f"✅ Shared {result['shared']} of {result['total']} files with {confirmation_data['recipient_email']}"
+            
+            return result
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
     def confirm_create_event(self, confirmation_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Actually create the calendar event after confirmation.
@@ -435,8 +735,8 @@ To cancel: cancel_operation()
                 }
                 
             # Parse labels
-            add_list = [label.strip() for label in add_labels.split(',') if label.strip()] if add_labels else []
-            remove_list = [label.strip() for label in remove_labels.split(',') if label.strip()] if remove_labels else []
+            add_list = _split_list(add_labels)
+            remove_list = _split_list(remove_labels)
             
             if not add_list and not remove_list:
                 return {
@@ -444,11 +744,13 @@ To cancel: cancel_operation()
                     'error': 'At least one of add_labels or remove_labels must be specified'
                 }
             
-            # Get count of messages that would be affected (but don't process them yet)
+            # Get count of messages that would be affected (but don't process them yet).
+            # The estimate does not depend on page size, so only the preview IDs are listed.
             search_result = self.gmail.service.users().messages().list(
                 userId='me',
                 q=query,
-                maxResults=min(max_messages, 100)  # Get first 100 for preview
+                maxResults=min(max_messages, 5),
+                fields='messages/id,resultSizeEstimate'
             ).execute()
             
             messages = search_result.get('messages', [])
@@ -461,49 +763,42 @@ To cancel: cancel_operation()
                     'affected_count': 0
                 }
             
-            # Get sample message details for preview
+            # Get sample message details for preview: the first 5 messages are
+            # fetched in one batch request, and any that fail are skipped
             sample_messages = []
-            for i, msg in enumerate(messages[:5]):  # Show first 5 as preview
-                try:
-                    message_details = self.gmail.service.users().messages().get(
-                        userId='me',
-                        id=msg['id'],
-                        format='metadata',
-                        metadataHeaders=['From', 'Subject', 'Date']
-                    ).execute()
-                    
-                    headers = {h['name']: h['value'] for h in message_details['payload'].get('headers', [])}
-                    sample_messages.append({
-                        'from': headers.get('From', 'Unknown'),
-                        'subject': headers.get('Subject', 'No Subject'),
-                        'date': headers.get('Date', 'Unknown'),
-                        'snippet': message_details.get('snippet', '')[:100] + '...'
-                    })
-                except Exception:
+            sample_details = self.gmail.get_messages_metadata(
+                [msg['id'] for msg in messages[:5]],
+                ['From', 'Subject', 'Date'],
+                fields='id,snippet,payload/headers'
+            )
+            for message_details in sample_details:
+                if message_details is None:
                     continue
+                headers = {h['name']: h['value'] for h in message_details['payload'].get('headers', [])}
+                sample_messages.append({
+                    'from': headers.get('From', 'Unknown'),
+                    'subject': headers.get('Subject', 'No Subject'),
+                    'date': headers.get('Date', 'Unknown'),
+                    'snippet': message_details.get('snippet', '')[:100] + '...'
+                })
             
             # Create operation description
-            operations_desc = []
-            if add_list:
-                operations_desc.append(f"ADD labels: {', '.join(add_list)}")
-            if remove_list:
-                operations_desc.append(f"REMOVE labels: {', '.join(remove_list)}")
-            
-            operation_summary = " and ".join(operations_desc)
+            operation_summary = _operation_summary(tuple(add_list), tuple(remove_list))
             
             # Create confirmation command
-            confirm_command = f"confirm_bulk_modify('{query}'"
+            args = [repr(query)]
             if add_labels:
-                confirm_command += f", add_labels='{add_labels}'"
+                args.append(f"add_labels={add_labels!r}")
             if remove_labels:
-                confirm_command += f", remove_labels='{remove_labels}'"
+                args.append(f"remove_labels={remove_labels!r}")
             if max_messages != 1000:
-                confirm_command += f", max_messages={max_messages}"
-            confirm_command += ")"
+                args.append(f"max_messages={max_messages}")
+            confirm_command = f"confirm_bulk_modify({', '.join(args)})"
             
             # Calculate if this will hit all messages or be limited
             will_be_limited = total_estimate > max_messages
             actual_count = min(total_estimate, max_messages)
+            sample_lines = "\n".join(f"  • {msg['from']}: {msg['subject']}" for msg in sample_messages[:3])
             
             bulk_preview = {
                 'action': 'BULK_MODIFY_EMAILS',
@@ -532,7 +827,7 @@ Will process: {actual_count} messages{'(limited by max_messages)' if will_be_lim
 Operations: {operation_summary}
 
 Sample messages that will be affected:
-{chr(10).join([f"  • {msg['from']}: {msg['subject']}" for msg in sample_messages[:3]])}
+{sample_lines}
 {f"  ... and {len(sample_messages) - 3} more shown in preview" if len(sample_messages) > 3 else ""}
 {f"  ... and {actual_count - len(sample_messages)} more will be processed" if actual_count > len(sample_messages) else ""}
 
@@ -563,8 +858,8 @@ To cancel: cancel_operation()
         """
         try:
             # Parse labels for bulk_modify call
-            add_list = [label.strip() for label in confirmation_data.get('add_labels', '').split(',') if label.strip()] if confirmation_data.get('add_labels') else None
-            remove_list = [label.strip() for label in confirmation_data.get('remove_labels', '').split(',') if label.strip()] if confirmation_data.get('remove_labels') else None
+            add_list = _split_list(confirmation_data.get('add_labels')) or None
+            remove_list = _split_list(confirmation_data.get('remove_labels')) or None
             
             result = self.gmail.bulk_modify(
                 query=confirmation_data['query'],
@@ -1,8 +1,11 @@
 """Google MCP Server - Main server implementation."""
 
 import os
+import json
 import logging
 import asyncio
+import functools
+import threading
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 
@@ -11,6 +14,7 @@ from mcp.server.fastmcp import FastMCP
 import mcp.types as types
 
 from .auth import GoogleAuthManager
+from .cache import PersistentCache
 from .drive_client import GoogleDriveClient
 from .gmail_client import GmailClient
 from .calendar_client import GoogleCalendarClient
@@ -19,6 +23,11 @@ from .contacts_client import GoogleContactsClient
 from .smart_tools import SmartGoogleTools
 from .safe_tools import SafeGoogleTools
 
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -35,6 +44,11 @@ redirect_uri = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:8080")
 additional_scopes_str = os.getenv("GOOGLE_ADDITIONAL_SCOPES", "")
 additional_scopes = additional_scopes_str.split() if additional_scopes_str else None
 
+# Optional on-disk cache of messages read by the integration tools. Off by
+# default since it stores email contents locally.
+message_cache_enabled = os.getenv("GOOGLE_MESSAGE_CACHE", "").lower() in ("1", "true", "yes")
+MESSAGE_CACHE_TTL = 24 * 60 * 60
+
 # Validate required configuration
 if not client_id or not client_secret:
     raise ValueError(
@@ -56,12 +70,40 @@ gmail_client: Optional[GmailClient] = None
 calendar_client: Optional[GoogleCalendarClient] = None
 integration_client: Optional[GoogleIntegrationClient] = None
 contacts_client: Optional[GoogleContactsClient] = None
+message_cache: Optional[PersistentCache] = None
 smart_tools: Optional[SmartGoogleTools] = None
 safe_tools: Optional[SafeGoogleTools] = None
 
+# Guards creation and reset of the clients above, so concurrent tool calls
+# never build a client twice. Reentrant because getters call other getters.
+_clients_lock = threading.RLock()
+
 # Create FastMCP server
 mcp = FastMCP("google-mcp-server")
 
+def _tool():
+    """
+    Register a blocking tool so it runs in a worker thread.
+    
+    FastMCP calls sync tools directly on the event loop, so one slow Google
+    API call would hold up every other request. The registered coroutine
+    hands the call to asyncio.to_thread, letting concurrent tool calls
+    overlap. The decorated function itself is returned unchanged.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def run_in_thread(*args, **kwargs):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        mcp.tool()(run_in_thread)
+        return fn
+    return decorator
+
+def _to_json(result: Any) -> str:
+    """Serialize a tool result as compact JSON, stringifying unknown types."""
+    if orjson is not None:
+        return orjson.dumps(result, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(result, default=str, ensure_ascii=False, separators=(',', ':'))
+
 def get_credentials():
     """Get valid Google credentials, handling authentication flow if needed."""
     creds = auth_manager.get_credentials()
@@ -73,67 +115,95 @@ def get_drive_client() -> GoogleDriveClient:
     """Get or create Google Drive client."""
     global drive_client
     if not drive_client:
-        drive_client = GoogleDriveClient(get_credentials())
+        with _clients_lock:
+            if not drive_client:
+                drive_client = GoogleDriveClient(get_credentials())
     return drive_client
 
 def get_gmail_client() -> GmailClient:
     """Get or create Gmail client."""
     global gmail_client
     if not gmail_client:
-        gmail_client = GmailClient(get_credentials())
+        with _clients_lock:
+            if not gmail_client:
+                gmail_client = GmailClient(get_credentials())
     return gmail_client
 
 def get_calendar_client() -> GoogleCalendarClient:
     """Get or create Google Calendar client."""
     global calendar_client
     if not calendar_client:
-        calendar_client = GoogleCalendarClient(get_credentials())
+        with _clients_lock:
+            if not calendar_client:
+                calendar_client = GoogleCalendarClient(get_credentials())
     return calendar_client
 
+def get_message_cache() -> Optional[PersistentCache]:
+    """Get or create the on-disk message cache, if enabled."""
+    global message_cache
+    # Compare with None: an empty PersistentCache is falsy
+    if message_cache_enabled and message_cache is None:
+        with _clients_lock:
+            if message_cache is None:
+                message_cache = PersistentCache(
+                    auth_manager.credentials_dir / 'message_cache.sqlite3',
+                    ttl=MESSAGE_CACHE_TTL
+                )
+    return message_cache
+
 def get_integration_client() -> GoogleIntegrationClient:
     """Get or create Google Integration client."""
     global integration_client
     if not integration_client:
-        integration_client = GoogleIntegrationClient(
-            get_drive_client(),
-            get_gmail_client(),
-            get_calendar_client()
-        )
+        with _clients_lock:
+            if not integration_client:
+                integration_client = GoogleIntegrationClient(
+                    get_drive_client(),
+                    get_gmail_client(),
+                    get_calendar_client(),
+                    message_cache=get_message_cache()
+                )
     return integration_client
 
 def get_contacts_client() -> GoogleContactsClient:
     """Get or create Google Contacts client."""
     global contacts_client
     if not contacts_client:
-        contacts_client = GoogleContactsClient(get_credentials())
+        with _clients_lock:
+            if not contacts_client:
+                contacts_client = GoogleContactsClient(get_credentials())
     return contacts_client
 
 def get_smart_tools() -> SmartGoogleTools:
     """Get or create Smart Google Tools."""
     global smart_tools
     if not smart_tools:
-        smart_tools = SmartGoogleTools(
-            get_contacts_client(),
-            get_gmail_client(),
-            get_drive_client(),
-            get_calendar_client()
-        )
+        with _clients_lock:
+            if not smart_tools:
+                smart_tools = SmartGoogleTools(
+                    get_contacts_client(),
+                    get_gmail_client(),
+                    get_drive_client(),
+                    get_calendar_client()
+                )
     return smart_tools
 
 def get_safe_tools() -> SafeGoogleTools:
     """Get or create Safe Google Tools."""
     global safe_tools
     if not safe_tools:
-        safe_tools = SafeGoogleTools(
-            get_contacts_client(),
-            get_gmail_client(),
-            get_drive_client(),
-            get_calendar_client()
-        )
+        with _clients_lock:
+            if not safe_tools:
+                safe_tools = SafeGoogleTools(
+                    get_contacts_client(),
+                    get_gmail_client(),
+                    get_drive_client(),
+                    get_calendar_client()
+                )
     return safe_tools
 
 # Authentication tools
-@mcp.tool()
+@_tool()
 def google_auth_status() -> str:
     """Check Google authentication status and user info"""
     try:
@@ -145,21 +215,28 @@ def google_auth_status() -> str:
     except Exception as e:
         return f"Authentication check failed: {str(e)}"
 
-@mcp.tool()
+@_tool()
 def google_auth_revoke() -> str:
     """Revoke Google authentication and clear stored credentials"""
     try:
         global drive_client, gmail_client, calendar_client, integration_client, contacts_client, smart_tools, safe_tools
         success = auth_manager.revoke_credentials()
         if success:
-            # Clear cached clients
-            drive_client = None
-            gmail_client = None
-            calendar_client = None
-            integration_client = None
-            contacts_client = None
-            smart_tools = None
-            safe_tools = None
+            # Clear cached clients and data
+            with _clients_lock:
+                if gmail_client:
+                    gmail_client.close()
+                if safe_tools:
+                    safe_tools.close()
+                if message_cache is not None:
+                    message_cache.clear()
+                drive_client = None
+                gmail_client = None
+                calendar_client = None
+                integration_client = None
+                contacts_client = None
+                smart_tools = None
+                safe_tools = None
             return "✅ Authentication revoked successfully"
         else:
             return "❌ Failed to revoke authentication"
@@ -167,7 +244,7 @@ def google_auth_revoke() -> str:
         return f"Error revoking authentication: {str(e)}"
 
 # Google Drive tools
-@mcp.tool()
+@_tool()
 def drive_list_files(query: str = "", folder_id: str = "", max_results: int = 10, drive_id: str = "", include_team_drives: bool = True) -> str:
     """List files in Google Drive"""
     try:
@@ -179,21 +256,21 @@ def drive_list_files(query: str = "", folder_id: str = "", max_results: int = 10
             drive_id=drive_id if drive_id else None,
             include_team_drives=include_team_drives
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_get_file(file_id: str, include_content: bool = False) -> str:
     """Get file metadata and content from Google Drive"""
     try:
         client = get_drive_client()
         result = client.get_file(file_id=file_id, include_content=include_content)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_upload_file(name: str, content: str, parent_folder_id: str = "", mime_type: str = "text/plain", drive_id: str = "") -> str:
     """Upload a file to Google Drive"""
     try:
@@ -205,11 +282,11 @@ def drive_upload_file(name: str, content: str, parent_folder_id: str = "", mime_
             mime_type=mime_type,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_create_file(name: str, content: str = "", parent_folder_id: str = "", mime_type: str = "text/plain", drive_id: str = "") -> str:
     """Create a file in Google Drive"""
     try:
@@ -221,11 +298,11 @@ def drive_create_file(name: str, content: str = "", parent_folder_id: str = "",
             mime_type=mime_type,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_create_folder(name: str, parent_folder_id: str = "", drive_id: str = "") -> str:
     """Create a folder in Google Drive"""
     try:
@@ -235,11 +312,11 @@ def drive_create_folder(name: str, parent_folder_id: str = "", drive_id: str = "
             parent_folder_id=parent_folder_id if parent_folder_id else None,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_copy_file(file_id: str, name: str = "", parent_folder_id: str = "") -> str:
     """Copy a file in Google Drive"""
     try:
@@ -249,11 +326,11 @@ def drive_copy_file(file_id: str, name: str = "", parent_folder_id: str = "") ->
             name=name if name else None,
             parent_folder_id=parent_folder_id if parent_folder_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_move_file(file_id: str, new_parent_folder_id: str, remove_from_current_parents: bool = True) -> str:
     """Move a file to a different folder in Google Drive"""
     try:
@@ -263,21 +340,21 @@ def drive_move_file(file_id: str, new_parent_folder_id: str, remove_from_current
             new_parent_folder_id=new_parent_folder_id,
             remove_from_current_parents=remove_from_current_parents
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_rename_file(file_id: str, new_name: str) -> str:
     """Rename a file in Google Drive"""
     try:
         client = get_drive_client()
         result = client.rename_file(file_id=file_id, new_name=new_name)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_update_file_content(file_id: str, content: str, mime_type: str = "") -> str:
     """Update the content of an existing file in Google Drive"""
     try:
@@ -287,21 +364,21 @@ def drive_update_file_content(file_id: str, content: str, mime_type: str = "") -
             content=content,
             mime_type=mime_type if mime_type else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_get_file_permissions(file_id: str) -> str:
     """Get file sharing permissions"""
     try:
         client = get_drive_client()
         result = client.get_file_permissions(file_id=file_id)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_share_file(file_id: str, email_address: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
     """Share a file with a user"""
     try:
@@ -313,21 +390,21 @@ def drive_share_file(file_id: str, email_address: str, role: str = "reader", sen
             send_notification=send_notification,
             message=message if message else ""
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_list_shared_drives(max_results: int = 10) -> str:
     """List available shared drives"""
     try:
         client = get_drive_client()
         result = client.list_shared_drives(max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_create_google_doc(name: str, content: str = "", parent_folder_id: str = "", drive_id: str = "") -> str:
     """Create a Google Doc"""
     try:
@@ -338,11 +415,11 @@ def drive_create_google_doc(name: str, content: str = "", parent_folder_id: str
             parent_folder_id=parent_folder_id if parent_folder_id else None,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_create_google_sheet(name: str, content: str = "", parent_folder_id: str = "", drive_id: str = "") -> str:
     """Create a Google Sheet"""
     try:
@@ -353,11 +430,11 @@ def drive_create_google_sheet(name: str, content: str = "", parent_folder_id: st
             parent_folder_id=parent_folder_id if parent_folder_id else None,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def drive_create_google_slide(name: str, content: str = "", parent_folder_id: str = "", drive_id: str = "") -> str:
     """Create a Google Slides presentation"""
     try:
@@ -368,36 +445,38 @@ def drive_create_google_slide(name: str, content: str = "", parent_folder_id: st
             parent_folder_id=parent_folder_id if parent_folder_id else None,
             drive_id=drive_id if drive_id else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Gmail tools
-@mcp.tool()
-def gmail_list_messages(query: str = "", max_results: int = 10, include_spam_trash: bool = False) -> str:
-    """List Gmail messages"""
+@_tool()
+def gmail_list_messages(query: str = "", max_results: int = 10, include_spam_trash: bool = False,
+                        include_details: bool = True) -> str:
+    """List Gmail messages. Set include_details=False to return only message IDs (faster)."""
     try:
         client = get_gmail_client()
         result = client.list_messages(
             query=query if query else None,
             max_results=max_results,
-            include_spam_trash=include_spam_trash
+            include_spam_trash=include_spam_trash,
+            enrich=include_details
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
-def gmail_get_message(message_id: str, format: str = "full") -> str:
-    """Get a specific Gmail message"""
+@_tool()
+def gmail_get_message(message_id: str, format: str = "full", include_body: bool = True) -> str:
+    """Get a specific Gmail message. Set include_body=False to fetch only headers."""
     try:
         client = get_gmail_client()
-        result = client.get_message(message_id=message_id, format=format)
-        return str(result)
+        result = client.get_message(message_id=message_id, format=format, want_body=include_body)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_send_message(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
     """Send a Gmail message"""
     try:
@@ -409,11 +488,11 @@ def gmail_send_message(to: str, subject: str, body: str, cc: str = "", bcc: str
             cc=cc if cc else None,
             bcc=bcc if bcc else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_reply_to_message(message_id: str, body: str, include_original: bool = True) -> str:
     """Reply to a Gmail message"""
     try:
@@ -423,11 +502,11 @@ def gmail_reply_to_message(message_id: str, body: str, include_original: bool =
             body=body,
             include_original=include_original
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_forward_message(message_id: str, to: str, body: str = "") -> str:
     """Forward a Gmail message"""
     try:
@@ -437,11 +516,11 @@ def gmail_forward_message(message_id: str, to: str, body: str = "") -> str:
             to=to,
             body=body
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_send_html_message(to: str, subject: str, html_body: str, text_body: str = "", cc: str = "", bcc: str = "") -> str:
     """Send an HTML Gmail message"""
     try:
@@ -454,53 +533,75 @@ def gmail_send_html_message(to: str, subject: str, html_body: str, text_body: st
             cc=cc if cc else None,
             bcc=bcc if bcc else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_archive_message(message_id: str) -> str:
     """Archive a Gmail message"""
     try:
         client = get_gmail_client()
         result = client.archive_message(message_id=message_id)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_delete_message(message_id: str) -> str:
     """Delete a Gmail message (move to trash)"""
     try:
         client = get_gmail_client()
         result = client.delete_message(message_id=message_id)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_add_label(message_id: str, label_ids: str) -> str:
     """Add labels to a Gmail message (comma-separated label IDs)"""
     try:
         client = get_gmail_client()
         label_list = [label.strip() for label in label_ids.split(',') if label.strip()]
         result = client.add_label(message_id=message_id, label_ids=label_list)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_remove_label(message_id: str, label_ids: str) -> str:
     """Remove labels from a Gmail message (comma-separated label IDs)"""
     try:
         client = get_gmail_client()
         label_list = [label.strip() for label in label_ids.split(',') if label.strip()]
         result = client.remove_label(message_id=message_id, label_ids=label_list)
-        return str(result)
+        return _to_json(result)
+    except Exception as e:
+        return _to_json({'success': False, 'error': str(e)})
+
+@_tool()
+def gmail_modify_messages(message_ids: str, add_labels: str = "", remove_labels: str = "") -> str:
+    """Add and/or remove labels on several Gmail messages at once (comma-separated message and label IDs)
+    
+    Examples:
+    - Mark as read: gmail_modify_messages("id1,id2,id3", remove_labels="UNREAD")
+    - Archive: gmail_modify_messages("id1,id2", remove_labels="INBOX")
+    """
+    try:
+        client = get_gmail_client()
+        id_list = [message_id.strip() for message_id in message_ids.split(',') if message_id.strip()]
+        add_list = [label.strip() for label in add_labels.split(',') if label.strip()] if add_labels else None
+        remove_list = [label.strip() for label in remove_labels.split(',') if label.strip()] if remove_labels else None
+        result = client.batch_modify_messages(
+            message_ids=id_list,
+            add_labels=add_list,
+            remove_labels=remove_list
+        )
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_create_draft(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
     """Create a Gmail draft"""
     try:
@@ -512,22 +613,22 @@ def gmail_create_draft(to: str, subject: str, body: str, cc: str = "", bcc: str
             cc=cc if cc else None,
             bcc=bcc if bcc else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def gmail_list_drafts(max_results: int = 10) -> str:
     """List Gmail drafts"""
     try:
         client = get_gmail_client()
         result = client.list_drafts(max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Gmail bulk operations (efficient for large datasets)
-@mcp.tool()
+@_tool()
 def gmail_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "", max_messages: int = 1000) -> str:
     """⚠️ UNSAFE: Universal bulk modify messages (executes immediately without confirmation)
     
@@ -556,22 +657,22 @@ def gmail_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "",
             remove_labels=remove_list,
             max_messages=max_messages
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Google Calendar tools
-@mcp.tool()
+@_tool()
 def calendar_list_calendars() -> str:
     """List available Google Calendars"""
     try:
         client = get_calendar_client()
         result = client.list_calendars()
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_list_events(calendar_id: str = "primary", time_min: str = "", time_max: str = "", max_results: int = 10) -> str:
     """List Google Calendar events"""
     try:
@@ -582,11 +683,11 @@ def calendar_list_events(calendar_id: str = "primary", time_min: str = "", time_
             time_max=time_max if time_max else None,
             max_results=max_results
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_create_event(
     summary: str, 
     start_time: str, 
@@ -608,11 +709,11 @@ def calendar_create_event(
             location=location if location else None,
             attendees=attendees if attendees else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_search_events(query: str, calendar_id: str = "primary", time_min: str = "", time_max: str = "", max_results: int = 10) -> str:
     """Search events by text content"""
     try:
@@ -624,11 +725,11 @@ def calendar_search_events(query: str, calendar_id: str = "primary", time_min: s
             time_max=time_max if time_max else None,
             max_results=max_results
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_duplicate_event(calendar_id: str, event_id: str, new_start_time: str, new_end_time: str, new_summary: str = "") -> str:
     """Duplicate an event to a new date/time"""
     try:
@@ -640,11 +741,11 @@ def calendar_duplicate_event(calendar_id: str, event_id: str, new_start_time: st
             new_end_time=new_end_time,
             new_summary=new_summary if new_summary else None
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_respond_to_event(calendar_id: str, event_id: str, response: str) -> str:
     """Respond to an event invitation (accepted, declined, tentative)"""
     try:
@@ -654,11 +755,11 @@ def calendar_respond_to_event(calendar_id: str, event_id: str, response: str) ->
             event_id=event_id,
             response=response
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_get_free_busy_info(calendar_ids: str, time_min: str, time_max: str) -> str:
     """Check free/busy information for calendars (comma-separated calendar IDs)"""
     try:
@@ -669,11 +770,11 @@ def calendar_get_free_busy_info(calendar_ids: str, time_min: str, time_max: str)
             time_min=time_min,
             time_max=time_max
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_create_calendar(summary: str, description: str = "", time_zone: str = "UTC") -> str:
     """Create a new calendar"""
     try:
@@ -683,21 +784,21 @@ def calendar_create_calendar(summary: str, description: str = "", time_zone: str
             description=description,
             time_zone=time_zone
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_delete_calendar(calendar_id: str) -> str:
     """Delete a calendar"""
     try:
         client = get_calendar_client()
         result = client.delete_calendar(calendar_id=calendar_id)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def calendar_set_event_reminders(calendar_id: str, event_id: str, reminders: str) -> str:
     """Set reminders for an event (JSON format: [{"method": "email", "minutes": 30}])"""
     try:
@@ -709,12 +810,12 @@ def calendar_set_event_reminders(calendar_id: str, event_id: str, reminders: str
             event_id=event_id,
             reminders=reminder_list
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Integration tools
-@mcp.tool()
+@_tool()
 def create_meeting_from_email(message_id: str, proposed_time: str = "", duration_minutes: int = 60, calendar_id: str = "primary") -> str:
     """Parse an email and create a calendar event from it"""
     try:
@@ -725,11 +826,11 @@ def create_meeting_from_email(message_id: str, proposed_time: str = "", duration
             duration_minutes=duration_minutes,
             calendar_id=calendar_id
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def save_email_to_drive(message_id: str, folder_id: str = "", file_format: str = "txt") -> str:
     """Save an email as a file in Google Drive"""
     try:
@@ -739,11 +840,11 @@ def save_email_to_drive(message_id: str, folder_id: str = "", file_format: str =
             folder_id=folder_id if folder_id else None,
             file_format=file_format
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def share_drive_file_via_email(file_id: str, recipient_email: str, message: str = "", subject: str = "", permission_role: str = "reader") -> str:
     """Share a Drive file and send email notification"""
     try:
@@ -755,11 +856,28 @@ def share_drive_file_via_email(file_id: str, recipient_email: str, message: str
             subject=subject if subject else "",
             permission_role=permission_role
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
+def share_drive_file_via_email_bulk(file_id: str, recipient_emails: str, message: str = "", subject: str = "", permission_role: str = "reader") -> str:
+    """Share a Drive file with several people (comma-separated emails) and email each of them"""
+    try:
+        client = get_integration_client()
+        recipients = [address.strip() for address in recipient_emails.split(',') if address.strip()]
+        result = client.share_drive_file_via_email_bulk(
+            file_id=file_id,
+            recipient_emails=recipients,
+            message=message,
+            subject=subject if subject else "",
+            permission_role=permission_role
+        )
+        return _to_json(result)
+    except Exception as e:
+        return _to_json({'success': False, 'error': str(e)})
+
+@_tool()
 def unified_search(query: str, search_drive: bool = True, search_gmail: bool = True, search_calendar: bool = True, max_results: int = 5) -> str:
     """Search across Gmail, Drive, and Calendar with a single query"""
     try:
@@ -771,12 +889,12 @@ def unified_search(query: str, search_drive: bool = True, search_gmail: bool = T
             search_calendar=search_calendar,
             max_results=max_results
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Contact management tools
-@mcp.tool()
+@_tool()
 def contacts_debug() -> str:
     """Debug contacts API connection and permissions"""
     try:
@@ -807,84 +925,84 @@ def contacts_debug() -> str:
                 if 'names' in sample_contact:
                     debug_info['sample_contact_name'] = sample_contact['names'][0].get('displayName', 'No display name')
             
-            return str({
+            return _to_json({
                 'success': True,
                 'debug_info': debug_info,
                 'suggestion': 'API access working. If total_contacts is 0, you may need to add contacts to your Google account first.'
             })
             
         except Exception as api_error:
-            return str({
+            return _to_json({
                 'success': False,
                 'api_error': str(api_error),
                 'suggestion': 'API access failed. You may need to re-authenticate with the contacts scope.'
             })
             
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_search(query: str, max_results: int = 10) -> str:
     """Search contacts by name or email using improved searchContacts API"""
     try:
         client = get_contacts_client()
         result = client.search_contacts(query=query, max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_search_directory(query: str, max_results: int = 10) -> str:
     """Search organization directory (Google Workspace accounts only)"""
     try:
         client = get_contacts_client()
         result = client.search_directory(query=query, max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_search_all(query: str, max_results: int = 10) -> str:
     """Search both personal contacts and directory (comprehensive search)"""
     try:
         client = get_contacts_client()
         result = client.search_all_sources(query=query, max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_list(max_results: int = 50) -> str:
     """List all contacts"""
     try:
         client = get_contacts_client()
         result = client.list_contacts(max_results=max_results)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_get(resource_name: str) -> str:
     """Get detailed contact information"""
     try:
         client = get_contacts_client()
         result = client.get_contact(resource_name=resource_name)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def contacts_resolve_email(name_or_email: str) -> str:
     """Resolve a contact name to email address"""
     try:
         client = get_contacts_client()
         result = client.resolve_contact_email(name_or_email=name_or_email)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # UNSAFE Smart tools (immediate execution - use with caution)
-@mcp.tool()
+@_tool()
 def smart_send_email_unsafe(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
     """⚠️ UNSAFE: Send email immediately without confirmation (use names or emails)"""
     try:
@@ -896,12 +1014,12 @@ def smart_send_email_unsafe(to: str, subject: str, body: str, cc: str = "", bcc:
             cc=cc if cc else "",
             bcc=bcc if bcc else ""
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # SAFE Smart tools with confirmation required
-@mcp.tool()
+@_tool()
 def prepare_send_email(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
     """✅ SAFE: Prepare email for sending - shows preview and requires confirmation"""
     try:
@@ -913,11 +1031,11 @@ def prepare_send_email(to: str, subject: str, body: str, cc: str = "", bcc: str
             cc=cc if cc else "",
             bcc=bcc if bcc else ""
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def smart_share_file_unsafe(file_id: str, recipient: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
     """⚠️ UNSAFE: Share file immediately without confirmation (use names or emails)"""
     try:
@@ -929,11 +1047,11 @@ def smart_share_file_unsafe(file_id: str, recipient: str, role: str = "reader",
             send_notification=send_notification,
             message=message
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def prepare_share_file(file_id: str, recipient: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
     """✅ SAFE: Prepare file sharing - shows preview and requires confirmation"""
     try:
@@ -945,11 +1063,27 @@ def prepare_share_file(file_id: str, recipient: str, role: str = "reader", send_
             send_notification=send_notification,
             message=message
         )
-        return str(result)
+        return _to_json(result)
+    except Exception as e:
+        return _to_json({'success': False, 'error': str(e)})
+
+@_tool()
+def prepare_share_file_bulk(file_ids: str, recipient: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
+    """✅ SAFE: Prepare sharing several files (comma-separated IDs) with one person - shows preview and requires confirmation"""
+    try:
+        tools = get_safe_tools()
+        result = tools.prepare_file_share_bulk(
+            file_ids=file_ids,
+            recipient=recipient,
+            role=role,
+            send_notification=send_notification,
+            message=message
+        )
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def smart_create_event_unsafe(summary: str, start_time: str, end_time: str, attendees: str = "", calendar_id: str = "primary", description: str = "", location: str = "") -> str:
     """⚠️ UNSAFE: Create calendar event immediately without confirmation (use names or emails)"""
     try:
@@ -963,11 +1097,11 @@ def smart_create_event_unsafe(summary: str, start_time: str, end_time: str, atte
             description=description,
             location=location
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def prepare_create_event(summary: str, start_time: str, end_time: str, attendees: str = "", calendar_id: str = "primary", description: str = "", location: str = "") -> str:
     """✅ SAFE: Prepare calendar event - shows preview and requires confirmation"""
     try:
@@ -981,11 +1115,11 @@ def prepare_create_event(summary: str, start_time: str, end_time: str, attendees
             description=description,
             location=location
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def smart_forward_email_unsafe(message_id: str, to: str, body: str = "") -> str:
     """⚠️ UNSAFE: Forward email immediately without confirmation (use names or emails)"""
     try:
@@ -995,14 +1129,14 @@ def smart_forward_email_unsafe(message_id: str, to: str, body: str = "") -> str:
             to=to,
             body=body
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
 # Confirmation tools
-@mcp.tool()
-def confirm_send_email(to: str, subject: str, body: str, cc: str = "", bcc: str = "") -> str:
-    """✅ Confirm and send the prepared email"""
+@_tool()
+def confirm_send_email(to: str, subject: str, body: str, cc: str = "", bcc: str = "", background: bool = False) -> str:
+    """✅ Confirm and send the prepared email. With background=True the email is queued and this returns at once; use check_send_status to see whether it was sent."""
     try:
         confirmation_data = {
             'to': to,
@@ -1012,12 +1146,22 @@ def confirm_send_email(to: str, subject: str, body: str, cc: str = "", bcc: str
             'bcc': bcc if bcc else None
         }
         tools = get_safe_tools()
-        result = tools.confirm_send_email(confirmation_data)
-        return str(result)
+        result = tools.confirm_send_email(confirmation_data, background=background)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
+def check_send_status(send_id: str) -> str:
+    """Check whether an email queued with confirm_send_email(background=True) was sent"""
+    try:
+        tools = get_safe_tools()
+        result = tools.check_send_status(send_id)
+        return _to_json(result)
+    except Exception as e:
+        return _to_json({'success': False, 'error': str(e)})
+
+@_tool()
 def confirm_share_file(file_id: str, recipient_email: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
     """✅ Confirm and share the prepared file"""
     try:
@@ -1030,11 +1174,28 @@ def confirm_share_file(file_id: str, recipient_email: str, role: str = "reader",
         }
         tools = get_safe_tools()
         result = tools.confirm_share_file(confirmation_data)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
+def confirm_share_file_bulk(file_ids: str, recipient_email: str, role: str = "reader", send_notification: bool = True, message: str = "") -> str:
+    """✅ Confirm and share the prepared files"""
+    try:
+        confirmation_data = {
+            'file_ids': file_ids,
+            'recipient_email': recipient_email,
+            'role': role,
+            'send_notification': send_notification,
+            'message': message
+        }
+        tools = get_safe_tools()
+        result = tools.confirm_share_file_bulk(confirmation_data)
+        return _to_json(result)
+    except Exception as e:
+        return _to_json({'success': False, 'error': str(e)})
+
+@_tool()
 def confirm_create_event(summary: str, start_time: str, end_time: str, attendees: str = "", calendar_id: str = "primary", description: str = "", location: str = "") -> str:
     """✅ Confirm and create the prepared calendar event"""
     try:
@@ -1049,11 +1210,11 @@ def confirm_create_event(summary: str, start_time: str, end_time: str, attendees
         }
         tools = get_safe_tools()
         result = tools.confirm_create_event(confirmation_data)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def prepare_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "", max_messages: int = 1000) -> str:
     """✅ SAFE: Prepare bulk email operations - shows preview and requires confirmation
     
@@ -1073,11 +1234,11 @@ def prepare_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "
             remove_labels=remove_labels,
             max_messages=max_messages
         )
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def confirm_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "", max_messages: int = 1000) -> str:
     """✅ Confirm and execute the prepared bulk email operation"""
     try:
@@ -1089,14 +1250,18 @@ def confirm_bulk_modify(query: str, add_labels: str = "", remove_labels: str = "
         }
         tools = get_safe_tools()
         result = tools.confirm_bulk_modify(confirmation_data)
-        return str(result)
+        return _to_json(result)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _to_json({'success': False, 'error': str(e)})
 
-@mcp.tool()
+@_tool()
 def cancel_operation() -> str:
     """❌ Cancel any pending operation (email, file share, calendar event, bulk operation)"""
     return "✅ Operation cancelled. No action was taken."
 
+def main():
+    """Run the server over stdio; entry point for the google-mcp-server script."""
+    mcp.run()
+
 # Export for mcp run
 app = mcp
\ No newline at end of file
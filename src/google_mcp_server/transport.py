@@ -0,0 +1,98 @@
+"""Shared HTTP transport for the Google API clients."""
+
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+
+# Sub-requests per batch HTTP call. The APIs accept 100, but Google recommends
+# 50 or fewer since larger batches are more likely to be rate limited.
+BATCH_SIZE = 50
+
+_thread_state = threading.local()
+
+
+def _thread_http() -> httplib2.Http:
+    """
+    Return an httplib2 connection pool owned by the calling thread.
+    
+    httplib2 is not thread-safe, so each thread keeps its own pool and
+    reuses it for every client and request made on that thread.
+    """
+    http = getattr(_thread_state, 'http', None)
+    if http is None:
+        http = _thread_state.http = build_http()
+    return http
+
+
+class _ThreadLocalHttp:
+    """
+    httplib2.Http stand-in that routes each call to the calling thread's pool.
+    
+    One instance is shared by every client, so keep-alive connections are
+    reused across clients while threads never share a connection.
+    """
+    
+    def request(self, *args, **kwargs):
+        return _thread_http().request(*args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(_thread_http(), name)
+
+
+_SHARED_HTTP = _ThreadLocalHttp()
+
+
+def authorized_http(credentials: Credentials) -> AuthorizedHttp:
+    """
+    Wrap the shared transport with credentials for building an API client.
+    
+    Clients built this way reuse keep-alive connections to Google and can be
+    used from several threads at once.
+    
+    Args:
+        credentials: Valid Google OAuth2 credentials
+        
+    Returns:
+        AuthorizedHttp to pass to googleapiclient build()
+    """
+    return AuthorizedHttp(credentials, http=_SHARED_HTTP)
+
+
+@lru_cache(maxsize=None)
+def _discovery_document(api: str, version: str) -> Optional[str]:
+    """
+    Load the discovery document bundled with googleapiclient once per process.
+    
+    The raw JSON string is cached rather than the parsed dict because
+    build_from_document mutates the dict it is given.
+    """
+    return get_static_doc(api, version)
+
+
+def build_service(api: str, version: str, http: AuthorizedHttp, **kwargs: Any) -> Any:
+    """
+    Build an API client from the cached discovery document.
+    
+    Falls back to googleapiclient's build() if the document is not bundled
+    with the installed library.
+    
+    Args:
+        api: API name, e.g. 'drive'
+        version: API version, e.g. 'v3'
+        http: Transport from authorized_http()
+        **kwargs: Extra arguments for build_from_document, e.g. model
+        
+    Returns:
+        googleapiclient Resource for the API
+    """
+    document = _discovery_document(api, version)
+    if document:
+        return build_from_document(document, http=http, **kwargs)
+    return build(api, version, http=http, **kwargs)
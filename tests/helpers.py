@@ -0,0 +1,59 @@
+"""Fakes shared by the client and tool tests."""
+
+from unittest.mock import Mock, patch
+
+from google_mcp_server.gmail_client import GmailClient
+
+
+class FakeBatch:
+    """Stand-in for BatchHttpRequest that executes sub-requests one by one."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for request_id, request in self.requests:
+            try:
+                response, exception = request.execute(), None
+            except Exception as e:
+                response, exception = None, e
+            self.callback(request_id, response, exception)
+
+
+class MockGmailClient(GmailClient):
+    """Gmail client backed by a mock service instead of the real API."""
+
+    def __init__(self):
+        # Avoid building a real service from the mock credentials
+        with patch('google_mcp_server.gmail_client.build_service', return_value=Mock()):
+            super().__init__(Mock())
+        self.batches = []
+
+        def new_batch(callback):
+            batch = FakeBatch(callback)
+            self.batches.append(batch)
+            return batch
+        self.service.new_batch_http_request.side_effect = new_batch
+        # Single page by default; tests that paginate set their own side effect
+        self.service.users.return_value.messages.return_value.list_next.return_value = None
+
+
+def metadata_response(message_id, subject, labels=None):
+    """Build a messages.get(format='metadata') response."""
+    return {
+        'id': message_id,
+        'threadId': f"thread-{message_id}",
+        'labelIds': labels or [],
+        'snippet': f"snippet {message_id}",
+        'internalDate': '0',
+        'payload': {
+            'headers': [
+                {'name': 'From', 'value': 'sender@example.com'},
+                {'name': 'Subject', 'value': subject},
+            ]
+        }
+    }
@@ -85,6 +85,47 @@ class TestGoogleAuthManager:
             result = auth_manager.get_credentials()
             assert result == mock_creds
     
+    @patch('google_mcp_server.auth.Credentials')
+    @patch('google_mcp_server.auth.Path.home')
+    def test_get_credentials_cached_in_memory(self, mock_home, mock_credentials_class):
+        """Test valid credentials are reused without re-reading the token file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mock_home.return_value = Path(temp_dir)
+            
+            mock_creds = Mock()
+            mock_creds.valid = True
+            mock_creds.expired = False
+            mock_credentials_class.from_authorized_user_file.return_value = mock_creds
+            
+            token_file = Path(temp_dir) / '.config' / 'google-mcp-server' / 'token.json'
+            token_file.parent.mkdir(parents=True, exist_ok=True)
+            token_file.write_text('{"token": "test"}')
+            
+            auth_manager = GoogleAuthManager(
+                client_id=self.client_id,
+                client_secret=self.client_secret
+            )
+            
+            assert auth_manager.get_credentials() is mock_creds
+            assert auth_manager.get_credentials() is mock_creds
+            assert mock_credentials_class.from_authorized_user_file.call_count == 1
+            
+            # Once the cached token expires it is refreshed in place, not reloaded
+            mock_creds.valid = False
+            mock_creds.expired = True
+            mock_creds.refresh_token = 'refresh'
+            
+            def refresh(request):
+                mock_creds.valid = True
+                mock_creds.expired = False
+            
+            mock_creds.refresh.side_effect = refresh
+            mock_creds.to_json.return_value = '{"token": "new"}'
+            
+            assert auth_manager.get_credentials() is mock_creds
+            assert mock_creds.refresh.call_count == 1
+            assert mock_credentials_class.from_authorized_user_file.call_count == 1
+    
     def test_get_user_info_no_credentials(self):
         """Test getting user info with no credentials."""
         with patch.object(GoogleAuthManager, 'get_credentials', return_value=None):
@@ -0,0 +1,92 @@
+"""Tests for the in-memory and persistent caches."""
+
+from unittest.mock import patch
+
+from google_mcp_server.cache import PersistentCache, TTLCache
+
+
+class TestTTLCache:
+    """Test TTLCache class."""
+    
+    def test_get_and_set(self):
+        """Stored values are returned until they expire."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+        
+        assert cache.get('a') == 1
+        assert cache.get('missing', 'default') == 'default'
+    
+    def test_entries_expire(self):
+        """Entries older than the TTL are treated as misses and dropped."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        with patch('google_mcp_server.cache.time.monotonic', return_value=100.0):
+            cache.set('a', 1)
+        with patch('google_mcp_server.cache.time.monotonic', return_value=110.0):
+            assert cache.get('a') is None
+        
+        assert len(cache) == 0
+    
+    def test_least_recently_used_entry_is_evicted(self):
+        """Reading an entry protects it from eviction."""
+        cache = TTLCache(maxsize=2, ttl=10)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+    
+    def test_discard_where(self):
+        """Entries can be removed by a key predicate."""
+        cache = TTLCache(maxsize=10, ttl=10)
+        cache.set(('m1', 'full'), 1)
+        cache.set(('m1', 'metadata'), 2)
+        cache.set(('m2', 'full'), 3)
+        
+        assert cache.discard_where(lambda key: key[0] == 'm1') == 2
+        assert cache.get(('m2', 'full')) == 3
+        assert len(cache) == 1
+
+
+class TestPersistentCache:
+    """Test PersistentCache class."""
+    
+    def test_values_survive_reopening(self, tmp_path):
+        """Entries written by one instance are read by the next."""
+        path = tmp_path / 'cache.sqlite3'
+        cache = PersistentCache(path, ttl=60)
+        cache.set('m1', {'success': True, 'message': {'id': 'm1'}})
+        cache.close()
+        
+        reopened = PersistentCache(path, ttl=60)
+        assert reopened.get('m1') == {'success': True, 'message': {'id': 'm1'}}
+        assert reopened.get('missing', 'default') == 'default'
+        assert len(reopened) == 1
+    
+    def test_entries_expire(self, tmp_path):
+        """Entries older than the TTL are misses."""
+        cache = PersistentCache(tmp_path / 'cache.sqlite3', ttl=60)
+        with patch('google_mcp_server.cache.time.time', return_value=1000.0):
+            cache.set('a', 1)
+        with patch('google_mcp_server.cache.time.time', return_value=1060.0):
+            assert cache.get('a') is None
+    
+    def test_file_is_private(self, tmp_path):
+        """The database file is readable by its owner only."""
+        path = tmp_path / 'cache.sqlite3'
+        PersistentCache(path, ttl=60)
+        
+        assert path.stat().st_mode & 0o077 == 0
+    
+    def test_pop_and_clear(self, tmp_path):
+        """Entries can be removed one at a time or all at once."""
+        cache = PersistentCache(tmp_path / 'cache.sqlite3', ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        
+        cache.pop('a')
+        assert cache.get('a') is None
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,133 @@
+"""Tests for the Google Contacts client."""
+
+from unittest.mock import Mock, patch
+
+from google_mcp_server.contacts_client import GoogleContactsClient
+from tests.helpers import FakeBatch
+
+
+class MockContactsClient(GoogleContactsClient):
+    """Contacts client backed by a mock service instead of the real API."""
+
+    def __init__(self, directory):
+        with patch('google_mcp_server.contacts_client.build_service', return_value=Mock()):
+            super().__init__(Mock())
+        self.batches = []
+
+        def new_batch(callback):
+            batch = FakeBatch(callback)
+            self.batches.append(batch)
+            return batch
+
+        def search(query, **kwargs):
+            if query not in directory:
+                return Mock(execute=Mock(side_effect=RuntimeError('search failed')))
+            results = [{'person': {'names': [{'displayName': name}],
+                                   'emailAddresses': [{'value': email}]}}
+                       for name, email in directory[query]]
+            return Mock(execute=Mock(return_value={'results': results}))
+
+        self.service.new_batch_http_request.side_effect = new_batch
+        self.people = self.service.people.return_value
+        self.people.searchContacts.side_effect = search
+
+
+class TestBatchResolve:
+    """Test GoogleContactsClient.batch_resolve."""
+
+    def test_names_are_searched_in_one_batch(self):
+        """Every name is searched in a single batch; emails need no lookup."""
+        client = MockContactsClient({
+            'alice': [('Alice Smith', 'alice@example.com')],
+            'bob': [],
+        })
+
+        results = client.batch_resolve(['alice', 'bob', 'carol@example.com'])
+
+        assert len(client.batches) == 1
+        assert len(client.batches[0].requests) == 2
+        assert results['alice']['resolved_email'] == 'alice@example.com'
+        assert results['bob']['success'] is False
+        assert results['carol@example.com']['resolved_email'] == 'carol@example.com'
+
+    def test_failed_searches_are_retried_individually(self):
+        """A search that fails inside the batch falls back to resolve_contact_email."""
+        client = MockContactsClient({'alice': [('Alice Smith', 'alice@example.com')]})
+        client.resolve_contact_email = Mock(return_value={'success': False, 'error': 'not found'})
+
+        results = client.batch_resolve(['alice', 'dave'])
+
+        client.resolve_contact_email.assert_called_once_with('dave')
+        assert results['alice']['success'] is True
+        assert results['dave'] == {'success': False, 'error': 'not found'}
+
+    def test_attendees_keep_their_order(self):
+        """resolve_attendee_emails reports resolved emails in the order given."""
+        client = MockContactsClient({
+            'alice': [('Alice Smith', 'alice@example.com')],
+            'bob': [('Bob Jones', 'bob@example.com')],
+        })
+
+        result = client.resolve_attendee_emails('bob, alice, eve')
+
+        assert result['resolved_emails'] == ['bob@example.com', 'alice@example.com']
+        assert result['total_processed'] == 3
+
+
+class TestResolveCache:
+    """Test caching of contact resolutions."""
+
+    def test_repeat_lookups_hit_the_cache(self):
+        """The same name, in any case or spacing, is searched once."""
+        client = MockContactsClient({'alice': [('Alice Smith', 'alice@example.com')]})
+
+        client.smart_email_resolve('alice')
+        client.smart_email_resolve(' Alice ', 'sharing')
+        client.batch_resolve(['ALICE'])
+
+        assert client.people.searchContacts.call_count == 1
+
+    def test_email_addresses_skip_the_search(self):
+        """An address that is already an email is used without a People API call."""
+        client = MockContactsClient({})
+
+        result = client.smart_email_resolve('carol@example.com')
+
+        assert result['email'] == 'carol@example.com'
+        client.people.searchContacts.assert_not_called()
+
+    def test_unmatched_names_are_cached_briefly(self):
+        """A search that found nobody is reused, but only from the short-lived cache."""
+        client = MockContactsClient({'bob': []})
+
+        assert client.resolve_contact_email('bob')['success'] is False
+        client.resolve_contact_email('bob')
+
+        assert client.people.searchContacts.call_count == 1
+        assert len(client._resolved_cache) == 0
+        assert len(client._unresolved_cache) == 1
+
+    def test_ambiguous_names_are_cached_briefly(self):
+        """Results needing confirmation stay out of the long-lived cache and echo the caller's input."""
+        # The top match has no address, so the caller must choose between the rest
+        client = MockContactsClient({'sam': [('Sam Lee', ''),
+                                             ('Sam Ortiz', 'sam.ortiz@example.com')]})
+
+        first = client.resolve_contact_email('sam')
+        second = client.resolve_contact_email(' SAM ')
+
+        assert first['requires_confirmation'] is True
+        assert second['original_query'] == ' SAM '
+        assert client.people.searchContacts.call_count == 1
+        assert len(client._resolved_cache) == 0
+        assert len(client._unresolved_cache) == 1
+
+    def test_failed_searches_are_not_cached(self):
+        """Errors from the People API are retried on the next call."""
+        client = MockContactsClient({})
+
+        client.resolve_contact_email('bob')
+        client.resolve_contact_email('bob')
+
+        assert client.people.searchContacts.call_count == 2
+        assert len(client._unresolved_cache) == 0
@@ -0,0 +1,167 @@
+"""Tests for the Google Drive client."""
+
+from unittest.mock import Mock, patch
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+
+from google_mcp_server.drive_client import GoogleDriveClient
+from google_mcp_server.transport import _SHARED_HTTP, _discovery_document
+from tests.helpers import FakeBatch
+
+FILE = {
+    'id': 'f1',
+    'name': 'Report',
+    'mimeType': 'text/plain',
+    'createdTime': '2024-01-01T00:00:00Z',
+    'modifiedTime': '2024-01-02T00:00:00Z',
+}
+
+
+class MockDriveClient(GoogleDriveClient):
+    """Drive client backed by a mock service instead of the real API."""
+
+    def __init__(self):
+        with patch('google_mcp_server.drive_client.build_service', return_value=Mock()):
+            super().__init__(Mock())
+        self.files = self.service.files.return_value
+        self.files.get.return_value.execute.return_value = dict(FILE)
+
+
+class TestGetFile:
+    """Test GoogleDriveClient.get_file caching."""
+
+    def test_metadata_is_cached(self):
+        """Repeat metadata lookups are served from cache."""
+        client = MockDriveClient()
+
+        first = client.get_file('f1')
+
+        assert first['file']['name'] == 'Report'
+        assert client.get_file('f1') is first
+        assert client.files.get.call_count == 1
+
+    def test_content_requests_bypass_cache(self):
+        """Requests for content always go to the API."""
+        client = MockDriveClient()
+        client.files.get_media.return_value.execute.return_value = b'hello'
+
+        client.get_file('f1')
+        result = client.get_file('f1', include_content=True)
+
+        assert result['file']['content'] == 'hello'
+        assert client.files.get.call_count == 2
+        assert 'content' not in client.get_file('f1')['file']
+
+    def test_rename_invalidates_cache(self):
+        """Changing a file drops its cached metadata."""
+        client = MockDriveClient()
+        client.files.update.return_value.execute.return_value = {'id': 'f1', 'name': 'New'}
+
+        client.get_file('f1')
+        client.rename_file('f1', 'New')
+        client.get_file('f1')
+
+        assert client.files.get.call_count == 2
+
+    def test_failures_are_not_cached(self):
+        """A failed lookup is retried on the next call."""
+        client = MockDriveClient()
+        response = client.files.get.return_value.execute.return_value
+        client.files.get.return_value.execute.side_effect = [RuntimeError('boom'), response]
+
+        assert client.get_file('f1')['success'] is False
+        assert client.get_file('f1')['success'] is True
+
+    def test_not_found_is_cached_briefly(self):
+        """A 404 is remembered, so retrying a bad ID does not call Drive again."""
+        client = MockDriveClient()
+        not_found = HttpError(httplib2.Response({'status': 404}), b'File not found')
+        client.files.get.return_value.execute.side_effect = not_found
+
+        first = client.get_file('missing')
+        second = client.get_file('missing', include_content=True)
+
+        assert first['success'] is False
+        assert second is first
+        assert client.files.get.call_count == 1
+
+
+class TestTransport:
+    """Test that the Drive client uses the shared per-thread transport."""
+
+    def test_service_is_built_on_shared_http(self):
+        """The service is built on the transport the other clients share."""
+        with patch('google_mcp_server.drive_client.build_service', return_value=Mock()) as build:
+            GoogleDriveClient(Mock())
+
+        assert build.call_args.args[2].http is _SHARED_HTTP
+
+    def test_discovery_document_loaded_once(self):
+        """Rebuilding the client reuses the cached discovery document."""
+        _discovery_document.cache_clear()
+        with patch('google_mcp_server.transport.get_static_doc', wraps=get_static_doc) as load:
+            first = GoogleDriveClient(Credentials('token'))
+            second = GoogleDriveClient(Credentials('token'))
+
+        assert load.call_count == 1
+        assert first.service is not second.service
+        assert hasattr(second.service, 'files')
+
+
+class TestBatchOperations:
+    """Test batched file lookups and shares."""
+
+    def _client(self):
+        client = MockDriveClient()
+        client.batches = []
+
+        def new_batch(callback):
+            batch = FakeBatch(callback)
+            client.batches.append(batch)
+            return batch
+        client.service.new_batch_http_request.side_effect = new_batch
+        return client
+
+    def test_get_files_batches_uncached_lookups(self):
+        """Only files missing from the cache are fetched, in one batch."""
+        client = self._client()
+        client.get_file('f1')
+
+        def get(fileId, fields):
+            if fileId == 'gone':
+                return Mock(execute=Mock(side_effect=HttpError(httplib2.Response({'status': 404}), b'missing')))
+            return Mock(execute=Mock(return_value={**FILE, 'id': fileId, 'name': f'Name {fileId}'}))
+        client.files.get.side_effect = get
+
+        results = client.get_files(['f1', 'f2', 'gone'])
+
+        assert len(client.batches) == 1
+        assert len(client.batches[0].requests) == 2
+        assert results['f1']['file']['name'] == 'Report'
+        assert results['f2']['file']['name'] == 'Name f2'
+        assert results['gone']['success'] is False
+        assert client.get_file('gone') is results['gone']
+
+    def test_share_files_reports_each_file(self):
+        """Every permission is created in one batch and failures are reported per file."""
+        client = self._client()
+        permissions = client.service.permissions.return_value
+
+        def create(fileId, **kwargs):
+            if fileId == 'locked':
+                return Mock(execute=Mock(side_effect=HttpError(httplib2.Response({'status': 403}), b'denied')))
+            return Mock(execute=Mock(return_value={
+                'id': f'p-{fileId}', 'type': 'user', 'role': 'reader', 'emailAddress': 'a@example.com'
+            }))
+        permissions.create.side_effect = create
+
+        result = client.share_files(['f1', 'locked', 'f2'], 'a@example.com')
+
+        assert len(client.batches) == 1
+        assert result['success'] is True
+        assert (result['shared'], result['total']) == (2, 3)
+        assert [r['success'] for r in result['results']] == [True, False, True]
+        assert result['results'][0]['permission']['id'] == 'p-f1'
@@ -0,0 +1,879 @@
+"""Tests for the Gmail client."""
+
+import asyncio
+import base64
+import email
+import email.policy
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+from google_mcp_server.gmail_client import (
+    GmailClient,
+    _OrjsonModel,
+    _build_raw,
+    _chunks,
+    _decode_into,
+)
+from google_mcp_server.transport import _SHARED_HTTP, _discovery_document, _thread_http
+from tests.helpers import MockGmailClient, metadata_response
+
+
+class TestListMessages:
+    """Test GmailClient.list_messages."""
+
+    def test_list_messages_preserves_order(self):
+        """Metadata fetched in batches is returned in list order."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': str(i)} for i in range(15)],
+            'resultSizeEstimate': 15
+        }
+
+        def get(userId, id, **kwargs):
+            request = Mock()
+            request.execute.return_value = metadata_response(id, f"Subject {id}", ['UNREAD'])
+            return request
+        messages.get.side_effect = get
+
+        result = client.list_messages(max_results=15)
+
+        assert result['success'] is True
+        assert [m['id'] for m in result['messages']] == [str(i) for i in range(15)]
+        assert result['messages'][3]['subject'] == 'Subject 3'
+        assert result['messages'][3]['unread'] is True
+
+    def test_list_messages_requests_partial_responses(self):
+        """List and metadata calls ask only for the fields that are used."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {'messages': [{'id': 'a'}]}
+        messages.get.return_value.execute.return_value = metadata_response('a', 'Hello')
+
+        client.list_messages()
+
+        assert messages.list.call_args.kwargs['fields'] == 'messages(id,threadId),resultSizeEstimate'
+        assert 'payload/headers' in messages.get.call_args.kwargs['fields']
+
+    def test_list_messages_without_enrich_skips_metadata(self):
+        """enrich=False returns ids straight from the list call."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': 'a', 'threadId': 'ta'}],
+            'resultSizeEstimate': 1
+        }
+
+        result = client.list_messages(max_results=1, enrich=False)
+
+        assert result['messages'] == [{'id': 'a', 'threadId': 'ta'}]
+        messages.get.assert_not_called()
+
+    def test_list_messages_matches_headers_case_insensitively(self):
+        """Non-canonical header capitalisation still populates the summary."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {'messages': [{'id': 'a'}]}
+        response = metadata_response('a', 'ignored')
+        response['payload']['headers'] = [
+            {'name': 'subject', 'value': 'lowercase'},
+            {'name': 'FROM', 'value': 'shouty@example.com'},
+            {'name': 'X-Mailer', 'value': 'unused'},
+        ]
+        messages.get.return_value.execute.return_value = response
+
+        summary = client.list_messages()['messages'][0]
+
+        assert summary['subject'] == 'lowercase'
+        assert summary['from'] == 'shouty@example.com'
+        assert summary['to'] == ''
+
+    def test_list_messages_batches_metadata_requests(self):
+        """Metadata requests are sent through the batch endpoint in chunks of 50."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': str(i)} for i in range(120)]
+        }
+        messages.get.side_effect = lambda userId, id, **kwargs: Mock(
+            execute=Mock(return_value=metadata_response(id, f"Subject {id}"))
+        )
+
+        result = client.list_messages(max_results=120)
+
+        assert [len(batch.requests) for batch in client.batches] == [50, 50, 20]
+        assert [m['id'] for m in result['messages']] == [str(i) for i in range(120)]
+
+    def test_list_messages_falls_back_when_batch_fails(self):
+        """If the batch call itself fails, messages are fetched individually."""
+        client = MockGmailClient()
+        client.service.new_batch_http_request.side_effect = None
+        client.service.new_batch_http_request.return_value.execute.side_effect = RuntimeError('no batch')
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {'messages': [{'id': 'a'}, {'id': 'b'}]}
+        messages.get.side_effect = lambda userId, id, **kwargs: Mock(
+            execute=Mock(return_value=metadata_response(id, 'Hello'))
+        )
+
+        result = client.list_messages()
+
+        assert [m['id'] for m in result['messages']] == ['a', 'b']
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_list_messages_retries_rate_limited_batch_items(self, sleep):
+        """Sub-requests rate limited inside a batch are retried individually."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {'messages': [{'id': 'a'}, {'id': 'b'}]}
+
+        def get(userId, id, **kwargs):
+            request = Mock()
+            if id == 'b':
+                request.execute.side_effect = [_http_error(429), metadata_response(id, 'Later')]
+            else:
+                request.execute.return_value = metadata_response(id, 'Now')
+            return request
+        messages.get.side_effect = get
+
+        result = client.list_messages()
+
+        assert [m['subject'] for m in result['messages']] == ['Now', 'Later']
+
+    def test_list_messages_skips_failed_messages(self):
+        """A message whose metadata fetch fails is dropped from the list."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': 'a'}, {'id': 'b'}],
+            'resultSizeEstimate': 2
+        }
+
+        def get(userId, id, **kwargs):
+            request = Mock()
+            if id == 'a':
+                request.execute.side_effect = RuntimeError('boom')
+            else:
+                request.execute.return_value = metadata_response(id, 'Hello')
+            return request
+        messages.get.side_effect = get
+
+        result = client.list_messages()
+
+        assert result['success'] is True
+        assert [m['id'] for m in result['messages']] == ['b']
+        assert result['totalMessages'] == 1
+
+
+def _http_error(status):
+    """Build an HttpError with the given status code."""
+    return HttpError(Mock(status=status, reason='error'), b'error')
+
+
+class TestExecuteWithRetry:
+    """Test GmailClient._execute_with_retry."""
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_retries_rate_limit_then_succeeds(self, sleep):
+        """429 responses are retried with backoff until the call succeeds."""
+        client = MockGmailClient()
+        request = Mock()
+        request.execute.side_effect = [_http_error(429), _http_error(503), {'ok': True}]
+
+        assert client._execute_with_retry(request) == {'ok': True}
+        assert request.execute.call_count == 3
+        assert sleep.call_count == 2
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_does_not_retry_client_errors(self, sleep):
+        """Non-retryable errors such as 404 are raised immediately."""
+        client = MockGmailClient()
+        request = Mock()
+        request.execute.side_effect = _http_error(404)
+
+        with pytest.raises(HttpError):
+            client._execute_with_retry(request)
+        assert request.execute.call_count == 1
+        sleep.assert_not_called()
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_gives_up_after_max_attempts(self, sleep):
+        """The last retryable error is raised once attempts run out."""
+        client = MockGmailClient()
+        request = Mock()
+        request.execute.side_effect = _http_error(500)
+
+        with pytest.raises(HttpError):
+            client._execute_with_retry(request, max_attempts=3)
+        assert request.execute.call_count == 3
+        assert sleep.call_count == 2
+
+
+def _encode(text):
+    """URL-safe base64 encode a body part the way the Gmail API does."""
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+def _parse_raw(raw):
+    """Parse a raw message sent to the API, which must be unpadded base64url."""
+    assert not raw.endswith('=')
+    data = base64.urlsafe_b64decode(raw + '=' * (-len(raw) % 4))
+    return email.message_from_bytes(data, policy=email.policy.default)
+
+
+class TestExtractMessageBody:
+    """Test GmailClient._extract_message_body."""
+
+    def test_joins_nested_parts_in_order(self):
+        """Text and html parts from nested multiparts are concatenated in order."""
+        client = MockGmailClient()
+        message = {
+            'payload': {
+                'mimeType': 'multipart/mixed',
+                'parts': [
+                    {'mimeType': 'text/plain', 'body': {'data': _encode('Hello ')}},
+                    {
+                        'mimeType': 'multipart/alternative',
+                        'parts': [
+                            {'mimeType': 'text/plain', 'body': {'data': _encode('wörld')}},
+                            {'mimeType': 'text/html', 'body': {'data': _encode('<p>hi</p>')}},
+                        ]
+                    },
+                ]
+            }
+        }
+
+        assert client._extract_message_body(message) == {
+            'text': 'Hello wörld',
+            'html': '<p>hi</p>'
+        }
+
+    def test_unpadded_parts_decode(self):
+        """Body data with its base64 padding stripped still decodes."""
+        client = MockGmailClient()
+        for text in ('a', 'ab', 'abc', 'abcd'):
+            data = _encode(text).rstrip('=')
+            message = {'payload': {'mimeType': 'text/plain', 'body': {'data': data}}}
+
+            assert client._extract_message_body(message)['text'] == text
+
+    def test_stdlib_decode_path_handles_urlsafe_alphabet(self):
+        """Without pybase64, str or bytes data with and without '-'/'_' decodes correctly."""
+        for raw in (b'\xfb\xff\xfe' * 10, b'plain ascii text'):
+            data = base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+            for encoded in (data, data.encode('ascii')):
+                buf = bytearray()
+                with patch('google_mcp_server.gmail_client._HAVE_PYBASE64', False):
+                    _decode_into(encoded, buf)
+
+                assert bytes(buf) == raw
+
+    def test_deeply_nested_parts_keep_document_order(self):
+        """Parts nested far deeper than the recursion limit are read in order."""
+        client = MockGmailClient()
+        part = {'mimeType': 'text/plain', 'body': {'data': _encode('inner')}}
+        for _ in range(2000):
+            part = {'mimeType': 'multipart/mixed', 'parts': [part]}
+        message = {
+            'payload': {
+                'mimeType': 'multipart/mixed',
+                'parts': [
+                    {'mimeType': 'text/plain', 'body': {'data': _encode('first ')}},
+                    part,
+                    {'mimeType': 'text/plain', 'body': {'data': _encode(' last')}},
+                ]
+            }
+        }
+
+        assert client._extract_message_body(message)['text'] == 'first inner last'
+
+    def test_invalid_utf8_is_replaced(self):
+        """Bytes that are not UTF-8 are replaced instead of failing the message."""
+        client = MockGmailClient()
+        data = base64.urlsafe_b64encode('caf\u00e9'.encode('latin-1')).decode('ascii')
+        message = {'payload': {'mimeType': 'text/plain', 'body': {'data': data}}}
+
+        assert client._extract_message_body(message)['text'] == 'caf\ufffd'
+
+    def test_prefer_text_skips_html_when_text_exists(self):
+        """With prefer_text, html is decoded only when there is no text part."""
+        client = MockGmailClient()
+        alternative = {
+            'payload': {
+                'mimeType': 'multipart/alternative',
+                'parts': [
+                    {'mimeType': 'text/plain', 'body': {'data': _encode('plain')}},
+                    {'mimeType': 'text/html', 'body': {'data': _encode('<p>html</p>')}},
+                ]
+            }
+        }
+        html_only = {'payload': {'mimeType': 'multipart/alternative', 'parts': alternative['payload']['parts'][1:]}}
+
+        assert client._extract_message_body(alternative, prefer_text=True) == {'text': 'plain', 'html': ''}
+        assert client._extract_message_body(html_only, prefer_text=True) == {'text': '', 'html': '<p>html</p>'}
+
+    def test_single_part_html(self):
+        """A single-part html message populates only the html body."""
+        client = MockGmailClient()
+        message = {'payload': {'mimeType': 'text/html', 'body': {'data': _encode('<b>x</b>')}}}
+
+        assert client._extract_message_body(message) == {'text': '', 'html': '<b>x</b>'}
+
+
+class TestSendMessage:
+    """Test GmailClient.send_message."""
+
+    def test_send_message_encodes_raw_urlsafe(self):
+        """The outgoing MIME message is sent as URL-safe base64."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.send.return_value.execute.return_value = {
+            'id': 'sent', 'threadId': 't', 'labelIds': ['SENT']
+        }
+
+        result = client.send_message('to@example.com', 'Hi', 'Body text')
+
+        assert result['success'] is True
+        raw = messages.send.call_args.kwargs['body']['raw']
+        sent = _parse_raw(raw)
+        assert sent['To'] == 'to@example.com'
+        assert sent['Subject'] == 'Hi'
+        assert sent.get_content().strip() == 'Body text'
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_server_error_is_not_retried(self, sleep):
+        """A 5xx on send may follow a delivery, so it is not retried."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.send.return_value.execute.side_effect = _http_error(503)
+
+        result = client.send_message('to@example.com', 'Hi', 'Body text')
+
+        assert result['success'] is False
+        assert messages.send.return_value.execute.call_count == 1
+        sleep.assert_not_called()
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_rate_limit_is_retried(self, sleep):
+        """A 429 means the send was rejected, so it is safe to retry."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.send.return_value.execute.side_effect = [
+            _http_error(429), {'id': 'sent', 'threadId': 't', 'labelIds': ['SENT']}
+        ]
+
+        assert client.send_message('to@example.com', 'Hi', 'Body text')['success'] is True
+        assert messages.send.return_value.execute.call_count == 2
+
+
+class TestBuildRaw:
+    """Test the hand-built plain text message serializer."""
+
+    def _parse(self, raw):
+        return email.message_from_bytes(raw, policy=email.policy.default)
+
+    def test_non_ascii_headers_are_encoded(self):
+        """Non-ASCII subjects and display names survive a parse round trip."""
+        raw = _build_raw('José <jose@example.com>, b@example.com', 'Café ☕', 'héllo', cc='c@example.com')
+
+        assert raw.split(b'\r\n\r\n')[0].isascii()
+        parsed = self._parse(raw)
+        assert parsed['Subject'] == 'Café ☕'
+        assert parsed['To'].addresses[0].addr_spec == 'jose@example.com'
+        assert parsed['To'].addresses[0].display_name == 'José'
+        assert parsed['Cc'] == 'c@example.com'
+        assert parsed.get_content().strip() == 'héllo'
+
+    def test_long_non_ascii_subject_folds_with_crlf(self):
+        """Long encoded subjects are folded with CRLF, never a bare LF."""
+        subject = 'Réunion trimestrielle ' * 5
+        raw = _build_raw('a@example.com', subject, 'body')
+        headers = raw.split(b'\r\n\r\n')[0]
+
+        assert b'\r\n ' in headers
+        assert b'\n' not in headers.replace(b'\r\n', b'')
+        assert self._parse(raw)['Subject'] == subject
+
+    def test_non_ascii_addresses_are_encoded(self):
+        """Internationalised addresses fall back to encoding the whole header."""
+        raw = _build_raw('Zoë <zoë@exämple.com>', 'Hi', 'body', cc='Zoë <zoë@exämple.com>')
+        headers = raw.split(b'\r\n\r\n')[0]
+
+        assert headers.isascii()
+        assert 'zoë@exämple.com' in str(self._parse(raw)['To'])
+
+    def test_header_line_breaks_cannot_inject_headers(self):
+        """CR/LF in a header value is folded rather than starting a new header."""
+        parsed = self._parse(_build_raw('a@example.com', 'Hi\r\nBcc: evil@example.com', 'body'))
+
+        assert parsed['Bcc'] is None
+        assert parsed['Subject'] == 'Hi Bcc: evil@example.com'
+
+    def test_html_builds_multipart_alternative(self):
+        """An html body produces text and html alternatives that parse back."""
+        raw = _build_raw('a@example.com', 'Hi', 'plain wörld', html='<p>html wörld</p>')
+        parsed = self._parse(raw)
+
+        assert parsed.get_content_type() == 'multipart/alternative'
+        assert parsed.get_body(('plain',)).get_content().strip() == 'plain wörld'
+        assert parsed.get_body(('html',)).get_content().strip() == '<p>html wörld</p>'
+
+    def test_html_without_text_has_single_part(self):
+        """An empty text body is left out of the alternatives."""
+        parsed = self._parse(_build_raw('a@example.com', 'Hi', '', html='<b>x</b>'))
+
+        assert [part.get_content_type() for part in parsed.iter_parts()] == ['text/html']
+
+    def test_extra_headers(self):
+        """Extra headers are emitted and empty values skipped."""
+        parsed = self._parse(_build_raw('a@example.com', 'Re: Hi', 'body',
+                                        extra_headers={'In-Reply-To': '<id@x>', 'References': ''}))
+
+        assert parsed['In-Reply-To'] == '<id@x>'
+        assert parsed['References'] is None
+
+    def test_short_ascii_body_is_sent_as_7bit(self):
+        """Line endings are normalized to CRLF and short ASCII bodies are not re-encoded."""
+        raw = _build_raw('a@example.com', 'Hi', 'one\rtwo\r\nthree\nfour')
+        headers, payload = raw.split(b'\r\n\r\n', 1)
+
+        assert b'Content-Transfer-Encoding: 7bit' in headers
+        assert payload == b'one\r\ntwo\r\nthree\r\nfour'
+
+    def test_long_lines_fall_back_to_base64(self):
+        """Bodies with lines over the RFC 5322 limit are base64 encoded."""
+        body = 'x' * 2000
+        parsed = self._parse(_build_raw('a@example.com', 'Hi', body))
+
+        assert parsed['Content-Transfer-Encoding'] == 'base64'
+        assert parsed.get_content() == body
+
+
+class TestInit:
+    """Test GmailClient construction."""
+
+    def test_discovery_document_loaded_once(self):
+        """Constructing several clients reuses the cached discovery document."""
+        _discovery_document.cache_clear()
+        with patch('google_mcp_server.transport.get_static_doc',
+                   wraps=get_static_doc) as load:
+            first = GmailClient(Credentials('token'))
+            second = GmailClient(Credentials('token'))
+
+        assert load.call_count == 1
+        assert first.service is not second.service
+        assert hasattr(second.service.users(), 'messages')
+
+    def test_service_reused_for_same_account(self):
+        """Clients for the same refreshable account share one built service."""
+        def credentials():
+            return Credentials('token', refresh_token='refresh', client_id='client')
+
+        first = GmailClient(credentials())
+        second = GmailClient(credentials())
+        try:
+            assert second.service is first.service
+        finally:
+            first.close()
+
+        third = GmailClient(credentials())
+        assert third.service is not first.service
+        third.close()
+
+    def test_clients_share_thread_local_transport(self):
+        """Every client uses the shared transport, which is per-thread underneath."""
+        first = GmailClient(Credentials('token'))
+        second = GmailClient(Credentials('token'))
+
+        assert first._http.http is second._http.http is _SHARED_HTTP
+
+        seen = {}
+
+        def record(name):
+            seen[name] = _thread_http()
+
+        threads = [threading.Thread(target=record, args=(n,)) for n in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert seen['a'] is not seen['b']
+        assert _thread_http() is _thread_http()
+
+
+class TestAsyncVariants:
+    """Test the asyncio wrappers around the blocking methods."""
+
+    async def test_async_calls_run_concurrently(self):
+        """Several async calls are in flight at once on worker threads."""
+        client = MockGmailClient()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def get_message(message_id, format, want_body):
+            barrier.wait()
+            return {'success': True, 'id': message_id, 'format': format}
+        client.get_message = get_message
+
+        results = await asyncio.gather(*(
+            client.get_message_async(str(i), 'metadata') for i in range(3)
+        ))
+
+        assert [r['id'] for r in results] == ['0', '1', '2']
+
+
+class TestErrorHandling:
+    """Test that guarded methods turn exceptions into failure results."""
+
+    @patch('google_mcp_server.gmail_client.time.sleep')
+    def test_http_error_becomes_failure_result(self, sleep):
+        """An HttpError is reported with its status and body."""
+        client = MockGmailClient()
+        labels = client.service.users.return_value.labels.return_value
+        labels.list.return_value.execute.side_effect = _http_error(403)
+
+        assert client.get_labels() == {'success': False, 'error': 'HTTP error: 403 - error'}
+
+    def test_other_errors_become_failure_result(self):
+        """Any other exception is reported by its message."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.modify.return_value.execute.side_effect = RuntimeError('boom')
+
+        assert client.mark_as_read('a') == {'success': False, 'error': 'boom'}
+
+
+class TestGetMessage:
+    """Test GmailClient.get_message."""
+
+    def _stub(self, client):
+        messages = client.service.users.return_value.messages.return_value
+        messages.get.return_value.execute.return_value = {
+            'id': 'a',
+            'threadId': 't',
+            'payload': {
+                'mimeType': 'text/plain',
+                'headers': [{'name': 'Subject', 'value': 'Hi'}],
+                'body': {'data': _encode('hello')}
+            }
+        }
+        return messages
+
+    def test_body_included_by_default(self):
+        """Full messages include the decoded body."""
+        client = MockGmailClient()
+        messages = self._stub(client)
+
+        result = client.get_message('a')
+
+        assert result['message']['body']['text'] == 'hello'
+        assert 'fields' not in messages.get.call_args.kwargs
+
+    def test_want_body_false_skips_body(self):
+        """want_body=False leaves the body out of the request and the result."""
+        client = MockGmailClient()
+        messages = self._stub(client)
+
+        result = client.get_message('a', want_body=False)
+
+        assert 'body' not in result['message']
+        assert result['message']['headers'] == {'Subject': 'Hi'}
+        assert 'payload/headers' in messages.get.call_args.kwargs['fields']
+
+    def test_result_is_cached_until_labels_change(self):
+        """Repeat reads are served from cache; modifying the message invalidates it."""
+        client = MockGmailClient()
+        messages = self._stub(client)
+
+        first = client.get_message('a')
+        assert client.get_message('a') is first
+        assert messages.get.call_count == 1
+
+        client.mark_as_read('a')
+        client.get_message('a')
+        assert messages.get.call_count == 2
+
+    def test_failures_are_not_cached(self):
+        """A failed fetch is retried on the next call."""
+        client = MockGmailClient()
+        messages = self._stub(client)
+        response = messages.get.return_value.execute.return_value
+        messages.get.return_value.execute.side_effect = [RuntimeError('boom'), response]
+
+        assert client.get_message('a')['success'] is False
+        assert client.get_message('a')['success'] is True
+
+
+class TestGetLabels:
+    """Test GmailClient.get_labels caching."""
+
+    def test_labels_are_cached_until_invalidated(self):
+        """Repeat calls reuse the cached list; invalidate_labels forces a refetch."""
+        client = MockGmailClient()
+        labels = client.service.users.return_value.labels.return_value
+        labels.list.return_value.execute.return_value = {
+            'labels': [{'id': 'INBOX', 'name': 'INBOX', 'type': 'system', 'messagesUnread': 2}]
+        }
+
+        first = client.get_labels()
+        assert client.get_labels() is first
+        assert labels.list.call_count == 1
+        assert first['labels'][0]['messagesUnread'] == 2
+        assert first['labels'][0]['threadsTotal'] == 0
+
+        client.invalidate_labels()
+        client.get_labels()
+        assert labels.list.call_count == 2
+
+
+class TestClose:
+    """Test GmailClient.close and the context manager protocol."""
+
+    def test_context_manager_closes_client(self):
+        """Leaving the with block clears caches but leaves the shared transport open."""
+        client = MockGmailClient()
+        client._http = Mock()
+        client._labels_cache.set('labels', {'success': True})
+
+        with client as entered:
+            assert entered is client
+
+        client._http.close.assert_not_called()
+        assert len(client._labels_cache) == 0
+
+
+class TestOrjsonModel:
+    """Test the orjson-backed response model."""
+
+    def test_deserialize_matches_stock_model(self):
+        """Responses parse to the same objects as googleapiclient's JsonModel."""
+        pytest.importorskip('orjson')
+        content = b'{"id": "a", "labelIds": ["INBOX"], "snippet": "caf\\u00e9"}'
+
+        assert _OrjsonModel().deserialize(content) == JsonModel().deserialize(content)
+
+    def test_non_json_falls_back_to_stock_model(self):
+        """Non-JSON bodies are returned as text, like the stock model."""
+        pytest.importorskip('orjson')
+
+        assert _OrjsonModel().deserialize(b'not json') == 'not json'
+
+    def test_serialize_matches_stock_model(self):
+        """Request bodies parse back to the same object, ASCII or not."""
+        pytest.importorskip('orjson')
+        for body in ({'raw': 'abc', 'threadId': 't1'}, {'name': 'caf\u00e9'}):
+            encoded = _OrjsonModel().serialize(body)
+
+            assert isinstance(encoded, str)
+            assert encoded.isascii()
+            assert json.loads(encoded) == json.loads(JsonModel().serialize(body))
+
+
+class TestListDrafts:
+    """Test GmailClient.list_drafts."""
+
+    def test_list_drafts_fetches_details_in_batch(self):
+        """Draft details come from one batch and failed drafts are skipped."""
+        client = MockGmailClient()
+        drafts = client.service.users.return_value.drafts.return_value
+        drafts.list.return_value.execute.return_value = {'drafts': [{'id': 'd1'}, {'id': 'd2'}]}
+
+        def get(userId, id, format):
+            request = Mock()
+            if id == 'd2':
+                request.execute.side_effect = RuntimeError('gone')
+            else:
+                request.execute.return_value = {'message': metadata_response('m1', 'Draft subject')}
+            return request
+        drafts.get.side_effect = get
+
+        result = client.list_drafts()
+
+        assert len(client.batches) == 1
+        assert result['totalDrafts'] == 1
+        assert result['drafts'][0]['id'] == 'd1'
+        assert result['drafts'][0]['subject'] == 'Draft subject'
+
+
+class TestReplyToMessage:
+    """Test GmailClient.reply_to_message."""
+
+    def _reply_subject(self, original_subject):
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.get.return_value.execute.return_value = {
+            'threadId': 't',
+            'payload': {'headers': [
+                {'name': 'Subject', 'value': original_subject},
+                {'name': 'From', 'value': 'sender@example.com'},
+                {'name': 'Message-ID', 'value': '<orig@example.com>'},
+            ]}
+        }
+        messages.send.return_value.execute.return_value = {'id': 'r', 'threadId': 't'}
+
+        assert client.reply_to_message('a', 'Thanks')['success'] is True
+        raw = messages.send.call_args.kwargs['body']['raw']
+        sent = _parse_raw(raw)
+        assert sent['In-Reply-To'] == '<orig@example.com>'
+        return sent['Subject']
+
+    def test_reply_prefix_is_not_duplicated(self):
+        """Existing leading Re: markers collapse into one."""
+        assert self._reply_subject('Re: RE:  Lunch') == 'Re: Lunch'
+
+    def test_inner_re_is_kept(self):
+        """Only leading markers are stripped, not ones inside the subject."""
+        assert self._reply_subject('Notes on Re: Lunch') == 'Re: Notes on Re: Lunch'
+
+
+class TestBatchModifyMessages:
+    """Test GmailClient.batch_modify_messages."""
+
+    def test_chunks_ids_and_invalidates_cache(self):
+        """IDs are sent 1000 per batchModify call and cached copies dropped."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        client._message_cache.set(('5', 'full', True), {'success': True})
+        ids = [str(i) for i in range(2500)]
+
+        result = client.batch_modify_messages(ids, remove_labels=['UNREAD'])
+
+        assert result['success'] is True
+        assert result['processed'] == 2500
+        bodies = [call.kwargs['body'] for call in messages.batchModify.call_args_list]
+        assert [len(body['ids']) for body in bodies] == [1000, 1000, 500]
+        assert bodies[0]['removeLabelIds'] == ['UNREAD']
+        assert 'addLabelIds' not in bodies[0]
+        assert len(client._message_cache) == 0
+
+    def test_failed_chunk_is_reported(self):
+        """A chunk that fails inside the batch is counted as not processed."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+
+        def batch_modify(userId, body):
+            request = Mock()
+            if body['ids'][0] == '1000':
+                request.execute.side_effect = _http_error(400)
+            return request
+        messages.batchModify.side_effect = batch_modify
+
+        result = client.batch_modify_messages([str(i) for i in range(1500)], add_labels=['STARRED'])
+
+        assert result['success'] is True
+        assert result['processed'] == 1000
+        assert result['message'] == 'Modified 1000 of 1500 messages'
+
+    def test_accepts_any_iterable_of_ids(self):
+        """IDs may come from a generator, and are chunked the same way."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+
+        client._batch_modify((str(i) for i in range(1200)), add_labels=['STARRED'])
+
+        bodies = [call.kwargs['body'] for call in messages.batchModify.call_args_list]
+        assert [len(body['ids']) for body in bodies] == [1000, 200]
+
+    def test_chunks_helper(self):
+        """_chunks yields full lists and a shorter final one."""
+        assert list(_chunks(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(_chunks([], 2)) == []
+
+    def test_requires_a_label_change(self):
+        """Calling without labels to add or remove is rejected."""
+        client = MockGmailClient()
+
+        assert client.batch_modify_messages(['a'])['success'] is False
+
+
+class TestBulkModify:
+    """Test GmailClient.bulk_modify."""
+
+    def test_ids_are_collected_across_list_pages(self):
+        """IDs come from every page up to max_messages, before anything is modified."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        first, second = Mock(), Mock()
+        first.execute.return_value = {
+            'messages': [{'id': f'a{i}'} for i in range(500)], 'nextPageToken': 'p2'
+        }
+        second.execute.return_value = {
+            'messages': [{'id': f'b{i}'} for i in range(500)], 'nextPageToken': 'p3'
+        }
+        messages.list.return_value = first
+        messages.list_next.side_effect = [second, AssertionError('limit reached')]
+
+        result = client.bulk_modify('is:unread', remove_labels=['UNREAD'], max_messages=700)
+
+        assert messages.list.call_args.kwargs['maxResults'] == 500
+        assert result['total_found'] == 700
+        ids = messages.batchModify.call_args.kwargs['body']['ids']
+        assert ids[0] == 'a0' and ids[-1] == 'b199'
+
+    def test_matching_messages_are_modified_in_1000_id_chunks(self):
+        """Each batchModify call carries up to 1000 IDs, sent in one batch request."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        ids = [f'm{i}' for i in range(1500)]
+        messages.list.return_value.execute.return_value = {'messages': [{'id': i} for i in ids]}
+
+        result = client.bulk_modify('in:inbox', remove_labels=['INBOX'], max_messages=1500)
+
+        assert result['processed'] == 1500
+        assert result['batches'] == [{'batch': 1, 'processed': 1000}, {'batch': 2, 'processed': 500}]
+        assert len(client.batches) == 1
+        bodies = [c.kwargs['body'] for c in messages.batchModify.call_args_list]
+        assert [len(b['ids']) for b in bodies] == [1000, 500]
+        assert bodies[0]['removeLabelIds'] == ['INBOX']
+        assert 'addLabelIds' not in bodies[0]
+
+    def test_failed_chunks_are_reported(self):
+        """Messages in chunks that failed are counted in the result message."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': f'm{i}'} for i in range(1500)]
+        }
+        client._batch_modify = Mock(return_value=[1000, 0])
+
+        result = client.bulk_modify('in:inbox', remove_labels=['INBOX'], max_messages=1500)
+
+        assert result['processed'] == 1000
+        assert '1000 of 1500 messages' in result['message']
+        assert '500 could not be modified' in result['message']
+
+        client._batch_modify = Mock(return_value=[0, 0])
+
+        result = client.bulk_modify('in:inbox', remove_labels=['INBOX'], max_messages=1500)
+
+        assert result['success'] is False
+        assert result['message'] == "Failed to modify 1500 messages (removed labels ['INBOX'])"
+
+
+class TestForwardMessage:
+    """Test GmailClient.forward_message."""
+
+    def test_html_only_message_forwards_html(self):
+        """An original with only an html body forwards that html."""
+        client = MockGmailClient()
+        messages = client.service.users.return_value.messages.return_value
+        messages.get.return_value.execute.return_value = {
+            'payload': {
+                'mimeType': 'multipart/alternative',
+                'headers': [{'name': 'Subject', 'value': 'Fwd: News'}],
+                'parts': [{'mimeType': 'text/html', 'body': {'data': _encode('<p>news</p>')}}]
+            }
+        }
+        messages.send.return_value.execute.return_value = {'id': 'f', 'threadId': 't'}
+
+        assert client.forward_message('a', 'to@example.com', 'FYI')['success'] is True
+        raw = messages.send.call_args.kwargs['body']['raw']
+        sent = _parse_raw(raw)
+        assert sent['Subject'] == 'Fwd: News'
+        assert '<p>news</p>' in sent.get_content()
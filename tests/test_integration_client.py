@@ -0,0 +1,303 @@
+"""Tests for the cross-service integration client."""
+
+import threading
+from datetime import date, datetime
+from unittest.mock import Mock
+
+from google_mcp_server.cache import PersistentCache
+from google_mcp_server.integration_client import GoogleIntegrationClient, _default_meeting_start
+
+
+def _client():
+    return GoogleIntegrationClient(Mock(), Mock(), Mock())
+
+
+class TestUnifiedSearch:
+    """Test GoogleIntegrationClient.unified_search."""
+
+    def test_services_are_searched_concurrently(self):
+        """All three searches are in flight at once and their results are merged."""
+        client = _client()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def respond(result):
+            def search(query, max_results):
+                # Only passes if all three searches are running at the same time
+                barrier.wait()
+                return result
+            return search
+
+        client.drive_client.search_files.side_effect = respond(
+            {'success': True, 'files': [{'id': 'f'}], 'totalFiles': 1})
+        client.gmail_client.search_messages.side_effect = respond(
+            {'success': True, 'messages': [{'id': 'm'}], 'totalMessages': 1})
+        client.calendar_client.search_events.side_effect = respond(
+            {'success': False, 'error': 'boom'})
+
+        result = client.unified_search('report')
+
+        assert result['success'] is True
+        assert result['drive'] == {'files': [{'id': 'f'}], 'totalFiles': 1}
+        assert result['gmail'] == {'messages': [{'id': 'm'}], 'totalMessages': 1}
+        assert result['calendar'] == {'events': [], 'totalEvents': 0}
+        assert result['totalResults'] == 2
+
+    def test_disabled_services_are_not_searched(self):
+        """Services switched off are neither searched nor reported."""
+        client = _client()
+        client.drive_client.search_files.return_value = {'success': True, 'files': [], 'totalFiles': 0}
+
+        result = client.unified_search('report', search_gmail=False, search_calendar=False)
+
+        assert result['success'] is True
+        assert result['drive'] == {'files': [], 'totalFiles': 0}
+        assert 'gmail' not in result and 'calendar' not in result
+        client.gmail_client.search_messages.assert_not_called()
+        client.calendar_client.search_events.assert_not_called()
+
+    def test_search_exception_fails_the_call(self):
+        """An exception from one service is reported as a failed search."""
+        client = _client()
+        client.drive_client.search_files.side_effect = RuntimeError('down')
+        client.gmail_client.search_messages.return_value = {'success': True}
+        client.calendar_client.search_events.return_value = {'success': True}
+
+        assert client.unified_search('report') == {'success': False, 'error': 'down'}
+
+
+class TestShareDriveFileViaEmailBulk:
+    """Test GoogleIntegrationClient.share_drive_file_via_email_bulk."""
+
+    def test_file_is_fetched_once_and_each_share_is_emailed(self):
+        """Metadata is looked up once; recipients whose share failed get no email."""
+        client = _client()
+        client.drive_client.get_file.return_value = {
+            'success': True, 'file': {'name': 'Plan', 'webViewLink': 'https://link'}
+        }
+        client.drive_client.share_file.side_effect = lambda file_id, email_address, role, send_notification: (
+            {'success': False, 'error': 'denied'} if email_address == 'c@example.com'
+            else {'success': True, 'permission': {'emailAddress': email_address}}
+        )
+        client.gmail_client.send_message.return_value = {'success': True, 'message': {'id': 'm'}}
+
+        result = client.share_drive_file_via_email_bulk(
+            'f1', ['a@example.com', 'b@example.com', 'c@example.com'], message='See attached')
+
+        assert result['success'] is True
+        client.drive_client.get_file.assert_called_once_with('f1')
+        assert [r['shared'] for r in result['results']] == [True, True, False]
+        assert result['results'][2]['error'] == 'denied'
+        assert 'emailed' not in result['results'][2]
+        sent_to = sorted(c.kwargs['to'] for c in client.gmail_client.send_message.call_args_list)
+        assert sent_to == ['a@example.com', 'b@example.com']
+        call = client.gmail_client.send_message.call_args
+        assert call.kwargs['subject'] == 'Shared file: Plan'
+        assert 'https://link' in call.kwargs['body']
+        assert 'See attached' in call.kwargs['body']
+
+    def test_recipients_are_shared_concurrently(self):
+        """Each recipient's share is in flight at the same time."""
+        client = _client()
+        client.drive_client.get_file.return_value = {'success': True, 'file': {'name': 'Plan'}}
+        barrier = threading.Barrier(2, timeout=5)
+
+        def share_file(**kwargs):
+            barrier.wait()
+            return {'success': True, 'permission': {}}
+
+        client.drive_client.share_file.side_effect = share_file
+        client.gmail_client.send_message.return_value = {'success': True, 'message': {}}
+
+        result = client.share_drive_file_via_email_bulk('f1', ['a@example.com', 'b@example.com'])
+
+        assert [r['recipient'] for r in result['results']] == ['a@example.com', 'b@example.com']
+        assert all(r['emailed'] for r in result['results'])
+
+
+class TestSaveEmailToDrive:
+    """Test GoogleIntegrationClient.save_email_to_drive."""
+
+    def _stub(self, client, body):
+        client.gmail_client.get_message.return_value = {
+            'success': True,
+            'message': {
+                'headers': {'Subject': 'Q3 plan', 'From': 'Ann <ann@example.com>',
+                            'Date': 'Mon, 1 Jan 2024', 'To': 'me@example.com'},
+                'body': body,
+            }
+        }
+        client.drive_client.create_file.return_value = {'success': True, 'file': {'id': 'f'}}
+
+    def test_text_file_uses_message_headers(self):
+        """Subject, sender and recipients come from the message headers."""
+        client = _client()
+        self._stub(client, {'text': 'Numbers attached', 'html': ''})
+
+        result = client.save_email_to_drive('m1')
+
+        assert result['success'] is True
+        kwargs = client.drive_client.create_file.call_args.kwargs
+        assert kwargs['name'] == 'Email_Q3-plan_m1.txt'
+        assert 'Subject: Q3 plan' in kwargs['content']
+        assert 'From: Ann <ann@example.com>' in kwargs['content']
+        assert 'To: me@example.com' in kwargs['content']
+        assert 'Numbers attached' in kwargs['content']
+
+    def test_html_file_falls_back_to_text_body(self):
+        """A message without an html part still has its text saved."""
+        client = _client()
+        self._stub(client, {'text': 'Numbers attached', 'html': ''})
+
+        client.save_email_to_drive('m1', file_format='html')
+
+        content = client.drive_client.create_file.call_args.kwargs['content']
+        assert 'Numbers attached' in content
+        assert 'No content' not in content
+
+    def test_html_file_escapes_header_values(self):
+        """Header values are escaped, while an html body is kept as markup."""
+        client = _client()
+        self._stub(client, {'text': 'x', 'html': '<p>{Numbers}</p>'})
+
+        client.save_email_to_drive('m1', file_format='html')
+
+        content = client.drive_client.create_file.call_args.kwargs['content']
+        assert 'Ann &lt;ann@example.com&gt;' in content
+        assert '<p>{Numbers}</p>' in content
+
+
+class TestCreateMeetingFromEmail:
+    """Test GoogleIntegrationClient.create_meeting_from_email."""
+
+    def _stub(self, client, subject, body):
+        client.gmail_client.get_message.return_value = {
+            'success': True,
+            'message': {
+                'headers': {'Subject': subject, 'From': 'Ann <ann@example.com>'},
+                'body': {'text': body, 'html': ''},
+            }
+        }
+        client.calendar_client.create_event.return_value = {'success': True, 'event': {'id': 'e'}}
+
+    def test_event_uses_subject_and_sender(self):
+        """The event summary, attendee and end time come from the email and duration."""
+        client = _client()
+        self._stub(client, 'Budget meeting', 'Short note')
+
+        result = client.create_meeting_from_email('m1', proposed_time='2024-05-06T14:00:00+00:00',
+                                                  duration_minutes=30)
+
+        assert result['success'] is True
+        kwargs = client.calendar_client.create_event.call_args.kwargs
+        assert kwargs['summary'] == 'Meeting: Budget meeting'
+        assert kwargs['attendees'] == 'ann@example.com'
+        assert kwargs['end_time'] == '2024-05-06T14:30:00+00:00'
+        assert kwargs['description'].endswith('Short note')
+
+    def test_default_start_is_next_business_day_at_2pm(self):
+        """Without a proposed time, meetings go to 2 PM on the next weekday."""
+        # Wednesday -> Thursday, Friday -> Monday, Saturday -> Monday
+        assert _default_meeting_start(date(2024, 5, 8)) == datetime(2024, 5, 9, 14, 0)
+        assert _default_meeting_start(date(2024, 5, 10)) == datetime(2024, 5, 13, 14, 0)
+        assert _default_meeting_start(date(2024, 5, 11)) == datetime(2024, 5, 13, 14, 0)
+
+    def test_long_body_is_truncated(self):
+        """Only the first 500 characters of the body go into the description."""
+        client = _client()
+        self._stub(client, 'Budget', 'x' * 600)
+
+        client.create_meeting_from_email('m1', proposed_time='2024-05-06T14:00:00+00:00')
+
+        description = client.calendar_client.create_event.call_args.kwargs['description']
+        assert description.endswith('x' * 500 + '...')
+        assert 'x' * 501 not in description
+
+
+class TestPersistentMessageCache:
+    """Test the optional persistent message cache."""
+
+    def test_cached_message_is_not_fetched_again(self, tmp_path):
+        """A message read once is served from the cache, also by a new client."""
+        path = tmp_path / 'messages.sqlite3'
+        client = GoogleIntegrationClient(Mock(), Mock(), Mock(), message_cache=PersistentCache(path, ttl=60))
+        client.gmail_client.get_message.return_value = {
+            'success': True,
+            'message': {'headers': {'Subject': 'Hi', 'From': 'a@example.com'}, 'body': {'text': 'x'}}
+        }
+        client.drive_client.create_file.return_value = {'success': True, 'file': {}}
+
+        client.save_email_to_drive('m1')
+        restarted = GoogleIntegrationClient(client.drive_client, Mock(), Mock(),
+                                            message_cache=PersistentCache(path, ttl=60))
+        restarted.save_email_to_drive('m1')
+
+        client.gmail_client.get_message.assert_called_once_with('m1', format='full')
+        restarted.gmail_client.get_message.assert_not_called()
+        assert 'Subject: Hi' in client.drive_client.create_file.call_args.kwargs['content']
+
+    def test_failures_are_not_cached(self, tmp_path):
+        """Failed lookups are retried."""
+        cache = PersistentCache(tmp_path / 'messages.sqlite3', ttl=60)
+        client = GoogleIntegrationClient(Mock(), Mock(), Mock(), message_cache=cache)
+        client.gmail_client.get_message.return_value = {'success': False, 'error': 'gone'}
+
+        client.save_email_to_drive('m1')
+
+        assert len(cache) == 0
+
+
+class TestShareDriveFileViaEmail:
+    """Test GoogleIntegrationClient.share_drive_file_via_email."""
+
+    def _client(self):
+        client = _client()
+        client.drive_client.get_file.return_value = {
+            'success': True, 'file': {'name': 'Plan', 'webViewLink': 'https://link'}
+        }
+        return client
+
+    def test_email_is_sent_after_share(self):
+        """The notification goes out only after the share has been created."""
+        client = self._client()
+        calls = []
+
+        def share_file(**kwargs):
+            calls.append('share')
+            return {'success': True, 'permission': {'id': 'p'}}
+
+        def send_message(**kwargs):
+            calls.append('email')
+            return {'success': True, 'message': {'id': 'm'}}
+
+        client.drive_client.share_file.side_effect = share_file
+        client.gmail_client.send_message.side_effect = send_message
+
+        result = client.share_drive_file_via_email('f1', 'a@example.com')
+
+        assert calls == ['share', 'email']
+        assert result['success'] is True
+        assert result['emailSent'] is True
+        assert result['sharing'] == {'id': 'p'}
+        assert result['message'] == "File 'Plan' shared with a@example.com and email sent"
+
+    def test_failed_share_sends_no_email(self):
+        """A failed share is an error and the recipient is not emailed."""
+        client = self._client()
+        client.drive_client.share_file.return_value = {'success': False, 'error': 'denied'}
+
+        result = client.share_drive_file_via_email('f1', 'a@example.com')
+
+        assert result == {'success': False, 'error': 'denied', 'emailSent': False}
+        client.gmail_client.send_message.assert_not_called()
+
+    def test_failed_email_is_reported(self):
+        """A successful share with a failed email says so in the message."""
+        client = self._client()
+        client.drive_client.share_file.return_value = {'success': True, 'permission': {}}
+        client.gmail_client.send_message.return_value = {'success': False, 'error': 'quota'}
+
+        result = client.share_drive_file_via_email('f1', 'a@example.com')
+
+        assert result['success'] is True
+        assert result['emailSent'] is False
+        assert result['message'].endswith('but the email failed: quota')
@@ -0,0 +1,232 @@
+"""Tests for the confirmation-based safe tools."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from google_mcp_server.safe_tools import SafeGoogleTools, _resolution_message, _split_list
+from tests.helpers import MockGmailClient, metadata_response
+
+
+def _tools(gmail=None):
+    return SafeGoogleTools(Mock(), gmail or MockGmailClient(), Mock(), Mock())
+
+
+class TestPrepareBulkModify:
+    """Test SafeGoogleTools.prepare_bulk_modify."""
+
+    def test_sample_messages_are_fetched_in_one_batch(self):
+        """The preview samples come from a single batch request; failures are skipped."""
+        gmail = MockGmailClient()
+        messages = gmail.service.users.return_value.messages.return_value
+        messages.list.return_value.execute.return_value = {
+            'messages': [{'id': f'm{i}'} for i in range(7)], 'resultSizeEstimate': 7
+        }
+
+        def get(userId, id, format, metadataHeaders, fields):
+            request = Mock()
+            if id == 'm2':
+                request.execute.side_effect = RuntimeError('gone')
+            else:
+                request.execute.return_value = metadata_response(id, f'Subject {id}')
+            return request
+        messages.get.side_effect = get
+
+        result = _tools(gmail).prepare_bulk_modify('in:inbox', remove_labels='INBOX')
+
+        assert result['success'] is True
+        assert len(gmail.batches) == 1
+        assert messages.get.call_count == 5
+        assert messages.list.call_args.kwargs['maxResults'] == 5
+        assert messages.list.call_args.kwargs['fields'] == 'messages/id,resultSizeEstimate'
+        assert 'Operations: REMOVE labels: INBOX' in result['message']
+        samples = result['preview']['sample_messages']
+        assert [sample['subject'] for sample in samples] == [
+            'Subject m0', 'Subject m1', 'Subject m3', 'Subject m4'
+        ]
+
+
+class TestConfirmSendEmail:
+    """Test synchronous and background email sending."""
+
+    CONFIRMATION = {'to': 'a@example.com', 'subject': 'Hi', 'body': 'Hello', 'cc': None, 'bcc': None}
+
+    def _tools(self, send_result):
+        gmail = Mock()
+        gmail.send_message.return_value = send_result
+        return SafeGoogleTools(None, gmail, None, None), gmail
+
+    def test_sends_synchronously_by_default(self):
+        """Test that the default path waits for Gmail and reports the result."""
+        tools, gmail = self._tools({'success': True, 'message_id': 'm1'})
+
+        result = tools.confirm_send_email(self.CONFIRMATION)
+
+        assert result['success'] is True
+        assert 'queued' not in result
+        gmail.send_message.assert_called_once()
+
+    def test_background_send_reports_status(self):
+        """Test that a queued send can be looked up once it finishes."""
+        tools, gmail = self._tools({'success': True, 'message_id': 'm1'})
+
+        queued = tools.confirm_send_email(self.CONFIRMATION, background=True)
+        assert queued['queued'] is True
+        tools._pending_sends[queued['send_id']].result(timeout=5)
+
+        status = tools.check_send_status(queued['send_id'])
+        assert status['status'] == 'sent'
+        assert status['message_id'] == 'm1'
+
+    def test_background_send_failure_is_reported(self):
+        """Test that a failed background send is surfaced by check_send_status."""
+        tools, gmail = self._tools({'success': False, 'error': 'Invalid To header'})
+
+        queued = tools.confirm_send_email(self.CONFIRMATION, background=True)
+        tools._pending_sends[queued['send_id']].result(timeout=5)
+
+        status = tools.check_send_status(queued['send_id'])
+        assert status['status'] == 'failed'
+        assert status['success'] is False
+
+    def test_unknown_send_id(self):
+        """Test that an unknown send_id is an error."""
+        tools, gmail = self._tools({'success': True})
+
+        assert tools.check_send_status('missing')['success'] is False
+
+    def test_close_stops_pool_and_forgets_sends(self):
+        """Test that close shuts the send pool down and drops tracked sends."""
+        tools, gmail = self._tools({'success': True, 'message_id': 'm1'})
+        queued = tools.confirm_send_email(self.CONFIRMATION, background=True)
+        tools._pending_sends[queued['send_id']].result(timeout=5)
+
+        tools.close()
+
+        assert tools.check_send_status(queued['send_id'])['success'] is False
+        with pytest.raises(RuntimeError):
+            tools._send_executor.submit(lambda: None)
+
+
+class TestPrepareEmail:
+    """Test recipient resolution in SafeGoogleTools.prepare_email."""
+
+    def _tools(self, resolve):
+        contacts = Mock()
+        contacts.smart_email_resolve.side_effect = resolve
+        return SafeGoogleTools(contacts, Mock(), Mock(), Mock()), contacts
+
+    def test_resolves_each_recipient_in_place(self):
+        """Results from the concurrent lookups land on the right field."""
+        tools, contacts = self._tools(
+            lambda name, context: {'success': True, 'email': f"{name}@example.com", 'message': name})
+
+        result = tools.prepare_email('alice', 'Hi', 'Hello', cc='bob', bcc='carol')
+
+        assert result['success'] is True
+        preview = result['preview']
+        assert preview['to']['resolved'] == 'alice@example.com'
+        assert preview['cc']['resolved'] == 'bob@example.com'
+        assert preview['bcc']['resolved'] == 'carol@example.com'
+        assert contacts.smart_email_resolve.call_count == 3
+
+    def test_blank_cc_is_not_looked_up(self):
+        """Only recipients that were given are resolved; errors name the field."""
+        def resolve(name, context):
+            if name == 'bob':
+                return {'success': False, 'message': 'No contact for bob'}
+            return {'success': True, 'email': f"{name}@example.com", 'message': name}
+
+        tools, contacts = self._tools(resolve)
+
+        result = tools.prepare_email('alice', 'Hi', 'Hello', bcc='bob')
+
+        assert result == {'success': False, 'error': 'BCC recipient issue: No contact for bob'}
+        assert contacts.smart_email_resolve.call_count == 2
+
+    def test_confirm_command_lists_optional_recipients(self):
+        """The confirmation command carries cc/bcc only when they were given."""
+        tools, contacts = self._tools(
+            lambda name, context: {'success': True, 'email': f"{name}@example.com", 'message': name})
+
+        with_cc = tools.prepare_email('alice', 'Hi', 'Hello', cc='bob')
+        plain = tools.prepare_email('alice', 'Hi', 'Hello')
+
+        assert "confirm_send_email('alice@example.com', 'Hi', 'Hello', cc='bob@example.com')" in with_cc['message']
+        assert "confirm_send_email('alice@example.com', 'Hi', 'Hello')" in plain['message']
+
+
+    def test_confirm_command_quotes_values(self):
+        """Apostrophes and newlines in the email survive as valid literals."""
+        tools, contacts = self._tools(
+            lambda name, context: {'success': True, 'email': f"{name}@example.com", 'message': name})
+
+        result = tools.prepare_email('alice', "Bob's party", "Line one\nIt's on")
+
+        assert """confirm_send_email('alice@example.com', "Bob's party", "Line one\\nIt's on")""" in result['message']
+
+    def test_preview_omits_missing_optional_lines(self):
+        """No CC/BCC lines, blank or otherwise, appear when they were not given."""
+        tools, contacts = self._tools(
+            lambda name, context: {'success': True, 'email': f"{name}@example.com", 'message': name})
+
+        message = tools.prepare_email('alice', 'Hi', 'Hello')['message']
+
+        assert 'CC:' not in message
+        assert 'Body: Hello\n\n⚠️' in message
+
+class TestPrepareFileShareBulk:
+    """Test SafeGoogleTools.prepare_file_share_bulk."""
+
+    def _tools(self, files):
+        drive = Mock()
+        drive.get_files.return_value = files
+        contacts = Mock()
+        contacts.smart_email_resolve.return_value = {'success': True, 'email': 'bob@example.com', 'message': 'Bob'}
+        return SafeGoogleTools(contacts, Mock(), drive, Mock()), drive
+
+    def test_preview_lists_every_file(self):
+        """All files are looked up together and named in the confirmation command."""
+        file = {'success': True, 'file': {'name': 'Doc', 'mimeType': 'text/plain', 'size': '10'}}
+        tools, drive = self._tools({'a': file, 'b': file})
+
+        result = tools.prepare_file_share_bulk('a, b', 'bob')
+
+        drive.get_files.assert_called_once_with(['a', 'b'])
+        assert len(result['preview']['files']) == 2
+        assert "confirm_share_file_bulk('a,b', 'bob@example.com', 'reader', True)" in result['message']
+
+    def test_missing_file_is_an_error(self):
+        """A file that cannot be looked up stops the share before resolving the recipient."""
+        tools, drive = self._tools({'a': {'success': False, 'error': 'HTTP error: 404'}})
+
+        result = tools.prepare_file_share_bulk('a', 'bob')
+
+        assert result['success'] is False
+        assert 'a: HTTP error: 404' in result['error']
+        tools.contacts.smart_email_resolve.assert_not_called()
+
+class TestSplitList:
+    """Test the comma-separated list parser."""
+
+    def test_strips_and_drops_blanks(self):
+        """Spaces around labels and empty entries are removed."""
+        assert _split_list(' INBOX, ,Label_1 ,') == ['INBOX', 'Label_1']
+
+    def test_empty_values(self):
+        """Missing or empty input gives an empty list."""
+        assert _split_list(None) == []
+        assert _split_list('') == []
+
+
+class TestResolutionMessage:
+    """Test the recipient resolution description."""
+
+    def test_uses_message_from_resolver(self):
+        """The resolver's own message is preferred."""
+        result = {'success': True, 'email': 'a@example.com', 'message': 'Found Alice'}
+        assert _resolution_message(result) == 'Found Alice'
+
+    def test_falls_back_to_email(self):
+        """Without a message the resolved address is described."""
+        assert _resolution_message({'success': True, 'email': 'a@example.com'}) == 'Resolved to a@example.com'
@@ -0,0 +1,52 @@
+"""Tests for the lazily created clients in the MCP server module."""
+
+import importlib
+from unittest.mock import Mock
+
+import pytest
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    # The module checks its configuration when first imported
+    monkeypatch.setenv('GOOGLE_CLIENT_ID', 'test_client_id')
+    monkeypatch.setenv('GOOGLE_CLIENT_SECRET', 'test_client_secret')
+    module = importlib.import_module('google_mcp_server.server')
+    monkeypatch.setattr(module.auth_manager, 'credentials_dir', tmp_path)
+    monkeypatch.setattr(module, 'message_cache_enabled', True)
+    monkeypatch.setattr(module, 'message_cache', None)
+    return module
+
+
+class TestGetMessageCache:
+    """Test server.get_message_cache."""
+
+    def test_empty_cache_is_reused(self, server):
+        """An empty cache is falsy but must not be opened again."""
+        cache = server.get_message_cache()
+        try:
+            assert len(cache) == 0
+            assert server.get_message_cache() is cache
+        finally:
+            cache.close()
+
+    def test_disabled_cache_is_not_created(self, server, monkeypatch):
+        """Without GOOGLE_MESSAGE_CACHE no cache file is opened."""
+        monkeypatch.setattr(server, 'message_cache_enabled', False)
+
+        assert server.get_message_cache() is None
+
+
+class TestAuthRevoke:
+    """Test server.google_auth_revoke."""
+
+    def test_revoke_closes_clients(self, server, monkeypatch):
+        """Revoking stops the background send pool and resets the clients."""
+        safe_tools = Mock()
+        monkeypatch.setattr(server.auth_manager, 'revoke_credentials', Mock(return_value=True))
+        monkeypatch.setattr(server, 'safe_tools', safe_tools)
+
+        assert 'successfully' in server.google_auth_revoke()
+
+        safe_tools.close.assert_called_once()
+        assert server.safe_tools is None